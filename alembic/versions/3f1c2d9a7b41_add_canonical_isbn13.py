@@ -0,0 +1,55 @@
+"""Add canonical isbn13 column
+
+Revision ID: 3f1c2d9a7b41
+Revises: 87a9a7b815c0
+Create Date: 2026-10-19 09:12:04.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.isbn import normalize_isbn
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2d9a7b41'
+down_revision: Union[str, None] = '87a9a7b815c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('isbn13', sa.String(length=13), nullable=True))
+
+    # Remplissage de la forme canonique ; les ISBN invalides ou en doublon restent à NULL
+    connection = op.get_bind()
+    book = sa.table('book', sa.column('id', sa.Integer), sa.column('isbn', sa.String), sa.column('isbn13', sa.String))
+    seen = set()
+    updates = []
+    for book_id, isbn in connection.execute(sa.select(book.c.id, book.c.isbn).order_by(book.c.id)):
+        try:
+            isbn13 = normalize_isbn(isbn)
+        except ValueError:
+            continue
+        if isbn13 in seen:
+            continue
+        seen.add(isbn13)
+        updates.append({"b_id": book_id, "b_isbn13": isbn13})
+
+    if updates:
+        connection.execute(
+            book.update().where(book.c.id == sa.bindparam('b_id')).values(isbn13=sa.bindparam('b_isbn13')),
+            updates,
+        )
+
+    op.create_index(op.f('ix_book_isbn13'), 'book', ['isbn13'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_isbn13'), table_name='book')
+    with op.batch_alter_table('book') as batch_op:
+        batch_op.drop_column('isbn13')
@@ -0,0 +1,41 @@
+"""Use AUTOINCREMENT for loan ids
+
+Revision ID: a1c5e8f3d2b9
+Revises: e4a7c1d9f6b2
+Create Date: 2026-10-20 09:14:37.802615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c5e8f3d2b9'
+down_revision: Union[str, None] = 'e4a7c1d9f6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # AUTOINCREMENT ne s'ajoute qu'en recréant la table (index partiels et clés étrangères recopiés)
+    with op.batch_alter_table('loan', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # Le compteur repart après le plus grand ID attribué, emprunts archivés compris
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'loan'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'loan', MAX("
+        "COALESCE((SELECT MAX(id) FROM loan), 0), COALESCE((SELECT MAX(id) FROM loan_history), 0))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('loan', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
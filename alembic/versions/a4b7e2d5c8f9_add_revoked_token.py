@@ -0,0 +1,43 @@
+"""Add revoked_token table
+
+Revision ID: a4b7e2d5c8f9
+Revises: f3a1d6b9c4e7
+Create Date: 2026-10-19 20:03:51.207334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4b7e2d5c8f9'
+down_revision: Union[str, None] = 'f3a1d6b9c4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('revoked_token',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_revoked_token_expires_at'), 'revoked_token', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_revoked_token_id'), 'revoked_token', ['id'], unique=False)
+    op.create_index(op.f('ix_revoked_token_jti'), 'revoked_token', ['jti'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_revoked_token_jti'), table_name='revoked_token')
+    op.drop_index(op.f('ix_revoked_token_id'), table_name='revoked_token')
+    op.drop_index(op.f('ix_revoked_token_expires_at'), table_name='revoked_token')
+    op.drop_table('revoked_token')
@@ -0,0 +1,41 @@
+"""Add change_log table
+
+Revision ID: b7e4a1c9d2f3
+Revises: 3f1c2d9a7b41
+Create Date: 2026-10-19 14:05:37.102846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4a1c9d2f3'
+down_revision: Union[str, None] = '3f1c2d9a7b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_log',
+    sa.Column('entity', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    op.create_index(op.f('ix_change_log_id'), 'change_log', ['id'], unique=False)
+    op.create_index('ix_change_log_created_at', 'change_log', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_change_log_created_at', table_name='change_log')
+    op.drop_index(op.f('ix_change_log_id'), table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,30 @@
+"""Add (user_id, loan_date) indexes on loan and loan_history
+
+Revision ID: b8d3f1a6e2c4
+Revises: a4b7e2d5c8f9
+Create Date: 2026-10-19 21:26:14.663092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d3f1a6e2c4'
+down_revision: Union[str, None] = 'a4b7e2d5c8f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_loan_user_id_loan_date', 'loan', ['user_id', 'loan_date'], unique=False)
+    op.create_index('ix_loan_history_user_id_loan_date', 'loan_history', ['user_id', 'loan_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loan_history_user_id_loan_date', table_name='loan_history')
+    op.drop_index('ix_loan_user_id_loan_date', table_name='loan')
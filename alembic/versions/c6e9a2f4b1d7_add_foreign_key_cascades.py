@@ -0,0 +1,61 @@
+"""Add ON DELETE cascades to loan, loan_history and revoked_token foreign keys
+
+Revision ID: c6e9a2f4b1d7
+Revises: b8d3f1a6e2c4
+Create Date: 2026-10-19 22:41:08.513920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e9a2f4b1d7'
+down_revision: Union[str, None] = 'b8d3f1a6e2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, colonne, table référencée, action à la suppression)
+FOREIGN_KEYS = [
+    ('loan', 'user_id', 'user', 'CASCADE'),
+    ('loan', 'book_id', 'book', 'CASCADE'),
+    ('loan_history', 'user_id', 'user', 'CASCADE'),
+    ('loan_history', 'book_id', 'book', 'CASCADE'),
+    ('revoked_token', 'user_id', 'user', 'SET NULL'),
+]
+
+# Les clés étrangères SQLite n'ont pas de nom : la recréation des tables (mode batch) leur en donne un
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _replace_foreign_keys(cascade: bool) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in dict.fromkeys(table for table, _, _, _ in FOREIGN_KEYS):
+        existing = {
+            fk['constrained_columns'][0]: fk['name']
+            for fk in inspector.get_foreign_keys(table)
+        }
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred, ondelete in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(existing.get(column) or name, type_='foreignkey')
+                batch_op.create_foreign_key(
+                    name, referred, [column], ['id'], ondelete=ondelete if cascade else None
+                )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_foreign_keys(cascade=True)
+    # La cascade depuis `book` recherche les emprunts par book_id : sans index, un parcours complet par livre
+    op.create_index(op.f('ix_loan_book_id'), 'loan', ['book_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_loan_book_id'), table_name='loan')
+    _replace_foreign_keys(cascade=False)
@@ -0,0 +1,47 @@
+"""Add loan_history table
+
+Revision ID: d5a8c3e1f6b2
+Revises: b7e4a1c9d2f3
+Create Date: 2026-10-19 16:48:21.774015
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8c3e1f6b2'
+down_revision: Union[str, None] = 'b7e4a1c9d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('loan_history',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('loan_date', sa.DateTime(), nullable=False),
+    sa.Column('return_date', sa.DateTime(), nullable=False),
+    sa.Column('due_date', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_loan_history_book_id'), 'loan_history', ['book_id'], unique=False)
+    op.create_index(op.f('ix_loan_history_id'), 'loan_history', ['id'], unique=False)
+    op.create_index(op.f('ix_loan_history_user_id'), 'loan_history', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_loan_history_user_id'), table_name='loan_history')
+    op.drop_index(op.f('ix_loan_history_id'), table_name='loan_history')
+    op.drop_index(op.f('ix_loan_history_book_id'), table_name='loan_history')
+    op.drop_table('loan_history')
@@ -0,0 +1,60 @@
+"""Add inventory_movement ledger and inventory_snapshot tables
+
+Revision ID: d9f2b5e8a3c6
+Revises: c6e9a2f4b1d7
+Create Date: 2026-10-19 23:27:44.061372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f2b5e8a3c6'
+down_revision: Union[str, None] = 'c6e9a2f4b1d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # book.quantity reste la quantité de référence : elle devient l'instantané initial
+    op.create_table('inventory_movement',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], name='fk_inventory_movement_book_id_book', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_inventory_movement_user_id_user', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_inventory_movement_book_id_id', 'inventory_movement', ['book_id', 'id'], unique=False)
+    op.create_index(op.f('ix_inventory_movement_id'), 'inventory_movement', ['id'], unique=False)
+    op.create_index(op.f('ix_inventory_movement_user_id'), 'inventory_movement', ['user_id'], unique=False)
+    op.create_table('inventory_snapshot',
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('books', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inventory_snapshot_id'), 'inventory_snapshot', ['id'], unique=False)
+    op.create_index(op.f('ix_inventory_snapshot_position'), 'inventory_snapshot', ['position'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_inventory_snapshot_position'), table_name='inventory_snapshot')
+    op.drop_index(op.f('ix_inventory_snapshot_id'), table_name='inventory_snapshot')
+    op.drop_table('inventory_snapshot')
+    op.drop_index(op.f('ix_inventory_movement_user_id'), table_name='inventory_movement')
+    op.drop_index(op.f('ix_inventory_movement_id'), table_name='inventory_movement')
+    op.drop_index('ix_inventory_movement_book_id_id', table_name='inventory_movement')
+    op.drop_table('inventory_movement')
@@ -0,0 +1,53 @@
+"""Add loan overdue and reminder flags
+
+Revision ID: e2c9f4a7b8d1
+Revises: d5a8c3e1f6b2
+Create Date: 2026-10-19 18:05:42.318807
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c9f4a7b8d1'
+down_revision: Union[str, None] = 'd5a8c3e1f6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('loan', sa.Column('is_overdue', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('loan', sa.Column('reminder_sent', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # Emprunts déjà en retard ; les rappels restants seront envoyés par l'échéancier au démarrage
+    loan = sa.table(
+        'loan',
+        sa.column('return_date', sa.DateTime),
+        sa.column('due_date', sa.DateTime),
+        sa.column('is_overdue', sa.Boolean),
+        sa.column('reminder_sent', sa.Boolean),
+    )
+    op.execute(
+        loan.update()
+        .where(loan.c.return_date.is_(None), loan.c.due_date <= datetime.utcnow())
+        .values(is_overdue=True, reminder_sent=True)
+    )
+
+    op.create_index('ix_loan_active_due_date', 'loan', ['due_date'], unique=False,
+                    sqlite_where=sa.text('return_date IS NULL'), postgresql_where=sa.text('return_date IS NULL'))
+    op.create_index('ix_loan_overdue_due_date', 'loan', ['due_date'], unique=False,
+                    sqlite_where=sa.text('is_overdue'), postgresql_where=sa.text('is_overdue'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loan_overdue_due_date', table_name='loan')
+    op.drop_index('ix_loan_active_due_date', table_name='loan')
+    with op.batch_alter_table('loan') as batch_op:
+        batch_op.drop_column('reminder_sent')
+        batch_op.drop_column('is_overdue')
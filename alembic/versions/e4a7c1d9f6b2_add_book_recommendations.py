@@ -0,0 +1,60 @@
+"""Add book_recommendation and recommendation_build tables
+
+Revision ID: e4a7c1d9f6b2
+Revises: d9f2b5e8a3c6
+Create Date: 2026-10-19 23:58:12.417903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c1d9f6b2'
+down_revision: Union[str, None] = 'd9f2b5e8a3c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables vides : remplies par python -m src.cli.recommendations --full (ou au premier passage du serveur)
+    op.create_table('book_recommendation',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('recommended_book_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], name='fk_book_recommendation_book_id_book', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['recommended_book_id'], ['book.id'], name='fk_book_recommendation_recommended_book_id_book', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_book_recommendation_book_id_rank', 'book_recommendation', ['book_id', 'rank'], unique=True)
+    op.create_index(op.f('ix_book_recommendation_id'), 'book_recommendation', ['id'], unique=False)
+    op.create_index(op.f('ix_book_recommendation_recommended_book_id'), 'book_recommendation', ['recommended_book_id'], unique=False)
+    op.create_table('recommendation_build',
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('books', sa.Integer(), nullable=False),
+    sa.Column('full', sa.Boolean(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_recommendation_build_id'), 'recommendation_build', ['id'], unique=False)
+    op.create_index(op.f('ix_recommendation_build_position'), 'recommendation_build', ['position'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recommendation_build_position'), table_name='recommendation_build')
+    op.drop_index(op.f('ix_recommendation_build_id'), table_name='recommendation_build')
+    op.drop_table('recommendation_build')
+    op.drop_index(op.f('ix_book_recommendation_recommended_book_id'), table_name='book_recommendation')
+    op.drop_index(op.f('ix_book_recommendation_id'), table_name='book_recommendation')
+    op.drop_index('ix_book_recommendation_book_id_rank', table_name='book_recommendation')
+    op.drop_table('book_recommendation')
@@ -0,0 +1,40 @@
+"""Add partial indexes on active loans by user and book, fix overdue index
+
+Revision ID: f3a1d6b9c4e7
+Revises: e2c9f4a7b8d1
+Create Date: 2026-10-19 19:12:08.540163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a1d6b9c4e7'
+down_revision: Union[str, None] = 'e2c9f4a7b8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite ignorait l'index partiel : sa condition doit être celle des requêtes
+    op.drop_index('ix_loan_overdue_due_date', table_name='loan')
+    op.create_index('ix_loan_overdue_due_date', 'loan', ['due_date'], unique=False,
+                    sqlite_where=sa.text('return_date IS NULL AND is_overdue = 1'),
+                    postgresql_where=sa.text('return_date IS NULL AND is_overdue'))
+    op.create_index('ix_loan_active_user_id', 'loan', ['user_id', 'due_date'], unique=False,
+                    sqlite_where=sa.text('return_date IS NULL'), postgresql_where=sa.text('return_date IS NULL'))
+    op.create_index('ix_loan_active_book_id', 'loan', ['book_id', 'due_date'], unique=False,
+                    sqlite_where=sa.text('return_date IS NULL'), postgresql_where=sa.text('return_date IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_loan_active_book_id', table_name='loan')
+    op.drop_index('ix_loan_active_user_id', table_name='loan')
+    op.drop_index('ix_loan_overdue_due_date', table_name='loan')
+    op.create_index('ix_loan_overdue_due_date', 'loan', ['due_date'], unique=False,
+                    sqlite_where=sa.text('is_overdue'), postgresql_where=sa.text('is_overdue'))
@@ -0,0 +1,214 @@
+"""
+Banc d'essai des repositories, services et routes sur des jeux de données synthétiques.
+Une opération en échec (réponse HTTP >= 400, refus d'un service) arrête le banc.
+Les médianes sont comparées à benchmarks/baseline.json, mesuré sur la machine décrite
+dans sa section "meta" : la régénérer (--save-baseline) en changeant de machine.
+
+Exemples :
+    python -m benchmarks.run --scales 10000 100000
+    python -m benchmarks.run --scales 10000 --save-baseline
+    python -m benchmarks.run --scales 10000 100000 1000000 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from typing import Callable, Dict, List
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.db.session import get_db
+from src.main import app
+from src.models.base import Base
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+from src.services.stats import StatsService
+from src.utils.security import create_access_token
+
+from .seed import SPARE_USERS, seed
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+class BenchmarkError(Exception):
+    """
+    Opération mesurée en échec : sa durée ne serait pas celle du chemin nominal.
+    """
+
+
+def checked(response):
+    """
+    Retourne la réponse si elle est un succès, lève BenchmarkError sinon.
+    """
+    if response.status_code >= 400:
+        raise BenchmarkError(
+            f"{response.request.method} {response.request.url.path} : HTTP {response.status_code} {response.text[:200]}"
+        )
+    return response
+
+
+def measure(func: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    """
+    Exécute `func(i)` `repeat` fois (après un appel de chauffe) et retourne les durées en millisecondes.
+    """
+    func(-1)
+    durations = []
+    for i in range(repeat):
+        start = perf_counter()
+        func(i)
+        durations.append((perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "min_ms": round(durations[0], 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "p95_ms": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+        "repeat": repeat,
+    }
+
+
+def run_scale(loans: int, repeat: int, workdir: str) -> Dict[str, Dict[str, float]]:
+    """
+    Crée une base SQLite fraîche, la remplit puis mesure chaque opération.
+    """
+    path = os.path.join(workdir, f"bench_{loans}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    start = perf_counter()
+    counts = seed(engine, loans=loans)
+    print(f"  jeu de données {counts} créé en {perf_counter() - start:.1f} s", file=sys.stderr)
+
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    db = Session()
+    results = {}
+
+    def loan_service():
+        return LoanService(LoanRepository(Loan, db), BookRepository(Book, db), UserRepository(User, db))
+
+    results["BaseRepository.get_multi"] = measure(
+        lambda i: LoanRepository(Loan, db).get_multi(skip=loans // 2, limit=100), repeat
+    )
+    results["BookRepository.get_by_title"] = measure(
+        lambda i: BookRepository(Book, db).get_by_title(title="secret"), repeat
+    )
+    results["StatsService.get_general_stats"] = measure(
+        lambda i: StatsService(db).get_general_stats(), repeat
+    )
+
+    # Les utilisateurs de réserve n'ont aucun emprunt : chaque mesure crée un emprunt valide,
+    # sur un livre qui a encore un exemplaire en rayon
+    first_spare_user = counts["users"] - SPARE_USERS + 1
+    runs = min(repeat, SPARE_USERS - 1)
+    book_ids = [book_id for (book_id,) in db.query(Book.id).filter(Book.quantity > 0).order_by(Book.id).limit(runs + 1)]
+    results["LoanService.create_loan"] = measure(
+        lambda i: loan_service().create_loan(user_id=first_spare_user + i + 1, book_id=book_ids[i + 1]), runs
+    )
+
+    # Chemin HTTP complet (dépendances, authentification, sérialisation)
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(subject=1)}"}
+    try:
+        results["GET /books/{id}"] = measure(
+            lambda i: checked(client.get(f"/api/v1/books/{(i % 100) + 1}", headers=headers)), repeat
+        )
+        results["GET /loans/"] = measure(
+            lambda i: checked(client.get("/api/v1/loans/?limit=100", headers=headers)), repeat
+        )
+        results["GET /stats/general"] = measure(
+            lambda i: checked(client.get("/api/v1/stats/general", headers=headers)), repeat
+        )
+    finally:
+        app.dependency_overrides = {}
+
+    db.close()
+    engine.dispose()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Compare les médianes aux valeurs de référence et retourne les régressions détectées.
+    """
+    regressions = []
+    for scale, operations in results["scales"].items():
+        for name, timing in operations.items():
+            reference = baseline.get("scales", {}).get(scale, {}).get(name)
+            if not reference:
+                continue
+            limit = reference["median_ms"] * (1 + tolerance)
+            if timing["median_ms"] > limit:
+                regressions.append(
+                    f"{name} @ {scale} emprunts : {timing['median_ms']} ms "
+                    f"(référence {reference['median_ms']} ms, seuil {limit:.3f} ms)"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000, 100000], help="nombres d'emprunts à générer")
+    parser.add_argument("--repeat", type=int, default=30, help="nombre de mesures par opération")
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="fichier JSON de référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dégradation tolérée (0.25 = +25 %%)")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre les résultats comme nouvelle référence")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "date": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "machine": platform.machine(),
+        },
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for loans in args.scales:
+            print(f"Échelle : {loans} emprunts", file=sys.stderr)
+            try:
+                results["scales"][str(loans)] = run_scale(loans, args.repeat, workdir)
+            except (BenchmarkError, ValueError) as e:
+                # Mesure d'un chemin d'erreur (ValueError : refus d'un service) : pas de résultat
+                print(f"ÉCHEC : {e}", file=sys.stderr)
+                return 1
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Référence enregistrée dans {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Aucune référence : comparaison ignorée (utiliser --save-baseline)", file=sys.stderr)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"RÉGRESSION : {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
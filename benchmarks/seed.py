@@ -0,0 +1,37 @@
+from sqlalchemy.engine import Engine
+
+from src.cli.seed import REFERENCE_DATE, bulk_insert, seed as generate
+from src.models.users import User
+from src.utils.security import get_password_hash
+
+LOANS_PER_USER = 20
+LOANS_PER_BOOK = 10
+# Utilisateurs sans aucun emprunt, réservés aux mesures de création d'emprunt
+SPARE_USERS = 200
+
+
+def seed(engine: Engine, *, loans: int, seed_value: int = 42) -> dict:
+    """
+    Remplit une base vide avec un jeu synthétique proportionné au nombre d'emprunts.
+    Retourne le nombre de lignes créées par table.
+    """
+    counts = generate(
+        engine,
+        loans=loans,
+        users=max(loans // LOANS_PER_USER, 10),
+        books=max(loans // LOANS_PER_BOOK, 10),
+        seed_value=seed_value,
+    )
+
+    now = REFERENCE_DATE
+    hashed_password = get_password_hash("benchmark")
+    counts["users"] += bulk_insert(engine, User.__table__, {
+        "email": [f"spare{i}@bench.local" for i in range(SPARE_USERS)],
+        "hashed_password": [hashed_password] * SPARE_USERS,
+        "full_name": [f"Réserve {i}" for i in range(SPARE_USERS)],
+        "is_active": [True] * SPARE_USERS,
+        "is_admin": [False] * SPARE_USERS,
+        "created_at": [now] * SPARE_USERS,
+        "updated_at": [now] * SPARE_USERS,
+    })
+    return counts
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
@@ -8,6 +10,9 @@ from ..db.session import get_db
 from ..models.users import User
 from ..repositories.users import UserRepository
 from ..services.users import UserService
+from ..models.tokens import RevokedToken
+from ..repositories.tokens import RevokedTokenRepository
+from ..services.tokens import TokenService
 from ..api.schemas.token import TokenPayload
 from ..utils.security import ALGORITHM
 from ..config import settings
@@ -15,24 +20,54 @@ from ..config import settings
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-def get_current_user(
+def decode_access_token(token: str) -> TokenPayload:
+    """
+    Décode et valide un token JWT. Lève JWTError ou ValidationError s'il est invalide.
+    """
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[ALGORITHM]
+    )
+    return TokenPayload(**payload)
+
+
+def is_token_revoked(db: Session, token_data: TokenPayload) -> bool:
+    """
+    Vérifie si un token a été révoqué (sans requête pour les tokens jamais révoqués).
+    """
+    return TokenService(RevokedTokenRepository(RevokedToken, db)).is_revoked(token_data=token_data)
+
+
+def get_token_payload(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> TokenPayload:
     """
-    Dépendance pour obtenir l'utilisateur actuel à partir du token JWT.
+    Dépendance pour obtenir le contenu validé du token JWT, s'il n'a pas été révoqué.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = decode_access_token(token)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Impossible de valider les informations d'identification",
         )
 
+    if is_token_revoked(db, token_data):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token révoqué",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token_data
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token_data: TokenPayload = Depends(get_token_payload)
+) -> User:
+    """
+    Dépendance pour obtenir l'utilisateur actuel à partir du token JWT.
+    """
     repository = UserRepository(User, db)
     service = UserService(repository)
     user = service.get(id=token_data.sub)
@@ -70,4 +105,24 @@ def get_current_admin_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Privilèges insuffisants",
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def get_admin_from_token(db: Session, token: str) -> Optional[User]:
+    """
+    Retourne l'administrateur actif associé à un token, ou None.
+    Utilisé hors injection de dépendances (middlewares).
+    """
+    try:
+        token_data = decode_access_token(token)
+    except (JWTError, ValidationError):
+        return None
+    if is_token_revoked(db, token_data):
+        return None
+
+    repository = UserRepository(User, db)
+    service = UserService(repository)
+    user = service.get(id=token_data.sub)
+    if not user or not user.is_active or not user.is_admin:
+        return None
+    return user
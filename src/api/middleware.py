@@ -0,0 +1,160 @@
+import cProfile
+from time import perf_counter
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from ..db.session import SessionLocal
+from ..utils.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    HTTP_IN_PROGRESS,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    RequestDBStats,
+    current_request_db_stats,
+)
+from ..utils.sql_debug import RequestSQLTrace, current_sql_trace
+from .dependencies import get_admin_from_token
+from .profiling import current_profiler, new_profile_name, save_profile
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI qui mesure, par route, le nombre de requêtes, leur durée,
+    leur code de retour et l'activité SQL associée.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestDBStats()
+        token = current_request_db_stats.set(stats)
+        HTTP_IN_PROGRESS.inc()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            HTTP_IN_PROGRESS.inc(amount=-1)
+            current_request_db_stats.reset(token)
+
+            # Le gabarit de la route (ex. /api/v1/books/{id}) évite une série par ID
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+
+            HTTP_REQUESTS.inc(method, route_path, str(status_code))
+            HTTP_LATENCY.observe(elapsed, method, route_path)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, method, route_path)
+            DB_TIME_PER_REQUEST.observe(stats.duration, method, route_path)
+
+
+class SQLDebugMiddleware:
+    """
+    Middleware ASGI (mode debug) qui trace les requêtes SQL de chaque requête HTTP,
+    renvoie un résumé dans l'en-tête `X-SQL-Debug` et journalise les N+1 suspectés.
+    """
+    header_name = b"x-sql-debug"
+
+    def __init__(self, app: ASGIApp, threshold: int = settings.SQL_DEBUG_N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestSQLTrace(self.threshold)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header_name, trace.summary().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        token = current_sql_trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_sql_trace.reset(token)
+            trace.log(scope["method"], scope["path"])
+
+
+
+def _is_admin_token(token: str) -> bool:
+    db = SessionLocal()
+    try:
+        return get_admin_from_token(db, token) is not None
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI qui profile une requête à la demande d'un administrateur
+    (en-tête `X-Profile: 1` ou paramètre `?profile=1`). Le profil pstats est
+    enregistré dans `PROFILE_DIR` et son nom renvoyé dans l'en-tête `X-Profile-Id`.
+    """
+    header_name = b"x-profile"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = self._bearer_token(scope)
+        if not token or not await run_in_threadpool(_is_admin_token, token):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = cProfile.Profile()
+        name = new_profile_name(scope["method"], scope["path"])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", name.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        context_token = current_profiler.set(profiler)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profiler.reset(context_token)
+            await run_in_threadpool(save_profile, profiler, name)
+
+    def _requested(self, scope: Scope) -> bool:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if "1" in query.get("profile", []):
+            return True
+        return any(key == self.header_name and value == b"1" for key, value in scope["headers"])
+
+    @staticmethod
+    def _bearer_token(scope: Scope) -> str:
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer":
+                    return token
+        return ""
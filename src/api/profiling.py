@@ -0,0 +1,146 @@
+import asyncio
+import cProfile
+import os
+import re
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from ..config import settings
+
+PROFILE_SUFFIX = ".prof"
+_PROFILE_NAME = re.compile(r"^[\w\-.]+\.prof$")
+_UNSAFE_CHARS = re.compile(r"[^\w\-]+")
+
+# Profileur de la requête en cours ; None pour toutes les requêtes normales
+current_profiler: ContextVar[Optional[cProfile.Profile]] = ContextVar("current_profiler", default=None)
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    """
+    Enveloppe un endpoint synchrone pour l'exécuter sous le profileur de la requête, s'il y en a un.
+    Il est exécuté dans un thread du threadpool pendant que le gestionnaire de la route, suspendu,
+    ne profile rien : le profileur n'est jamais actif dans deux threads à la fois.
+    """
+    # include_router recrée les routes à partir de l'endpoint déjà enveloppé
+    if getattr(endpoint, "__profiled__", False) or asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profiler = current_profiler.get()
+        if profiler is None:
+            return endpoint(*args, **kwargs)
+        profiler.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.disable()
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+class _ProfiledSteps:
+    """
+    Exécute une coroutine en n'activant le profileur que pendant ses propres étapes : entre deux
+    `await`, la boucle d'événements exécute d'autres requêtes, qui ne sont pas attribuées à celle-ci.
+    """
+    def __init__(self, coroutine: Coroutine, profiler: cProfile.Profile):
+        self.coroutine = coroutine
+        self.profiler = profiler
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self.profiler.enable()
+            try:
+                if error is None:
+                    yielded = self.coroutine.send(value)
+                else:
+                    yielded = self.coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                self.coroutine.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route FastAPI profilée à la demande (voir `ProfilingMiddleware`) : les étapes du gestionnaire
+    de la route (lecture du corps, dépendances, endpoint, validation et sérialisation de la réponse)
+    sont exécutées sous le profileur de la requête, et seulement elles. Le corps des dépendances
+    synchrones, exécuté dans le threadpool, n'y apparaît qu'à travers leur résolution.
+    """
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request) -> Response:
+            profiler = current_profiler.get()
+            if profiler is None:
+                return await handler(request)
+            return await _ProfiledSteps(handler(request), profiler)
+        return profiled_handler
+
+
+def new_profile_name(method: str, path: str) -> str:
+    """
+    Génère un nom de fichier de profil unique et sûr pour une requête.
+    """
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    slug = _UNSAFE_CHARS.sub("_", path).strip("_")[:80] or "root"
+    return f"{timestamp}-{method.lower()}-{slug}-{uuid4().hex[:8]}{PROFILE_SUFFIX}"
+
+
+def save_profile(profiler: cProfile.Profile, name: str) -> str:
+    """
+    Enregistre un profil au format pstats dans le répertoire configuré.
+    """
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(settings.PROFILE_DIR, name)
+    profiler.dump_stats(path)
+    return path
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """
+    Liste les profils enregistrés, du plus récent au plus ancien.
+    """
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+
+    profiles = []
+    for entry in os.scandir(settings.PROFILE_DIR):
+        if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX):
+            stat = entry.stat()
+            profiles.append({
+                "name": entry.name,
+                "size": stat.st_size,
+                "created_at": datetime.utcfromtimestamp(stat.st_mtime),
+            })
+    profiles.sort(key=lambda profile: profile["created_at"], reverse=True)
+    return profiles
+
+
+def get_profile_path(name: str) -> Optional[str]:
+    """
+    Retourne le chemin d'un profil existant, ou None si le nom est invalide ou inconnu.
+    """
+    if not _PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
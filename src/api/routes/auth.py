@@ -1,17 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from jose import JWTError
+from pydantic import ValidationError
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
 from ...db.session import get_db
 from ...models.users import User as UserModel
-from ..schemas.token import Token
+from ...models.tokens import RevokedToken
+from ..schemas.token import Token, TokenPayload, TokenRevoke
+from ...repositories.tokens import RevokedTokenRepository
 from ...repositories.users import UserRepository
+from ...services.tokens import TokenService
 from ...services.users import UserService
 from ...utils.security import create_access_token
 from ...config import settings
+from ..dependencies import decode_access_token, get_current_admin_user, get_current_user, get_token_payload
+from ..profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.post("/login", response_model=Token)
@@ -46,4 +53,53 @@ def login_access_token(
             subject=user.id, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    db: Session = Depends(get_db),
+    token_data: TokenPayload = Depends(get_token_payload),
+    current_user = Depends(get_current_user)
+):
+    """
+    Révoque le token utilisé pour la requête.
+    """
+    service = TokenService(RevokedTokenRepository(RevokedToken, db))
+    try:
+        service.revoke(token_data=token_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_token(
+    *,
+    db: Session = Depends(get_db),
+    token_in: TokenRevoke,
+    current_user = Depends(get_current_admin_user)
+):
+    """
+    Révoque un token quelconque (poste compromis, ...) jusqu'à son expiration.
+    """
+    try:
+        token_data = decode_access_token(token_in.token)
+    except (JWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token invalide ou expiré"
+        )
+
+    service = TokenService(RevokedTokenRepository(RevokedToken, db))
+    try:
+        service.revoke(token_data=token_data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,15 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Any
 
 from ...db.session import get_db
 from ...models.books import Book as BookModel
-from ..schemas.books import Book, BookCreate, BookUpdate
+from ..schemas.books import (
+    Book, BookCreate, BookDetail, BookUpdate, BookSuggestion, BookBulkDelete, BookBulkDeleteResult,
+    BookBulkUpdateItem, BookBulkUpdateResult, InventoryMovement
+)
+from ...models.recommendations import BookRecommendation
 from ...repositories.books import BookRepository
+from ...repositories.recommendations import RecommendationRepository
 from ...services.books import BookService
+from ...services.recommendations import RecommendationService
+from ...config import settings
+from ...utils.isbn import compact_isbn
+from ...utils.singleflight import SingleFlight, flight_key
+from ...utils.text import normalize_text
 from ..dependencies import get_current_active_user, get_current_admin_user
+from ..profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+
+# Lectures identiques simultanées regroupées : un seul calcul par clé, résultat validé
+# (schémas pydantic) avant partage car les objets ORM sont liés à la session du premier appel
+reads = SingleFlight("books", timeout=settings.SINGLE_FLIGHT_TIMEOUT, enabled=settings.SINGLE_FLIGHT_ENABLED)
 
 
 @router.get("/", response_model=List[Book])
@@ -28,6 +43,21 @@ def read_books(
     return books
 
 
+@router.get("/autocomplete", response_model=List[BookSuggestion])
+def autocomplete_books(
+    db: Session = Depends(get_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Suggère des livres dont le titre ou l'auteur commence par la saisie.
+    """
+    repository = BookRepository(BookModel, db)
+    service = BookService(repository)
+    return service.autocomplete(query=q, limit=limit)
+
+
 @router.post("/", response_model=Book, status_code=status.HTTP_201_CREATED)
 def create_book(
     *,
@@ -51,7 +81,7 @@ def create_book(
         )
 
 
-@router.get("/{id}", response_model=Book)
+@router.get("/{id}", response_model=BookDetail)
 def read_book(
     *,
     db: Session = Depends(get_db),
@@ -59,17 +89,24 @@ def read_book(
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
-    Récupère un livre par son ID.
+    Récupère un livre par son ID, avec les livres empruntés par ses lecteurs.
     """
-    repository = BookRepository(BookModel, db)
-    service = BookService(repository)
-    book = service.get(id=id)
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Livre non trouvé"
+    def load() -> BookDetail:
+        repository = BookRepository(BookModel, db)
+        service = BookService(repository)
+        book = service.get(id=id)
+        if not book:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Livre non trouvé"
+            )
+        recommendations = RecommendationService(RecommendationRepository(BookRecommendation, db))
+        return BookDetail(
+            **Book.model_validate(book, from_attributes=True).dict(),
+            also_borrowed=recommendations.get_for_book(book_id=id),
         )
-    return book
+
+    return reads.do(flight_key("/books/{id}", id=id), load)
 
 
 @router.put("/{id}", response_model=Book)
@@ -102,6 +139,34 @@ def update_book(
         )
 
 
+@router.get("/{id}/movements", response_model=List[InventoryMovement])
+def read_book_movements(
+    *,
+    response: Response,
+    db: Session = Depends(get_db),
+    id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Récupère les mouvements de stock d'un livre (emprunts, retours, corrections), plus récents d'abord.
+    Le nombre total de mouvements est renvoyé dans l'en-tête X-Total-Count.
+    """
+    repository = BookRepository(BookModel, db)
+    service = BookService(repository)
+    book = service.get(id=id)
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Livre non trouvé"
+        )
+
+    movements, total = service.get_movements(book_id=id, skip=skip, limit=limit)
+    response.headers["X-Total-Count"] = str(total)
+    return movements
+
+
 @router.delete("/{id}", response_model=Book)
 def delete_book(
     *,
@@ -124,20 +189,78 @@ def delete_book(
     return book
 
 
+@router.patch("/", response_model=BookBulkUpdateResult)
+def update_books(
+    *,
+    db: Session = Depends(get_db),
+    books_in: List[BookBulkUpdateItem] = Body(..., description="Modifications partielles, une par livre (id + champs)"),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Modifie plusieurs livres en une transaction (quantités d'un inventaire, ...), sans les recharger.
+    """
+    if len(books_in) > settings.BOOK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Au plus {settings.BOOK_BULK_MAX_ITEMS} livres par requête"
+        )
+
+    repository = BookRepository(BookModel, db)
+    service = BookService(repository)
+    try:
+        return service.update_many(items=books_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/bulk-delete", response_model=BookBulkDeleteResult)
+def delete_books(
+    *,
+    db: Session = Depends(get_db),
+    books_in: BookBulkDelete,
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Supprime plusieurs livres en une transaction ; leurs emprunts sont supprimés par la base.
+    """
+    if len(books_in.ids) > settings.BOOK_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Au plus {settings.BOOK_BULK_MAX_ITEMS} livres par requête"
+        )
+
+    repository = BookRepository(BookModel, db)
+    service = BookService(repository)
+    return service.remove_many(ids=books_in.ids)
+
+
 @router.get("/search/title/{title}", response_model=List[Book])
 def search_books_by_title(
     *,
     db: Session = Depends(get_db),
     title: str,
+    fuzzy: bool = False,
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
     Recherche des livres par titre.
+    Avec `fuzzy=true`, la recherche tolère les fautes de frappe et classe par similarité.
     """
-    repository = BookRepository(BookModel, db)
-    service = BookService(repository)
-    books = service.get_by_title(title=title)
-    return books
+    def load() -> List[Book]:
+        repository = BookRepository(BookModel, db)
+        service = BookService(repository)
+        if fuzzy:
+            books = service.search_fuzzy(query=title, field="title")
+        else:
+            books = service.get_by_title(title=title)
+        return [Book.model_validate(book, from_attributes=True) for book in books]
+
+    # La recherche approximative ne distingue ni la casse ni les accents
+    key = normalize_text(title) if fuzzy else title
+    return reads.do(flight_key("/books/search/title", title=key, fuzzy=fuzzy), load)
 
 
 @router.get("/search/author/{author}", response_model=List[Book])
@@ -145,15 +268,25 @@ def search_books_by_author(
     *,
     db: Session = Depends(get_db),
     author: str,
+    fuzzy: bool = False,
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
     Recherche des livres par auteur.
+    Avec `fuzzy=true`, la recherche tolère les fautes de frappe et classe par similarité.
     """
-    repository = BookRepository(BookModel, db)
-    service = BookService(repository)
-    books = service.get_by_author(author=author)
-    return books
+    def load() -> List[Book]:
+        repository = BookRepository(BookModel, db)
+        service = BookService(repository)
+        if fuzzy:
+            books = service.search_fuzzy(query=author, field="author")
+        else:
+            books = service.get_by_author(author=author)
+        return [Book.model_validate(book, from_attributes=True) for book in books]
+
+    # La recherche approximative ne distingue ni la casse ni les accents
+    key = normalize_text(author) if fuzzy else author
+    return reads.do(flight_key("/books/search/author", author=key, fuzzy=fuzzy), load)
 
 
 @router.get("/search/isbn/{isbn}", response_model=Book)
@@ -166,12 +299,15 @@ def search_book_by_isbn(
     """
     Recherche un livre par ISBN.
     """
-    repository = BookRepository(BookModel, db)
-    service = BookService(repository)
-    book = service.get_by_isbn(isbn=isbn)
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Livre non trouvé"
-        )
-    return book
\ No newline at end of file
+    def load() -> Book:
+        repository = BookRepository(BookModel, db)
+        service = BookService(repository)
+        book = service.get_by_isbn(isbn=isbn)
+        if not book:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Livre non trouvé"
+            )
+        return Book.model_validate(book, from_attributes=True)
+
+    return reads.do(flight_key("/books/search/isbn", isbn=compact_isbn(isbn)), load)
\ No newline at end of file
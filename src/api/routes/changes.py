@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+
+from ...db.session import get_db
+from ...models.books import Book as BookModel
+from ...models.changes import ChangeLog as ChangeLogModel
+from ...models.loans import Loan as LoanModel
+from ..schemas.changes import ChangeFeed
+from ...repositories.books import BookRepository
+from ...repositories.changes import ChangeLogRepository
+from ...repositories.loans import LoanRepository
+from ...services.changes import ChangeFeedService, CursorExpiredError
+from ..dependencies import get_current_active_user
+from ..profiling import ProfiledRoute
+
+router = APIRouter(route_class=ProfiledRoute)
+
+def _service(db: Session) -> ChangeFeedService:
+    return ChangeFeedService(
+        ChangeLogRepository(ChangeLogModel, db),
+        {"book": BookRepository(BookModel, db), "loan": LoanRepository(LoanModel, db)},
+    )
+
+
+def _check_access(entities: List[str], current_user) -> None:
+    # Le catalogue est visible de tous les utilisateurs, les emprunts des administrateurs seulement
+    if "loan" in entities and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Privilèges insuffisants",
+        )
+
+
+@router.get("/", response_model=ChangeFeed)
+def read_changes(
+    db: Session = Depends(get_db),
+    since: Optional[int] = Query(None, ge=0, description="Curseur renvoyé par l'appel précédent"),
+    entity: Optional[List[str]] = Query(None, description="Restreint le flux à book et/ou loan"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Récupère les créations, modifications et suppressions postérieures au curseur.
+    Sans curseur, retourne seulement le curseur courant (à utiliser après un téléchargement complet).
+    """
+    entities = entity or list(ChangeFeedService.ENTITIES)
+    _check_access(entities, current_user)
+    service = _service(db)
+
+    if since is None:
+        return {"events": [], "cursor": service.get_cursor(), "has_more": False}
+
+    try:
+        events, cursor, has_more = service.get_changes(cursor=since, limit=limit, entities=entities)
+    except CursorExpiredError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return {
+        "events": [
+            {
+                "id": entry.id,
+                "entity": entry.entity,
+                "entity_id": entry.entity_id,
+                "operation": entry.operation,
+                "changed_at": entry.created_at,
+                "data": obj,
+            }
+            for entry, obj in events
+        ],
+        "cursor": cursor,
+        "has_more": has_more,
+    }
@@ -1,20 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Optional
 from datetime import datetime, timedelta
 
 from ...db.session import get_db
 from ...models.loans import Loan as LoanModel
 from ...models.books import Book as BookModel
 from ...models.users import User as UserModel
-from ..schemas.loans import Loan, LoanCreate, LoanUpdate
+from ..schemas.loans import Loan, LoanCreate, LoanUpdate, LoanSummary
 from ...repositories.loans import LoanRepository
 from ...repositories.books import BookRepository
 from ...repositories.users import UserRepository
 from ...services.loans import LoanService
 from ..dependencies import get_current_active_user, get_current_admin_user
+from ..profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=List[Loan])
@@ -151,35 +152,93 @@ def extend_loan(
 
 @router.get("/active/", response_model=List[Loan])
 def read_active_loans(
+    response: Response,
     db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("due_date", description="due_date, days_overdue, loan_date ou user ; préfixe - pour décroissant"),
+    user_id: Optional[int] = None,
+    book_id: Optional[int] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    loan_from: Optional[datetime] = None,
+    loan_to: Optional[datetime] = None,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère les emprunts actifs (non retournés).
+    Récupère les emprunts actifs (non retournés), par page.
+    Le nombre total d'emprunts correspondant aux filtres est renvoyé dans l'en-tête X-Total-Count.
     """
     loan_repository = LoanRepository(LoanModel, db)
     book_repository = BookRepository(BookModel, db)
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
 
-    loans = service.get_active_loans()
+    try:
+        loans, total = service.get_current_loans(
+            overdue=False,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            user_id=user_id,
+            book_id=book_id,
+            due_from=due_from,
+            due_to=due_to,
+            loan_from=loan_from,
+            loan_to=loan_to
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    response.headers["X-Total-Count"] = str(total)
     return loans
 
 
 @router.get("/overdue/", response_model=List[Loan])
 def read_overdue_loans(
+    response: Response,
     db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("-days_overdue", description="due_date, days_overdue, loan_date ou user ; préfixe - pour décroissant"),
+    user_id: Optional[int] = None,
+    book_id: Optional[int] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    loan_from: Optional[datetime] = None,
+    loan_to: Optional[datetime] = None,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère les emprunts en retard.
+    Récupère les emprunts en retard, par page (les plus en retard d'abord par défaut).
+    Le nombre total d'emprunts correspondant aux filtres est renvoyé dans l'en-tête X-Total-Count.
     """
     loan_repository = LoanRepository(LoanModel, db)
     book_repository = BookRepository(BookModel, db)
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
 
-    loans = service.get_overdue_loans()
+    try:
+        loans, total = service.get_current_loans(
+            overdue=True,
+            skip=skip,
+            limit=limit,
+            sort=sort,
+            user_id=user_id,
+            book_id=book_id,
+            due_from=due_from,
+            due_to=due_to,
+            loan_from=loan_from,
+            loan_to=loan_to
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    response.headers["X-Total-Count"] = str(total)
     return loans
 
 
@@ -188,10 +247,11 @@ def read_user_loans(
     *,
     db: Session = Depends(get_db),
     user_id: int,
+    include_history: bool = False,
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
-    Récupère les emprunts d'un utilisateur.
+    Récupère les emprunts d'un utilisateur (`include_history` : avec les emprunts archivés).
     """
     # Vérifier que l'utilisateur est l'emprunteur ou un administrateur
     if not current_user.is_admin and current_user.id != user_id:
@@ -205,24 +265,85 @@ def read_user_loans(
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
 
-    loans = service.get_loans_by_user(user_id=user_id)
+    loans = service.get_loans_by_user(user_id=user_id, include_history=include_history)
     return loans
 
 
+@router.get("/user/{user_id}/history", response_model=List[Loan])
+def read_user_loan_history(
+    *,
+    response: Response,
+    db: Session = Depends(get_db),
+    user_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    include_history: bool = False,
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Récupère l'historique d'un utilisateur par page, du plus récent au plus ancien
+    (`include_history` : avec les emprunts archivés). Le nombre total est dans l'en-tête X-Total-Count.
+    """
+    # Vérifier que l'utilisateur est l'emprunteur ou un administrateur
+    if not current_user.is_admin and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Accès non autorisé"
+        )
+
+    loan_repository = LoanRepository(LoanModel, db)
+    book_repository = BookRepository(BookModel, db)
+    user_repository = UserRepository(UserModel, db)
+    service = LoanService(loan_repository, book_repository, user_repository)
+
+    loans, total = service.get_user_history(
+        user_id=user_id, skip=skip, limit=limit, include_history=include_history
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return loans
+
+
+@router.get("/user/{user_id}/summary", response_model=LoanSummary)
+def read_user_loan_summary(
+    *,
+    db: Session = Depends(get_db),
+    user_id: int,
+    include_history: bool = True,
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Récupère le bilan des emprunts d'un utilisateur, archives comprises par défaut.
+    """
+    # Vérifier que l'utilisateur est l'emprunteur ou un administrateur
+    if not current_user.is_admin and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Accès non autorisé"
+        )
+
+    loan_repository = LoanRepository(LoanModel, db)
+    book_repository = BookRepository(BookModel, db)
+    user_repository = UserRepository(UserModel, db)
+    service = LoanService(loan_repository, book_repository, user_repository)
+
+    return service.get_user_summary(user_id=user_id, include_history=include_history)
+
+
 @router.get("/book/{book_id}", response_model=List[Loan])
 def read_book_loans(
     *,
     db: Session = Depends(get_db),
     book_id: int,
+    include_history: bool = False,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
-    Récupère les emprunts d'un livre.
+    Récupère les emprunts d'un livre (`include_history` : avec les emprunts archivés).
     """
     loan_repository = LoanRepository(LoanModel, db)
     book_repository = BookRepository(BookModel, db)
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
 
-    loans = service.get_loans_by_book(book_id=book_id)
+    loans = service.get_loans_by_book(book_id=book_id, include_history=include_history)
     return loans
\ No newline at end of file
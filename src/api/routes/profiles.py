@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import Any, Dict, List
+
+from ..dependencies import get_current_admin_user
+from ..profiling import ProfiledRoute, get_profile_path, list_profiles
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+def read_profiles(
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Liste les profils de requêtes enregistrés.
+    """
+    return list_profiles()
+
+
+@router.get("/{name}")
+def download_profile(
+    name: str,
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Télécharge un profil (format pstats, lisible avec snakeviz ou convertible en flame graph).
+    """
+    path = get_profile_path(name)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil non trouvé"
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,61 +1,131 @@
 # src/api/routes/stats.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from ...db.session import get_db
+from ...services.analytics import UtilisationService
 from ...services.stats import StatsService
+from ...config import settings
+from ...utils.singleflight import SingleFlight, flight_key
 from ..dependencies import get_current_admin_user
+from ..profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
+
+# Agrégats coûteux demandés en même temps par plusieurs tableaux de bord : un seul calcul
+reads = SingleFlight("stats", timeout=settings.SINGLE_FLIGHT_TIMEOUT, enabled=settings.SINGLE_FLIGHT_ENABLED)
 
 
 @router.get("/general", response_model=Dict[str, Any])
 def get_general_stats(
     db: Session = Depends(get_db),
+    include_history: bool = False,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère des statistiques générales sur la bibliothèque.
     """
     service = StatsService(db)
-    return service.get_general_stats()
+    return reads.do(
+        flight_key("/stats/general", include_history=include_history),
+        lambda: service.get_general_stats(include_history=include_history)
+    )
 
 
 @router.get("/most-borrowed-books", response_model=List[Dict[str, Any]])
 def get_most_borrowed_books(
     db: Session = Depends(get_db),
     limit: int = 10,
+    include_history: bool = False,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère les livres les plus empruntés.
     """
     service = StatsService(db)
-    return service.get_most_borrowed_books(limit=limit)
+    return reads.do(
+        flight_key("/stats/most-borrowed-books", limit=limit, include_history=include_history),
+        lambda: service.get_most_borrowed_books(limit=limit, include_history=include_history)
+    )
 
 
 @router.get("/most-active-users", response_model=List[Dict[str, Any]])
 def get_most_active_users(
     db: Session = Depends(get_db),
     limit: int = 10,
+    include_history: bool = False,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère les utilisateurs les plus actifs.
     """
     service = StatsService(db)
-    return service.get_most_active_users(limit=limit)
+    return service.get_most_active_users(limit=limit, include_history=include_history)
 
 
 @router.get("/monthly-loans", response_model=List[Dict[str, Any]])
 def get_monthly_loans(
     db: Session = Depends(get_db),
     months: int = 12,
+    include_history: bool = False,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
     Récupère le nombre d'emprunts par mois pour les derniers mois.
     """
     service = StatsService(db)
-    return service.get_monthly_loans(months=months)
\ No newline at end of file
+    return service.get_monthly_loans(months=months, include_history=include_history)
+
+
+@router.get("/utilisation", response_model=List[Dict[str, Any]])
+def get_utilisation(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = Query("utilisation", description="utilisation, turnover, idle_days, loans, loan_days, days_owned ou id ; préfixe - pour décroissant"),
+    days: Optional[int] = Query(None, ge=1, description="Fenêtre d'observation en jours (défaut : depuis l'acquisition)"),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Récupère l'utilisation de chaque livre (jours empruntés sur jours possédés, rotation par exemplaire,
+    jours sans emprunt), par page. Le nombre total de livres est renvoyé dans l'en-tête X-Total-Count.
+    Le calcul, fait sur tout le fonds, est réutilisé entre les pages (UTILISATION_CACHE_TTL).
+    """
+    service = UtilisationService(db)
+    try:
+        rows, total = service.get_page(skip=skip, limit=limit, sort=sort, days=days)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    response.headers["X-Total-Count"] = str(total)
+    return rows
+
+
+@router.get("/utilisation/export")
+def export_utilisation(
+    db: Session = Depends(get_db),
+    sort: str = Query("utilisation", description="Tri, comme pour /stats/utilisation"),
+    days: Optional[int] = Query(None, ge=1, description="Fenêtre d'observation en jours (défaut : depuis l'acquisition)"),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Exporte l'utilisation de tous les livres au format CSV.
+    """
+    service = UtilisationService(db)
+    try:
+        lines = service.export_csv(sort=sort, days=days)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        lines,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="utilisation.csv"'}
+    )
\ No newline at end of file
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Dict
 
 from ...db.session import get_db
 from ...models.users import User as UserModel
-from ..schemas.users import User, UserCreate, UserUpdate
+from ..schemas.users import User, UserCreate, UserUpdate, UserImportResult
 from ...repositories.users import UserRepository
 from ...services.users import UserService
+from ...config import settings
 from ..dependencies import get_current_active_user, get_current_admin_user
+from ..profiling import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/", response_model=List[User])
@@ -51,6 +53,31 @@ def create_user(
         )
 
 
+@router.post("/import", response_model=UserImportResult)
+def import_users(
+    *,
+    db: Session = Depends(get_db),
+    rows: List[Dict[str, Any]] = Body(..., description="Utilisateurs à créer (champs de UserCreate)"),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Crée des utilisateurs en masse ; les lignes refusées sont rapportées sans bloquer les autres.
+    """
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import limité à {settings.USER_IMPORT_MAX_ROWS} lignes (au-delà : python -m src.cli.import_users)"
+        )
+
+    repository = UserRepository(UserModel, db)
+    service = UserService(repository)
+    return service.import_users(
+        rows=rows,
+        batch_size=settings.USER_IMPORT_BATCH_SIZE,
+        workers=settings.PASSWORD_HASH_WORKERS
+    )
+
+
 @router.get("/me", response_model=User)
 def read_user_me(
     current_user = Depends(get_current_active_user),
@@ -1,4 +1,8 @@
-from .books import Book, BookCreate, BookUpdate
-from .users import User, UserCreate, UserUpdate
-from .loans import Loan, LoanCreate, LoanUpdate
-from .token import Token, TokenPayload
\ No newline at end of file
+from .books import (
+    Book, BookCreate, BookDetail, BookUpdate, BookSuggestion, BookBulkDelete, BookBulkDeleteResult,
+    BookBulkUpdateItem, BookBulkUpdateResult, InventoryMovement
+)
+from .users import User, UserCreate, UserUpdate, UserImportError, UserImportResult
+from .loans import Loan, LoanCreate, LoanUpdate, LoanSummary
+from .token import Token, TokenPayload, TokenRevoke
+from .changes import ChangeEvent, ChangeFeed
\ No newline at end of file
@@ -1,12 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
 class BookBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100, description="Titre du livre")
     author: str = Field(..., min_length=1, max_length=100, description="Auteur du livre")
-    isbn: str = Field(..., min_length=10, max_length=13, description="ISBN du livre")
+    isbn: str = Field(..., min_length=10, max_length=17, description="ISBN-10 ou ISBN-13 du livre, tirets acceptés")
     publication_year: int = Field(..., ge=1000, le=datetime.now().year, description="Année de publication")
     description: Optional[str] = Field(None, max_length=1000, description="Description du livre")
     quantity: int = Field(..., ge=0, description="Nombre d'exemplaires disponibles")
@@ -19,14 +19,24 @@ class BookCreate(BookBase):
 class BookUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=100, description="Titre du livre")
     author: Optional[str] = Field(None, min_length=1, max_length=100, description="Auteur du livre")
-    isbn: Optional[str] = Field(None, min_length=10, max_length=13, description="ISBN du livre")
+    isbn: Optional[str] = Field(None, min_length=10, max_length=17, description="ISBN-10 ou ISBN-13 du livre, tirets acceptés")
     publication_year: Optional[int] = Field(None, ge=1000, le=datetime.now().year, description="Année de publication")
     description: Optional[str] = Field(None, max_length=1000, description="Description du livre")
     quantity: Optional[int] = Field(None, ge=0, description="Nombre d'exemplaires disponibles")
 
 
+class BookBulkUpdateItem(BookUpdate):
+    id: int = Field(..., description="ID du livre à modifier")
+
+
+class BookBulkUpdateResult(BaseModel):
+    updated: List[int]
+    not_found: List[int]
+
+
 class BookInDBBase(BookBase):
     id: int
+    isbn13: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -35,4 +45,36 @@ class BookInDBBase(BookBase):
 
 
 class Book(BookInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+class BookSuggestion(BaseModel):
+    id: int
+    title: str
+    author: str
+
+
+class BookDetail(Book):
+    also_borrowed: List[BookSuggestion] = Field(
+        default_factory=list, description="Livres empruntés par les lecteurs de ce livre"
+    )
+
+
+class BookBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, description="IDs des livres à supprimer")
+
+
+class BookBulkDeleteResult(BaseModel):
+    deleted: List[int]
+    not_found: List[int]
+
+
+class InventoryMovement(BaseModel):
+    id: int
+    book_id: int
+    delta: int = Field(..., description="Variation du stock (négative pour une sortie)")
+    reason: str = Field(..., description="checkout, return ou adjustment")
+    user_id: Optional[int] = Field(None, description="Emprunteur, pour un emprunt ou un retour")
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
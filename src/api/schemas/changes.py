@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from datetime import datetime
+
+from .books import Book
+from .loans import Loan
+
+
+class ChangeEvent(BaseModel):
+    id: int = Field(..., description="Position de l'événement dans le flux")
+    entity: str = Field(..., description="Type d'entité : book ou loan")
+    entity_id: int
+    operation: str = Field(..., description="create, update ou delete")
+    changed_at: datetime
+    data: Optional[Union[Book, Loan]] = Field(None, description="État actuel de l'entité, absent si supprimée")
+
+
+class ChangeFeed(BaseModel):
+    events: List[ChangeEvent]
+    cursor: int = Field(..., description="Curseur à transmettre à l'appel suivant")
+    has_more: bool = Field(..., description="D'autres événements sont disponibles immédiatement")
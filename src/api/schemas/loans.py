@@ -22,6 +22,7 @@ class LoanUpdate(BaseModel):
 
 class LoanInDBBase(LoanBase):
     id: int
+    is_overdue: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -30,4 +31,13 @@ class LoanInDBBase(LoanBase):
 
 
 class Loan(LoanInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+class LoanSummary(BaseModel):
+    user_id: int
+    total_loans: int = Field(..., description="Nombre total d'emprunts")
+    active_loans: int = Field(..., description="Emprunts en cours")
+    overdue_loans: int = Field(..., description="Emprunts en cours et en retard")
+    returned_loans: int = Field(..., description="Emprunts rendus")
+    returned_on_time: int = Field(..., description="Emprunts rendus au plus tard à l'échéance")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 
 class Token(BaseModel):
@@ -9,5 +10,11 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[int] = None
+    exp: Optional[datetime] = None
+    jti: Optional[str] = None  # Absent des tokens émis avant la révocation
+
+
+class TokenRevoke(BaseModel):
+    token: str
 
      
\ No newline at end of file
@@ -36,4 +36,15 @@ class User(UserInDBBase):
 
 
 class UserWithPassword(UserInDBBase):
-    hashed_password: str
\ No newline at end of file
+    hashed_password: str
+
+
+class UserImportError(BaseModel):
+    row: int = Field(..., description="Numéro de la ligne refusée (à partir de 1)")
+    email: Optional[str] = None
+    error: str
+
+
+class UserImportResult(BaseModel):
+    created: int = Field(..., description="Nombre d'utilisateurs créés")
+    errors: List[UserImportError] = Field(default_factory=list)
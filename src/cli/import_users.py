@@ -0,0 +1,91 @@
+"""
+Import d'utilisateurs en masse (inscriptions de rentrée) à partir d'un fichier CSV
+ou JSON : emails vérifiés en une requête, mots de passe hashés en parallèle,
+insertions groupées par transactions. Les lignes refusées sont listées avec leur
+numéro et la raison, sans bloquer les autres.
+
+Colonnes attendues : email, full_name, password, et facultativement is_active, is_admin.
+
+Exemples :
+    python -m src.cli.import_users etudiants.csv
+    python -m src.cli.import_users etudiants.json --workers 8 --errors rejets.csv
+"""
+import argparse
+import csv
+import json
+import sys
+from time import perf_counter
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from ..config import settings
+from ..db.session import enable_sqlite_foreign_keys
+from ..models.users import User
+from ..repositories.users import UserRepository
+from ..services.users import UserService
+from ..utils.security import shutdown_hash_executor
+
+BOOLEAN_COLUMNS = ("is_active", "is_admin")
+
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    """
+    Lit les lignes d'un fichier CSV (avec en-tête) ou JSON (liste d'objets).
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = []
+        for row in csv.DictReader(f):
+            # Cellules vides = valeur par défaut du schéma
+            row = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+            for column in BOOLEAN_COLUMNS:
+                if column in row:
+                    row[column] = row[column].lower() in ("1", "true", "oui", "yes", "o", "y")
+            rows.append(row)
+        return rows
+
+
+def write_errors(path: str, errors: List[Dict[str, Any]]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["row", "email", "error"])
+        writer.writeheader()
+        writer.writerows(errors)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="fichier CSV ou JSON des utilisateurs")
+    parser.add_argument("--batch-size", type=int, default=settings.USER_IMPORT_BATCH_SIZE, help="lignes par transaction")
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS, help="processus de hachage (0 = un par CPU)")
+    parser.add_argument("--errors", help="fichier CSV où écrire les lignes refusées")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="base cible (défaut : DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    rows = read_rows(args.path)
+    engine = create_engine(args.database_url)
+    enable_sqlite_foreign_keys(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    start = perf_counter()
+    try:
+        result = UserService(UserRepository(User, db)).import_users(
+            rows=rows, batch_size=args.batch_size, workers=args.workers
+        )
+    finally:
+        db.close()
+        shutdown_hash_executor()
+
+    print(f"{result['created']} utilisateurs créés sur {len(rows)} lignes en {perf_counter() - start:.1f} s")
+    for error in result["errors"]:
+        print(f"  ligne {error['row']} ({error['email']}) : {error['error']}", file=sys.stderr)
+    if args.errors:
+        write_errors(args.errors, result["errors"])
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
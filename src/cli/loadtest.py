@@ -0,0 +1,288 @@
+"""
+Générateur de charge HTTP : de nombreux clients asynchrones concurrents exécutent un
+mélange configurable de connexions, consultations du catalogue, recherches,
+emprunts/retours et statistiques, puis le débit et les latences p50/p95/p99 sont
+rapportés par endpoint.
+
+Sans --url, l'application ASGI est pilotée en processus (aucun réseau) ; avec --url,
+la charge vise une instance uvicorn déjà démarrée.
+
+Exemples :
+    python -m src.cli.loadtest --clients 50 --duration 30
+    python -m src.cli.loadtest --url http://127.0.0.1:8000 --clients 200 --duration 60
+    python -m src.cli.loadtest --mix browse=60,search=30,stats=10 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from time import perf_counter
+from typing import Dict, List, Optional
+
+import httpx
+
+from ..config import settings
+
+DEFAULT_MIX = "browse=35,book=20,search=20,autocomplete=10,checkout=6,return=6,stats=3"
+SEARCH_TERMS = (
+    "amour", "guerre", "nuit", "histoire", "secret", "voyage", "jardin", "temps", "monde", "python",
+    "martin", "dubois", "moreau", "simon", "garcia",
+)
+# Refus métier attendus par endpoint (livre indisponible, quota atteint, emprunt déjà rendu) :
+# comptés dans les statuts mais pas comme erreurs
+EXPECTED_STATUSES = {
+    "POST /loans/": {400},
+    "POST /loans/{id}/return": {400},
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Percentile par rang le plus proche d'une liste déjà triée.
+    """
+    if not values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """
+    Analyse un mélange de la forme `browse=40,search=20` en poids par scénario.
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"scénario inconnu : {name} (choix : {', '.join(SCENARIOS)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"poids invalide pour {name} : {weight!r}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("au moins un scénario doit avoir un poids positif")
+    return mix
+
+
+class Recorder:
+    """
+    Collecte les latences et les statuts par endpoint (gabarit de route). Est une erreur tout
+    échec de transport et tout statut >= 400 hors des refus attendus (EXPECTED_STATUSES).
+    """
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, duration: float, status_code: Optional[int]) -> None:
+        self.latencies[endpoint].append(duration)
+        if status_code is None or (status_code >= 400 and status_code not in EXPECTED_STATUSES.get(endpoint, ())):
+            self.errors[endpoint] += 1
+        self.statuses[endpoint][status_code or 0] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        """
+        Débit et percentiles de latence (en millisecondes) par endpoint, plus un total.
+        """
+        report = {}
+        everything = []
+        for endpoint in sorted(self.latencies):
+            durations = sorted(self.latencies[endpoint])
+            everything.extend(durations)
+            report[endpoint] = self._summary(durations, self.errors[endpoint], elapsed)
+            report[endpoint]["statuses"] = dict(sorted(self.statuses[endpoint].items()))
+        everything.sort()
+        report["TOTAL"] = self._summary(everything, sum(self.errors.values()), elapsed)
+        return report
+
+    @staticmethod
+    def _summary(durations: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+        return {
+            "requests": len(durations),
+            "errors": errors,
+            "rps": round(len(durations) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(durations, 50) * 1000, 2),
+            "p95_ms": round(percentile(durations, 95) * 1000, 2),
+            "p99_ms": round(percentile(durations, 99) * 1000, 2),
+            "max_ms": round(durations[-1] * 1000, 2) if durations else 0.0,
+        }
+
+
+class VirtualUser:
+    """
+    Client simulé : se connecte une fois puis enchaîne des scénarios tirés selon le mélange.
+    """
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, catalogue: Dict[str, int]):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.catalogue = catalogue
+        self.headers: Dict[str, str] = {}
+        self.open_loans: List[int] = []
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, perf_counter() - start, None)
+            return None
+        self.recorder.record(endpoint, perf_counter() - start, response.status_code)
+        return response
+
+    async def login(self, email: str, password: str) -> bool:
+        response = await self.request(
+            "POST /auth/login", "POST", "/auth/login", data={"username": email, "password": password}
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    def _book_id(self) -> int:
+        return self.rng.randint(1, max(self.catalogue["books"], 1))
+
+    async def browse(self) -> None:
+        skip = self.rng.randint(0, max(self.catalogue["books"] - 20, 0))
+        await self.request("GET /books/", "GET", "/books/", params={"skip": skip, "limit": 20})
+
+    async def book(self) -> None:
+        await self.request("GET /books/{id}", "GET", f"/books/{self._book_id()}")
+
+    async def search(self) -> None:
+        term = self.rng.choice(SEARCH_TERMS)
+        if self.rng.random() < 0.5:
+            await self.request("GET /books/search/title/{title}", "GET", f"/books/search/title/{term}")
+        else:
+            await self.request("GET /books/search/author/{author}", "GET", f"/books/search/author/{term}")
+
+    async def autocomplete(self) -> None:
+        term = self.rng.choice(SEARCH_TERMS)
+        prefix = term[:self.rng.randint(2, len(term))]
+        await self.request("GET /books/autocomplete", "GET", "/books/autocomplete", params={"q": prefix, "limit": 10})
+
+    async def checkout(self) -> None:
+        params = {"user_id": self.rng.randint(1, max(self.catalogue["users"], 1)), "book_id": self._book_id()}
+        response = await self.request("POST /loans/", "POST", "/loans/", params=params)
+        if response is not None and response.status_code == 201:
+            self.open_loans.append(response.json()["id"])
+
+    async def return_(self) -> None:
+        if not self.open_loans:
+            return await self.checkout()
+        loan_id = self.open_loans.pop(self.rng.randrange(len(self.open_loans)))
+        await self.request("POST /loans/{id}/return", "POST", f"/loans/{loan_id}/return")
+
+    async def stats(self) -> None:
+        await self.request("GET /stats/general", "GET", "/stats/general")
+
+    async def run(self, mix: Dict[str, float], deadline: float, max_requests: Optional[int]) -> None:
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        done = 0
+        while perf_counter() < deadline and (max_requests is None or done < max_requests):
+            await SCENARIOS[self.rng.choices(names, weights)[0]](self)
+            done += 1
+
+
+SCENARIOS = {
+    "browse": VirtualUser.browse,
+    "book": VirtualUser.book,
+    "search": VirtualUser.search,
+    "autocomplete": VirtualUser.autocomplete,
+    "checkout": VirtualUser.checkout,
+    "return": VirtualUser.return_,
+    "stats": VirtualUser.stats,
+}
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    """
+    Lance les clients simulés et retourne le rapport par endpoint.
+    """
+    async with AsyncExitStack() as stack:
+        if args.url:
+            base_url = args.url.rstrip("/") + settings.API_V1_STR
+            transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.clients))
+        else:
+            from ..main import app
+
+            # En processus, le cycle de vie (index de recherche, ...) doit être lancé explicitement
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            base_url = "http://loadtest" + settings.API_V1_STR
+            transport = httpx.ASGITransport(app=app)
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout)
+        )
+
+        recorder = Recorder()
+        rng = random.Random(args.seed)
+        users = [VirtualUser(client, recorder, random.Random(rng.random()), {}) for _ in range(args.clients)]
+
+        # Connexions initiales, limitées pour ne pas saturer le pool de threads avec bcrypt
+        semaphore = asyncio.Semaphore(args.login_concurrency)
+
+        async def login(user: VirtualUser) -> bool:
+            async with semaphore:
+                return await user.login(args.email, args.password)
+
+        logged_in = await asyncio.gather(*(login(user) for user in users))
+        users = [user for user, ok in zip(users, logged_in) if ok]
+        if not users:
+            raise RuntimeError(f"Connexion impossible avec {args.email}")
+
+        response = await client.get("/stats/general", headers=users[0].headers)
+        response.raise_for_status()
+        general = response.json()
+        catalogue = {"books": general["unique_books"], "users": general["total_users"]}
+        for user in users:
+            user.catalogue = catalogue
+
+        start = perf_counter()
+        await asyncio.gather(*(
+            user.run(args.mix, start + args.duration, args.requests) for user in users
+        ))
+        return recorder.report(perf_counter() - start)
+
+
+def format_report(report: Dict[str, Dict[str, float]]) -> str:
+    header = f"{'endpoint':<36} {'req':>8} {'err':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    lines = [header, "-" * len(header)]
+    for endpoint, row in report.items():
+        lines.append(
+            f"{endpoint:<36} {row['requests']:>8} {row['errors']:>6} {row['rps']:>9} "
+            f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL d'une instance uvicorn (défaut : application en processus)")
+    parser.add_argument("--clients", type=int, default=20, help="nombre de clients concurrents")
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de la charge en secondes")
+    parser.add_argument("--requests", type=int, help="nombre maximal de requêtes par client")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"poids des scénarios (défaut : {DEFAULT_MIX})")
+    parser.add_argument("--email", default="user1@example.org", help="compte administrateur utilisé par les clients")
+    parser.add_argument("--password", default="password123", help="mot de passe du compte")
+    parser.add_argument("--login-concurrency", type=int, default=4, help="connexions initiales simultanées")
+    parser.add_argument("--timeout", type=float, default=30.0, help="délai maximal d'une requête en secondes")
+    parser.add_argument("--seed", type=int, default=42, help="graine du tirage des scénarios")
+    parser.add_argument("--output", help="fichier JSON où écrire le rapport")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(args))
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 1 if report["TOTAL"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
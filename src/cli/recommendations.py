@@ -0,0 +1,47 @@
+"""
+Calcul hors ligne des recommandations « ont aussi emprunté » : matrice creuse
+emprunteurs × livres construite avec NumPy/SciPy, similarité cosinus entre livres,
+k plus proches voisins de chaque livre enregistrés dans book_recommendation.
+
+Sans option, seuls les livres concernés par les emprunts arrivés depuis le dernier
+calcul sont recalculés (le serveur le fait aussi périodiquement).
+
+Exemples :
+    python -m src.cli.recommendations --full
+    python -m src.cli.recommendations --database-url sqlite:///./load.db
+"""
+import argparse
+import sys
+from time import perf_counter
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from ..config import settings
+from ..db.session import enable_sqlite_foreign_keys
+from ..services.recommendations import refresh_recommendations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="recalcule les recommandations de tous les livres")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="base cible (défaut : DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    enable_sqlite_foreign_keys(engine)
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    start = perf_counter()
+    try:
+        result = refresh_recommendations(db, full=args.full)
+    finally:
+        db.close()
+
+    mode = "complet" if result["full"] else "incrémental"
+    print(f"Calcul {mode} : {result['books']} livres mis à jour en {perf_counter() - start:.1f} s "
+          f"(emprunts jusqu'à l'ID {result['position']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Générateur de données synthétiques à grande échelle (utilisateurs, livres, emprunts).
+
+Les distributions sont réalistes : popularité des livres en loi de Zipf,
+courbe saisonnière des emprunts (rentrées de septembre et janvier, creux
+estival), part configurable d'emprunts en retard. Le tirage est vectorisé
+avec NumPy et l'écriture se fait par insertions groupées en grandes
+transactions. Aucun livre n'a plus d'emprunts simultanés que d'exemplaires ;
+le stock enregistré est celui des exemplaires restés en rayon. Le résultat est
+déterministe pour une graine et une date de référence (--now) données.
+
+Exemples :
+    python -m src.cli.seed --loans 1000000
+    python -m src.cli.seed --loans 100000 --users 5000 --books 20000 --seed 7
+    python -m src.cli.seed --loans 100000 --now 2026-06-30T12:00:00
+    python -m src.cli.seed --loans 100000 --database-url sqlite:///./load.db --create-tables
+"""
+import argparse
+import heapq
+import sys
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+from sqlalchemy import Table, create_engine, event, insert
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+from ..models.base import Base
+from ..models.books import Book
+from ..models.loans import Loan
+from ..models.users import User
+from ..utils.security import get_password_hash
+
+BATCH_SIZE = 100000
+LOAN_PERIOD_DAYS = 14
+# Date de référence par défaut (« maintenant » des données générées) : même jeu à chaque exécution
+REFERENCE_DATE = datetime(2025, 1, 1)
+# Autres titres tentés par un lecteur dont le livre n'a plus d'exemplaire en rayon
+FALLBACK_BOOKS = 3
+
+# Colonnes d'une table : nom -> valeurs (tableau NumPy ou liste Python)
+Columns = Dict[str, Union[np.ndarray, Sequence]]
+
+TITLE_WORDS = np.array([
+    "amour", "guerre", "paix", "nuit", "mer", "ombre", "histoire", "secret", "voyage", "jardin",
+    "roi", "ville", "temps", "lumière", "silence", "monde", "rêve", "feu", "hiver", "mémoire",
+    "python", "données", "réseaux", "algorithmes", "physique", "chimie", "économie", "droit",
+])
+FIRST_NAMES = np.array([
+    "Jean", "Marie", "Pierre", "Sophie", "Luc", "Camille", "Paul", "Léa", "Hugo", "Emma", "Louis", "Chloé",
+])
+LAST_NAMES = np.array([
+    "Martin", "Bernard", "Dubois", "Durand", "Lefebvre", "Moreau", "Laurent", "Simon", "Michel",
+    "Garcia", "Roux", "Fournier", "Girard", "Bonnet", "Dupont", "Lambert", "Fontaine", "Rousseau",
+])
+
+
+def zipf_weights(n: int, exponent: float) -> np.ndarray:
+    """
+    Probabilités d'une loi de Zipf tronquée à `n` rangs.
+    """
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def seasonal_day_weights(start: datetime, days: int) -> np.ndarray:
+    """
+    Poids de chaque jour de la période : pics de rentrée (septembre, janvier),
+    creux en août et moins d'activité le dimanche.
+    """
+    dates = np.datetime64(start.date()) + np.arange(days)
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+    weekday = (dates.astype(np.int64) + 3) % 7  # 0 = lundi
+
+    september = np.exp(-((day_of_year - 258) ** 2) / (2 * 20.0 ** 2))
+    january = np.exp(-((day_of_year - 15) ** 2) / (2 * 15.0 ** 2))
+    august = np.exp(-((day_of_year - 220) ** 2) / (2 * 12.0 ** 2))
+    weights = 1.0 + 1.5 * september + 0.8 * january - 0.7 * august
+    weights *= np.where(weekday == 6, 0.2, 1.0)
+    return weights / weights.sum()
+
+
+def isbn13_array(ids: np.ndarray) -> np.ndarray:
+    """
+    ISBN-13 valides (préfixe 978, clé de contrôle calculée) dérivés d'identifiants.
+    """
+    base = 978000000000 + ids.astype(np.int64)
+    digits = (base[:, None] // 10 ** np.arange(11, -1, -1)) % 10
+    total = (digits * np.tile([1, 3], 6)).sum(axis=1)
+    check = (10 - total % 10) % 10
+    return np.char.add(base.astype(str), check.astype(str))
+
+
+def _driver_values(column, values, dialect) -> list:
+    """
+    Prépare les valeurs d'une colonne pour le pilote : les dates NumPy sont formatées
+    en bloc pour SQLite, les autres valeurs passent par le convertisseur du type.
+    """
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        if dialect.name == "sqlite":
+            # Même format que le type DateTime de SQLAlchemy pour SQLite
+            text = np.char.replace(np.datetime_as_string(values, unit="us"), "T", " ")
+            return np.where(np.isnat(values), None, text).tolist()
+        values = values.astype("datetime64[us]")
+    values = values.tolist() if isinstance(values, np.ndarray) else values
+    processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+    return list(map(processor, values)) if processor else values
+
+
+def _join(*parts: np.ndarray) -> np.ndarray:
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(np.char.add(result, " "), part)
+    return result
+
+
+def generate_users(rng: np.random.Generator, n: int, since: datetime) -> Columns:
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)]
+    ids = np.arange(1, n + 1).astype(str)
+    created_at = np.full(n, np.datetime64(since, "s"))
+    return {
+        "email": np.char.add(np.char.add("user", ids), "@example.org"),
+        "hashed_password": [get_password_hash("password123")] * n,
+        "full_name": _join(first, last),
+        "is_active": rng.random(n) > 0.03,
+        "is_admin": np.arange(n) == 0,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def generate_books(rng: np.random.Generator, n: int, since: datetime) -> Columns:
+    """
+    Livres présents au catalogue depuis `since`. `quantity` est ici le nombre d'exemplaires
+    possédés ; seed() y retranche les exemplaires sortis.
+    """
+    words = TITLE_WORDS[rng.integers(0, len(TITLE_WORDS), (n, 3))]
+    titles = np.char.capitalize(_join(words[:, 0], words[:, 1], words[:, 2]))
+    authors = _join(FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)], LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)])
+    isbns = isbn13_array(np.arange(1, n + 1))
+    created_at = np.full(n, np.datetime64(since, "s"))
+    return {
+        "title": titles,
+        "author": authors,
+        "isbn": isbns,
+        "isbn13": isbns,
+        "publication_year": rng.integers(1900, since.year + 1, n),
+        "quantity": 1 + rng.poisson(2.0, n),
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def assign_copies(choices: np.ndarray, starts: np.ndarray, ends: np.ndarray, copies: np.ndarray) -> np.ndarray:
+    """
+    Attribue les emprunts, par date de début, à un exemplaire en rayon du premier livre de
+    `choices` (une ligne par emprunt, livres par ordre de préférence) qui en a un. `ends` est
+    la date de retour (en secondes, comme `starts`), `copies` le nombre d'exemplaires par livre.
+    Retourne le livre attribué à chaque emprunt, 0 si tous les exemplaires étaient sortis.
+    """
+    # Par livre, date de retour de chaque exemplaire (tas : le premier revenu en tête, 0 = en rayon)
+    returns = [[0] * count for count in copies.tolist()]
+    choices = choices.tolist()
+    starts = starts.tolist()
+    ends = ends.tolist()
+    assigned = [0] * len(starts)
+    for i in sorted(range(len(starts)), key=starts.__getitem__):
+        for book in choices[i]:
+            slots = returns[book - 1]
+            if slots[0] <= starts[i]:
+                heapq.heapreplace(slots, ends[i])
+                assigned[i] = book
+                break
+    return np.array(assigned, dtype=np.int64)
+
+
+def generate_loans(
+    rng: np.random.Generator,
+    n: int,
+    *,
+    n_users: int,
+    copies: np.ndarray,
+    now: datetime,
+    days: int,
+    overdue_ratio: float
+) -> Columns:
+    """
+    Emprunts des `days` jours précédant `now`, dans la limite des exemplaires de chaque livre
+    (`copies`, indicé par ID - 1) : un lecteur dont le livre est entièrement sorti se rabat sur
+    un autre titre, et renonce si aucun n'est en rayon. Peut donc générer moins de `n` emprunts.
+    """
+    n_books = len(copies)
+    # Popularité : rang de Zipf attribué à des livres tirés au hasard
+    book_rank = rng.permutation(n_books) + 1
+    book_ids = book_rank[rng.choice(n_books, size=n, p=zipf_weights(n_books, 1.07))]
+    user_rank = rng.permutation(n_users) + 1
+    user_ids = user_rank[rng.choice(n_users, size=n, p=zipf_weights(n_users, 0.6))]
+
+    start = now - timedelta(days=days)
+    day_offsets = rng.choice(days, size=n, p=seasonal_day_weights(start, days))
+    seconds = rng.integers(8 * 3600, 20 * 3600, n)
+    loan_dates = (
+        np.datetime64(start.date(), "s")
+        + day_offsets.astype("timedelta64[D]")
+        + seconds.astype("timedelta64[s]")
+    )
+    due_dates = loan_dates + np.timedelta64(LOAN_PERIOD_DAYS, "D")
+    now64 = np.datetime64(now, "s")
+
+    # Retour après une durée de loi gamma (moyenne ~12 jours, quelques retards)
+    return_delays = (rng.gamma(4.0, 3.0, n) * 86400).astype("timedelta64[s]")
+    return_dates = loan_dates + return_delays
+    not_returned = return_dates > now64
+
+    # Une part des emprunts échus n'est jamais rendue : ce sont les retards
+    past_due = due_dates < now64
+    overdue = past_due & (rng.random(n) < overdue_ratio)
+    return_dates = np.where(not_returned | overdue, np.datetime64("NaT"), return_dates)
+
+    # Exemplaires sortis jusqu'au retour ; jamais revenus pour les emprunts en cours
+    never = np.iinfo(np.int64).max
+    ends = np.where(np.isnat(return_dates), never, return_dates.astype(np.int64))
+    fallbacks = rng.integers(1, n_books + 1, (n, FALLBACK_BOOKS))
+    book_ids = assign_copies(np.column_stack([book_ids, fallbacks]), loan_dates.astype(np.int64), ends, copies)
+    kept = book_ids > 0
+    user_ids, book_ids, loan_dates, due_dates, return_dates, past_due = (
+        values[kept] for values in (user_ids, book_ids, loan_dates, due_dates, return_dates, past_due)
+    )
+
+    # Indicateurs de l'échéancier : les emprunts déjà échus sont en retard et ont reçu leur rappel
+    overdue = np.isnat(return_dates) & past_due
+
+    return {
+        "user_id": user_ids,
+        "book_id": book_ids,
+        "loan_date": loan_dates,
+        "due_date": due_dates,
+        "return_date": return_dates,
+        "is_overdue": overdue,
+        "reminder_sent": overdue,
+        "created_at": loan_dates,
+        "updated_at": loan_dates,
+    }
+
+
+def bulk_insert(engine: Engine, table: Table, columns: Columns, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Insère des colonnes par lots `executemany` dans une seule transaction.
+    La requête est compilée une seule fois et les valeurs converties colonne par colonne.
+    """
+    dialect = engine.dialect
+    names = list(columns)
+    compiled = insert(table).compile(dialect=dialect, column_keys=names)
+    # Colonnes partageant le même tableau (created_at = loan_date, ...) converties une seule fois
+    converted = {}
+    values = {}
+    for name in names:
+        key = (id(columns[name]), type(table.c[name].type))
+        if key not in converted:
+            converted[key] = _driver_values(table.c[name], columns[name], dialect)
+        values[name] = converted[key]
+
+    if dialect.positional:
+        rows = list(zip(*(values[name] for name in compiled.positiontup)))
+    else:
+        rows = [dict(zip(names, row)) for row in zip(*(values[name] for name in names))]
+
+    with engine.begin() as connection:
+        for start in range(0, len(rows), batch_size):
+            connection.exec_driver_sql(compiled.string, rows[start:start + batch_size])
+    return len(rows)
+
+
+def _enable_fast_sqlite_load(engine: Engine) -> None:
+    # Chargement en masse : journal en mémoire et sans fsync, acceptable pour des données jetables
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+            cursor.close()
+
+
+def seed(
+    engine: Engine,
+    *,
+    loans: int,
+    users: Optional[int] = None,
+    books: Optional[int] = None,
+    days: int = 730,
+    overdue_ratio: float = 0.04,
+    seed_value: int = 42,
+    now: datetime = REFERENCE_DATE
+) -> Dict[str, int]:
+    """
+    Génère et insère un jeu de données complet dans une base dont les tables sont vides.
+    Toutes les dates sont dérivées de `now`. Retourne le nombre de lignes insérées par table.
+    """
+    rng = np.random.default_rng(seed_value)
+    now = now.replace(microsecond=0)
+    since = now - timedelta(days=days)
+    n_users = users or max(loans // 20, 10)
+    n_books = books or max(loans // 10, 10)
+
+    user_columns = generate_users(rng, n_users, since)
+    book_columns = generate_books(rng, n_books, since)
+    loan_columns = generate_loans(
+        rng, loans, n_users=n_users, copies=book_columns["quantity"], now=now, days=days, overdue_ratio=overdue_ratio
+    )
+    # Stock en rayon : exemplaires possédés moins les exemplaires sortis
+    out = loan_columns["book_id"][np.isnat(loan_columns["return_date"])]
+    book_columns["quantity"] = book_columns["quantity"] - np.bincount(out - 1, minlength=n_books)
+
+    counts = {}
+    counts["users"] = bulk_insert(engine, User.__table__, user_columns)
+    counts["books"] = bulk_insert(engine, Book.__table__, book_columns)
+    counts["loans"] = bulk_insert(engine, Loan.__table__, loan_columns)
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loans", type=int, required=True, help="nombre d'emprunts à générer")
+    parser.add_argument("--users", type=int, help="nombre d'utilisateurs (défaut : emprunts / 20)")
+    parser.add_argument("--books", type=int, help="nombre de livres (défaut : emprunts / 10)")
+    parser.add_argument("--days", type=int, default=730, help="profondeur de l'historique en jours")
+    parser.add_argument("--overdue-ratio", type=float, default=0.04, help="part des emprunts échus non rendus")
+    parser.add_argument("--seed", type=int, default=42, help="graine du générateur aléatoire")
+    parser.add_argument(
+        "--now", type=datetime.fromisoformat, default=REFERENCE_DATE,
+        help=f"date de référence des données, UTC (défaut : {REFERENCE_DATE.isoformat()})"
+    )
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="base cible (défaut : DATABASE_URL)")
+    parser.add_argument("--create-tables", action="store_true", help="crée les tables manquantes avant l'insertion")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    _enable_fast_sqlite_load(engine)
+    if args.create_tables:
+        Base.metadata.create_all(engine)
+
+    start = perf_counter()
+    counts = seed(
+        engine,
+        loans=args.loans,
+        users=args.users,
+        books=args.books,
+        days=args.days,
+        overdue_ratio=args.overdue_ratio,
+        seed_value=args.seed,
+        now=args.now,
+    )
+    print(f"{counts} insérés en {perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Lanceur de production : l'application est importée une seule fois (préchargement),
+le socket d'écoute est ouvert par le processus parent puis partagé par N processus
+uvicorn créés par fork. Chaque processus se préchauffe (connexions du pool, index de
+recherche, cache ISBN) avant d'accepter des connexions, et s'arrête proprement en
+laissant les requêtes en cours (emprunts, retours, ...) se terminer. Seul le processus 0
+exécute les tâches de maintenance (purges, compactage, archivage, échéancier).
+Les métriques de chaque processus sont déposées dans un répertoire partagé
+(METRICS_MULTIPROC_DIR) : /metrics renvoie leur somme, quel que soit le processus qui répond.
+
+Les valeurs par défaut viennent de `Settings` (HOST, PORT, WORKERS, GRACEFUL_TIMEOUT,
+KEEPALIVE_TIMEOUT) et peuvent être surchargées en ligne de commande.
+
+Exemples :
+    python -m src.cli.serve
+    python -m src.cli.serve --workers 4 --port 8080
+"""
+import argparse
+import logging
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+from typing import Dict, Optional
+
+import uvicorn
+
+from ..config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Délai avant de relancer un processus, doublé à chaque échec au démarrage jusqu'à RESPAWN_MAX_DELAY
+RESPAWN_DELAY = 1.0
+RESPAWN_MAX_DELAY = 60.0
+# Un processus mort moins de STARTUP_GRACE secondes après son lancement a échoué au démarrage ;
+# après MAX_STARTUP_FAILURES échecs consécutifs, le serveur s'arrête au lieu de relancer sans fin
+STARTUP_GRACE = 30.0
+MAX_STARTUP_FAILURES = 5
+
+
+def worker_count(requested: int) -> int:
+    """
+    Nombre de processus à lancer : la valeur demandée, ou un par CPU si elle vaut 0.
+    """
+    return requested if requested > 0 else (os.cpu_count() or 1)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """
+    Ouvre le socket d'écoute partagé par tous les processus.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """
+    Processus parent : crée les processus de travail, les relance s'ils meurent
+    et propage l'arrêt progressif.
+    """
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        sock: socket.socket,
+        workers: int,
+        graceful_timeout: int,
+        metrics_dir: Optional[str] = None
+    ):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.metrics_dir = metrics_dir
+        self.children: Dict[int, int] = {}
+        self.stopping = False
+        self.exit_code = 0
+        # Par processus : instant du dernier lancement et échecs consécutifs au démarrage
+        self.started: Dict[int, float] = {}
+        self.failures: Dict[int, int] = {}
+
+    def spawn(self, index: int) -> None:
+        self.started[index] = time.monotonic()
+        pid = os.fork()
+        if pid:
+            self.children[pid] = index
+            logger.info("Processus %s démarré (pid %s)", index, pid)
+            return
+
+        # Processus fils : groupe propre, pour que Ctrl-C ne soit reçu qu'une fois (via le parent)
+        os.setpgid(0, 0)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+            signal.signal(signum, signal.SIG_DFL)
+        # Tâches de maintenance dans un seul processus (relancé avec le même index s'il meurt)
+        settings.MAINTENANCE_ENABLED = settings.MAINTENANCE_ENABLED and index == 0
+        if self.metrics_dir is not None:
+            from ..utils.metrics import registry
+            registry.share(self.metrics_dir, str(index))
+        code = 0
+        try:
+            serve(self.config, self.sock)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def stop(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Arrêt demandé : fin des requêtes en cours (%s s maximum)", self.graceful_timeout)
+        self._signal_children(signal.SIGTERM)
+        # Filet de sécurité si un processus ne se termine pas dans le délai
+        signal.alarm(self.graceful_timeout + 5)
+
+    def kill(self, signum, frame) -> None:
+        logger.warning("Délai d'arrêt dépassé : arrêt forcé des processus restants")
+        self._signal_children(signal.SIGKILL)
+
+    def _signal_children(self, signum: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGALRM, self.kill)
+
+        for index in range(self.workers):
+            self.spawn(index)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.children.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            if time.monotonic() - self.started[index] < STARTUP_GRACE:
+                self.failures[index] = self.failures.get(index, 0) + 1
+            else:
+                self.failures[index] = 0
+            if self.failures[index] >= MAX_STARTUP_FAILURES:
+                logger.error(
+                    "Processus %s (pid %s) : %s échecs consécutifs au démarrage (statut %s), arrêt du serveur",
+                    index, pid, self.failures[index], status,
+                )
+                self.exit_code = 1
+                self.stop(None, None)
+                continue
+            delay = min(RESPAWN_DELAY * 2 ** self.failures[index], RESPAWN_MAX_DELAY)
+            logger.warning(
+                "Processus %s (pid %s) terminé de façon inattendue (statut %s), relance dans %.0f s",
+                index, pid, status, delay,
+            )
+            self._sleep(delay)
+            if not self.stopping:
+                self.spawn(index)
+
+        self.sock.close()
+        return self.exit_code
+
+    def _sleep(self, delay: float) -> None:
+        # Attente interrompue par une demande d'arrêt
+        deadline = time.monotonic() + delay
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(max(0.0, min(0.1, deadline - time.monotonic())))
+
+
+def serve(config: uvicorn.Config, sock: socket.socket) -> None:
+    """
+    Exécute un serveur uvicorn sur le socket partagé, dans le processus courant.
+    """
+    from ..db.session import engine
+
+    # Les connexions éventuellement ouvertes avant le fork appartiennent au parent
+    engine.dispose(close=False)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.HOST, help="adresse d'écoute")
+    parser.add_argument("--port", type=int, default=settings.PORT, help="port d'écoute")
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="nombre de processus (0 = un par CPU)")
+    parser.add_argument("--graceful-timeout", type=int, default=settings.GRACEFUL_TIMEOUT, help="délai d'arrêt progressif en secondes")
+    parser.add_argument("--keepalive-timeout", type=int, default=settings.KEEPALIVE_TIMEOUT, help="durée de vie des connexions inactives en secondes")
+    parser.add_argument("--log-level", default="info", help="niveau de journalisation uvicorn")
+    parser.add_argument("--no-access-log", action="store_true", help="désactive le journal des accès")
+    args = parser.parse_args(argv)
+
+    # Préchargement : import et construction de l'application une seule fois, avant le fork
+    from ..main import app
+
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+        timeout_keep_alive=args.keepalive_timeout,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    sock = bind_socket(args.host, args.port)
+    workers = worker_count(args.workers)
+    logger.info("Écoute sur %s:%s avec %s processus", args.host, args.port, workers)
+
+    if workers == 1 or not hasattr(os, "fork"):
+        serve(config, sock)
+        return 0
+    if not settings.METRICS_ENABLED:
+        return Supervisor(config, sock, workers, args.graceful_timeout).run()
+
+    # Métriques agrégées entre processus : états du lancement précédent effacés
+    metrics_dir = settings.METRICS_MULTIPROC_DIR or tempfile.mkdtemp(prefix="library-metrics-")
+    os.makedirs(metrics_dir, exist_ok=True)
+    for entry in os.scandir(metrics_dir):
+        if entry.is_file() and entry.name.endswith(".json"):
+            os.remove(entry.path)
+    try:
+        return Supervisor(config, sock, workers, args.graceful_timeout, metrics_dir).run()
+    finally:
+        if not settings.METRICS_MULTIPROC_DIR:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,10 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 jours
+    # Filtre de Bloom des tokens révoqués (agrandi automatiquement au-delà de la capacité)
+    REVOKED_TOKEN_BLOOM_CAPACITY: int = 100000
+    REVOKED_TOKEN_BLOOM_ERROR_RATE: float = 0.001
+    REVOKED_TOKEN_PURGE_INTERVAL: int = 3600  # Secondes entre deux purges des tokens expirés
 
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -16,6 +20,69 @@ class Settings(BaseSettings):
     # Base de données
     DATABASE_URL: str = "sqlite:///./library.db"
 
+    # Observabilité
+    METRICS_ENABLED: bool = True
+    # Avec plusieurs processus : répertoire où chacun dépose ses métriques, additionnées par /metrics
+    # (vide : répertoire temporaire créé par le superviseur) et intervalle entre deux dépôts (secondes)
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_DUMP_INTERVAL: float = 1.0
+    SQL_DEBUG: bool = False  # Trace SQL par requête et détection des N+1 (développement)
+    SQL_DEBUG_N_PLUS_ONE_THRESHOLD: int = 5
+    PROFILING_ENABLED: bool = False  # Profilage à la demande des requêtes (administrateurs)
+    PROFILE_DIR: str = "./profiles"
+
+    # Caches
+    BOOK_CACHE_SIZE: int = 10000  # Cache de second niveau (lignes en mémoire par processus)
+    USER_CACHE_SIZE: int = 10000
+    BOOK_CACHE_WARM_SIZE: int = 1000  # Livres les plus empruntés préchargés au démarrage
+    CHANGE_LOG_POLL_INTERVAL: float = 1.0  # Lecture du journal des modifications (secondes)
+    CHANGE_LOG_RETENTION_DAYS: int = 7
+
+    # Tâches de maintenance (purges, compactage, archivage, recommandations, échéancier) dans ce
+    # processus ; avec plusieurs processus, le superviseur ne les laisse qu'au processus 0
+    MAINTENANCE_ENABLED: bool = True
+
+    # Archivage des emprunts rendus dans loan_history
+    LOAN_ARCHIVE_ENABLED: bool = True
+    LOAN_ARCHIVE_AFTER_DAYS: int = 90  # Ancienneté du retour avant archivage
+    LOAN_ARCHIVE_BATCH_SIZE: int = 5000
+    LOAN_ARCHIVE_INTERVAL: int = 3600  # Secondes entre deux passages
+
+    # Échéancier des emprunts (rappels et passage en retard)
+    LOAN_REMINDER_DAYS: int = 2  # Rappel envoyé ce nombre de jours avant l'échéance
+
+    # Import d'utilisateurs en masse (POST /users/import, python -m src.cli.import_users)
+    # Hachage synchrone dans la requête : les gros imports passent par la ligne de commande
+    USER_IMPORT_MAX_ROWS: int = 500
+    USER_IMPORT_BATCH_SIZE: int = 1000  # Lignes par transaction
+    PASSWORD_HASH_WORKERS: int = 0  # Processus de hachage (0 = un par CPU)
+
+    # Journal des mouvements de stock : compactage périodique dans la quantité des livres
+    INVENTORY_COMPACTION_INTERVAL: int = 300  # Secondes entre deux compactages
+
+    # Recommandations « ont aussi emprunté » (GET /books/{id}), calculées hors ligne
+    RECOMMENDATION_COUNT: int = 10  # Livres recommandés par livre
+    RECOMMENDATION_MIN_CO_BORROWERS: int = 2  # Emprunteurs communs minimum
+    RECOMMENDATION_BATCH_SIZE: int = 1000  # Livres par produit matriciel
+    RECOMMENDATION_REFRESH_INTERVAL: int = 900  # Secondes entre deux mises à jour incrémentales
+
+    # Rapport d'utilisation du fonds (GET /stats/utilisation), réutilisé entre les pages
+    UTILISATION_CACHE_TTL: int = 300  # Secondes
+
+    # Regroupement des lectures identiques simultanées (livres, statistiques)
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_TIMEOUT: float = 10.0  # Attente maximale d'un calcul en cours (secondes)
+
+    # Opérations groupées sur le catalogue (PATCH /books/, POST /books/bulk-delete)
+    BOOK_BULK_MAX_ITEMS: int = 10000
+
+    # Serveur de production (python -m src.cli.serve)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 0  # 0 = un processus par CPU
+    GRACEFUL_TIMEOUT: int = 30  # Délai laissé aux requêtes en cours à l'arrêt (secondes)
+    KEEPALIVE_TIMEOUT: int = 5
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,13 +1,148 @@
+from contextlib import asynccontextmanager
+from typing import List
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
 
 from .config import settings
+from .api.middleware import MetricsMiddleware, ProfilingMiddleware, SQLDebugMiddleware
 from .api.routes import api_router
+from .db.session import SessionLocal, engine
 from .models import base, books, users, loans  # Importer les modèles pour Alembic
+from .models.books import Book
+from .repositories.books import BookRepository
+from .services.books import BookService, compact_inventory
+from .services.changes import change_listener, poll_changes, purge_change_log
+from .services.due_dates import due_date_scheduler
+from .services.loans import archive_returned_loans
+from .services.recommendations import refresh_recommendations
+from .services.tokens import purge_revoked_tokens, revocation_list
+from .services.search import build_book_search_index
+from .utils.background import PeriodicTask
+from .utils.metrics import instrument_engine, registry
+from .utils.security import shutdown_hash_executor
+from .utils.sql_debug import instrument_sql_debug
+
+
+def warm_up() -> None:
+    """
+    Prépare le processus à servir : connexions du pool ouvertes et caches en mémoire chargés.
+    """
+    # Ouverture anticipée des connexions, rendues aussitôt au pool
+    pool_size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    connections = [engine.connect() for _ in range(pool_size)]
+    for connection in connections:
+        connection.exec_driver_sql("SELECT 1")
+        connection.close()
+
+    db = SessionLocal()
+    try:
+        change_listener.start(db)
+        build_book_search_index(db)
+        BookService(BookRepository(Book, db)).warm_cache(limit=settings.BOOK_CACHE_WARM_SIZE)
+        # Échéancier tenu par le seul processus de maintenance
+        due_date_scheduler.enabled = settings.MAINTENANCE_ENABLED
+        if settings.MAINTENANCE_ENABLED:
+            due_date_scheduler.start(db)
+        revocation_list.load(db)
+    finally:
+        db.close()
+
+
+def _with_session(func):
+    def run():
+        db = SessionLocal()
+        try:
+            func(db)
+        finally:
+            db.close()
+    return run
+
+
+def maintenance_tasks() -> List[PeriodicTask]:
+    """
+    Tâches d'écriture périodiques, exécutées par un seul processus.
+    """
+    tasks = [
+        # Purge du journal des modifications une fois par heure
+        PeriodicTask(
+            "change-log-purge",
+            3600,
+            _with_session(lambda db: purge_change_log(db, settings.CHANGE_LOG_RETENTION_DAYS)),
+        ),
+        # Révocations des tokens expirés, filtre de Bloom reconstruit ensuite
+        PeriodicTask(
+            "revoked-token-purge",
+            settings.REVOKED_TOKEN_PURGE_INTERVAL,
+            _with_session(purge_revoked_tokens),
+        ),
+        # Mouvements de stock reportés dans la quantité des livres
+        PeriodicTask(
+            "inventory-compaction",
+            settings.INVENTORY_COMPACTION_INTERVAL,
+            _with_session(compact_inventory),
+        ),
+        # Recommandations des livres concernés par les nouveaux emprunts
+        PeriodicTask(
+            "recommendation-refresh",
+            settings.RECOMMENDATION_REFRESH_INTERVAL,
+            _with_session(refresh_recommendations),
+        ),
+    ]
+    # Déplacement des emprunts rendus anciens vers loan_history
+    if settings.LOAN_ARCHIVE_ENABLED:
+        tasks.append(PeriodicTask(
+            "loan-archive",
+            settings.LOAN_ARCHIVE_INTERVAL,
+            _with_session(lambda db: archive_returned_loans(
+                db,
+                older_than_days=settings.LOAN_ARCHIVE_AFTER_DAYS,
+                batch_size=settings.LOAN_ARCHIVE_BATCH_SIZE,
+            )),
+        ))
+    return tasks
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Préchauffage avant d'accepter des requêtes
+    warm_up()
+
+    # Suivi des écritures des autres processus, dans chaque processus
+    tasks = [PeriodicTask("change-log-poll", settings.CHANGE_LOG_POLL_INTERVAL, _with_session(poll_changes))]
+    if settings.MAINTENANCE_ENABLED:
+        tasks += maintenance_tasks()
+    else:
+        # Filtre de Bloom reconstruit localement (lecture seule) après les purges du processus de maintenance
+        tasks.append(PeriodicTask(
+            "revoked-token-reload",
+            settings.REVOKED_TOKEN_PURGE_INTERVAL,
+            _with_session(revocation_list.load),
+        ))
+    # Métriques déposées pour l'export agrégé des autres processus (lancement multiprocessus)
+    if registry.shared:
+        tasks.append(PeriodicTask("metrics-dump", settings.METRICS_DUMP_INTERVAL, registry.dump))
+    for task in tasks:
+        task.start()
+    # Rappels et passages en retard, au fil des échéances
+    if settings.MAINTENANCE_ENABLED:
+        due_date_scheduler.run_in_background(SessionLocal)
+    yield
+    if settings.MAINTENANCE_ENABLED:
+        due_date_scheduler.stop(timeout=5)
+    for task in tasks:
+        task.stop(timeout=5)
+    if registry.shared:
+        registry.dump()
+    shutdown_hash_executor()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Configuration CORS
@@ -18,8 +153,24 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Nombre total des listes paginées
+        expose_headers=["X-Total-Count"],
     )
 
+# Instrumentation (métriques HTTP et SQL)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Mode debug SQL : trace par requête et détection des N+1 (à n'activer qu'en développement)
+if settings.SQL_DEBUG:
+    instrument_sql_debug(engine)
+    app.add_middleware(SQLDebugMiddleware)
+
+# Profilage à la demande (X-Profile: 1), réservé aux administrateurs
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Inclusion des routes API
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -28,6 +179,14 @@ def read_root():
     return {"message": "Welcome to the Library Management System API"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """
+    Expose les métriques au format texte Prometheus.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 
 
 # @app.get("/users")
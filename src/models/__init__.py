@@ -1,4 +1,8 @@
 from .base import Base
 from .books import Book
 from .users import User
-from .loans import Loan
\ No newline at end of file
+from .loans import Loan, LoanHistory
+from .changes import ChangeLog
+from .tokens import RevokedToken
+from .inventory import InventoryMovement, InventorySnapshot
+from .recommendations import BookRecommendation, RecommendationBuild
@@ -1,16 +1,42 @@
-from sqlalchemy import Column, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, func, select
+from sqlalchemy.orm import column_property, relationship
 
 from .base import Base
+from .inventory import InventoryMovement, InventorySnapshot
 
 
 class Book(Base):
     title = Column(String(100), nullable=False, index=True)
     author = Column(String(100), nullable=False, index=True)
     isbn = Column(String(13), nullable=False, unique=True, index=True)
+    isbn13 = Column(String(13), nullable=True, unique=True, index=True)  # ISBN-13 canonique
     publication_year = Column(Integer, nullable=False)
     description = Column(Text, nullable=True)
-    quantity = Column(Integer, nullable=False, default=0)
+    # Stock au dernier compactage du journal des mouvements (voir `quantity` pour le stock courant)
+    quantity_snapshot = Column("quantity", Integer, nullable=False, default=0)
 
-    # Relations
-    loans = relationship("Loan", back_populates="book", cascade="all, delete-orphan")
\ No newline at end of file
+    # Relations (emprunts supprimés par la base : ON DELETE CASCADE)
+    loans = relationship("Loan", back_populates="book", cascade="all, delete-orphan", passive_deletes=True)
+
+    def __init__(self, **kwargs):
+        # La quantité d'un nouveau livre constitue son premier instantané
+        if "quantity" in kwargs:
+            kwargs["quantity_snapshot"] = kwargs.pop("quantity")
+        super().__init__(**kwargs)
+
+
+def snapshot_position():
+    """
+    Position du dernier compactage : les mouvements d'ID supérieur ne sont pas encore reportés.
+    """
+    return select(func.coalesce(func.max(InventorySnapshot.position), 0)).scalar_subquery()
+
+
+# Stock courant : instantané + mouvements postérieurs (index ix_inventory_movement_book_id_id),
+# calculé en SQL à chaque lecture du livre, jamais mis en cache
+Book.quantity = column_property(
+    Book.quantity_snapshot + select(func.coalesce(func.sum(InventoryMovement.delta), 0))
+    .where(InventoryMovement.book_id == Book.id, InventoryMovement.id > snapshot_position())
+    .correlate_except(InventoryMovement)
+    .scalar_subquery()
+)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Index, Integer, String
+
+from .base import Base
+
+
+class ChangeLog(Base):
+    """
+    Journal des écritures (ajout seul), lu par chaque processus pour invalider ses caches.
+    """
+    # AUTOINCREMENT : identifiants strictement croissants, jamais réutilisés après une purge
+    __table_args__ = (
+        Index("ix_change_log_created_at", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
+
+    entity = Column(String(50), nullable=False)  # Nom de la table modifiée
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)  # create, update ou delete
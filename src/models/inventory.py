@@ -0,0 +1,36 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+
+from .base import Base
+
+# Motifs des mouvements de stock
+CHECKOUT = "checkout"
+RETURN = "return"
+ADJUSTMENT = "adjustment"
+
+
+class InventoryMovement(Base):
+    """
+    Journal des mouvements de stock (ajout seul) : chaque emprunt, retour ou correction
+    d'inventaire ajoute une ligne au lieu de réécrire la quantité du livre.
+    """
+    __table_args__ = (
+        # Mouvements d'un livre postérieurs au dernier instantané (stock courant, historique)
+        Index("ix_inventory_movement_book_id_id", "book_id", "id"),
+        # AUTOINCREMENT : un ID supprimé (cascade d'un livre) n'est jamais réattribué, sinon un
+        # nouveau mouvement pourrait tomber sous la position du dernier instantané et être ignoré
+        {"sqlite_autoincrement": True},
+    )
+
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String(20), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="SET NULL"), nullable=True, index=True)  # Emprunteur
+
+
+class InventorySnapshot(Base):
+    """
+    Compactages du journal : les mouvements jusqu'à `position` (inclus) sont reportés
+    dans la quantité enregistrée de chaque livre.
+    """
+    position = Column(Integer, nullable=False, index=True)
+    books = Column(Integer, nullable=False)  # Livres mis à jour par le compactage
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, Integer, ForeignKey, DateTime, Index, false, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -6,12 +6,49 @@ from .base import Base
 
 
 class Loan(Base):
-    user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
-    book_id = Column(Integer, ForeignKey("book.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), nullable=False, index=True)
     loan_date = Column(DateTime, default=datetime.utcnow, nullable=False)
     return_date = Column(DateTime, nullable=True)
     due_date = Column(DateTime, nullable=False)
+    # Maintenus par l'échéancier (services/due_dates.py) : retard en cours, rappel envoyé
+    is_overdue = Column(Boolean, default=False, server_default=false(), nullable=False)
+    reminder_sent = Column(Boolean, default=False, server_default=false(), nullable=False)
+
+    # Index partiels : échéances des emprunts actifs, emprunts en retard
+    __table_args__ = (
+        Index("ix_loan_active_due_date", "due_date", sqlite_where=text("return_date IS NULL"),
+              postgresql_where=text("return_date IS NULL")),
+        # SQLite n'utilise un index partiel que si la requête reprend ses conditions à l'identique
+        Index("ix_loan_overdue_due_date", "due_date", sqlite_where=text("return_date IS NULL AND is_overdue = 1"),
+              postgresql_where=text("return_date IS NULL AND is_overdue")),
+        # Filtres par emprunteur ou par livre des emprunts actifs (et tri par emprunteur)
+        Index("ix_loan_active_user_id", "user_id", "due_date", sqlite_where=text("return_date IS NULL"),
+              postgresql_where=text("return_date IS NULL")),
+        Index("ix_loan_active_book_id", "book_id", "due_date", sqlite_where=text("return_date IS NULL"),
+              postgresql_where=text("return_date IS NULL")),
+        # Historique paginé d'un emprunteur, du plus récent au plus ancien
+        Index("ix_loan_user_id_loan_date", "user_id", "loan_date"),
+        # AUTOINCREMENT : un ID archivé dans loan_history n'est jamais réattribué à un nouvel emprunt
+        {"sqlite_autoincrement": True},
+    )
 
     # Relations
     user = relationship("User", back_populates="loans")
-    book = relationship("Book", back_populates="loans")
\ No newline at end of file
+    book = relationship("Book", back_populates="loans")
+
+
+class LoanHistory(Base):
+    """
+    Emprunts rendus archivés, déplacés hors de la table `loan` (même identifiant).
+    """
+    __table_args__ = (
+        Index("ix_loan_history_user_id_loan_date", "user_id", "loan_date"),
+    )
+
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), nullable=False, index=True)
+    loan_date = Column(DateTime, nullable=False)
+    return_date = Column(DateTime, nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
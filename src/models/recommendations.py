@@ -0,0 +1,28 @@
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Index, Integer
+
+from .base import Base
+
+
+class BookRecommendation(Base):
+    """
+    Livres empruntés par les mêmes lecteurs (« ont aussi emprunté »), calculés hors ligne :
+    voisins les plus proches de chaque livre, du rang 0 (le plus similaire) au rang k - 1.
+    """
+    __table_args__ = (
+        # Recommandations d'un livre dans l'ordre : une lecture d'index par affichage
+        Index("ix_book_recommendation_book_id_rank", "book_id", "rank", unique=True),
+    )
+
+    book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), nullable=False)
+    recommended_book_id = Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), nullable=False, index=True)
+    rank = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)  # Similarité cosinus des emprunteurs (0 à 1)
+
+
+class RecommendationBuild(Base):
+    """
+    Calculs des recommandations : les emprunts d'ID inférieur ou égal à `position` sont pris en compte.
+    """
+    position = Column(Integer, nullable=False, index=True)
+    books = Column(Integer, nullable=False)  # Livres dont les recommandations ont été recalculées
+    full = Column(Boolean, nullable=False, default=False)  # Recalcul complet ou incrémental
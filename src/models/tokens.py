@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from .base import Base
+
+
+class RevokedToken(Base):
+    """
+    Tokens d'accès révoqués (déconnexion, poste compromis), conservés jusqu'à leur expiration.
+    """
+    jti = Column(String(32), nullable=False, unique=True, index=True)  # Identifiant du token (claim jti)
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="SET NULL"), nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
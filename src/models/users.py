@@ -11,5 +11,5 @@ class User(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
 
-    # Relations
-    loans = relationship("Loan", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    # Relations (emprunts supprimés par la base : ON DELETE CASCADE)
+    loans = relationship("Loan", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
\ No newline at end of file
@@ -1,10 +1,14 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from collections import defaultdict
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Column, bindparam, delete, inspect, insert, literal, select
+from sqlalchemy.orm import Query, Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 
 from ..models.base import Base
+from ..models.changes import ChangeLog
+from .cache import EntityCache
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -12,6 +16,11 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Cache de second niveau partagé entre les sessions (None : pas de cache pour ce modèle)
+    cache: Optional[EntityCache] = None
+    # Modèles dont les lignes sont supprimées avec ce modèle (ON DELETE CASCADE) et suivies par le journal
+    logged_cascades: Tuple[Type[Base], ...] = ()
+
     def __init__(self, model: Type[ModelType], db: Session):
         """
         Initialise le repository avec un modèle et une session de base de données.
@@ -19,11 +28,55 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
         self.db = db
 
-    def get(self, id: Any) -> Optional[ModelType]:
+    def get(self, id: Any, *, use_cache: bool = True) -> Optional[ModelType]:
+        """
+        Récupère un objet par son ID, depuis la session ou le cache de second niveau si possible.
+        `use_cache=False` force la lecture en base (lecture avant modification).
+        """
+        query = self.db.query(self.model).filter(self.model.id == id)
+        if not use_cache:
+            # Valeurs relues même si l'objet est déjà dans la session (éventuellement issu du cache)
+            return query.populate_existing().first()
+        if self.cache is None:
+            return query.first()
+        try:
+            id = int(id)
+        except (TypeError, ValueError):
+            return query.first()
+
+        # Objet de la session à jour ; les expressions calculées (hors cache) sont lues à l'accès
+        obj = self.db.identity_map.get(identity_key(self.model, id))
+        if obj is not None and not inspect(obj).expired_attributes - self._computed_columns():
+            return obj
+
+        data = self.cache.get(id)
+        if data is not None and obj is None:
+            return self._from_cache(data)
+        return self._load_cached(query)
+
+    def get_many(self, ids: List[Any]) -> List[ModelType]:
+        """
+        Récupère plusieurs objets par leurs IDs, dans l'ordre des IDs fournis.
+        """
+        if not ids:
+            return []
+        objs = self.db.query(self.model).filter(self.model.id.in_(ids)).all()
+        by_id = {obj.id: obj for obj in objs}
+        return [by_id[id] for id in ids if id in by_id]
+
+    def warm_cache(self, *, ids: List[Any], batch_size: int = 500) -> int:
         """
-        Récupère un objet par son ID.
+        Charge des objets dans le cache de second niveau et retourne leur nombre.
         """
-        return self.db.query(self.model).filter(self.model.id == id).first()
+        if self.cache is None:
+            return 0
+        count = 0
+        for start in range(0, len(ids), batch_size):
+            generation = self.cache.generation
+            for obj in self.db.query(self.model).filter(self.model.id.in_(ids[start:start + batch_size])):
+                self.cache.set(self._cache_data(obj), generation)
+                count += 1
+        return count
 
     def get_multi(
         self, *, skip: int = 0, limit: int = 100
@@ -33,13 +86,19 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         return self.db.query(self.model).offset(skip).limit(limit).all()
 
-    def create(self, *, obj_in: CreateSchemaType) -> ModelType:
+    def create(self, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]) -> ModelType:
         """
         Crée un nouvel objet.
         """
-        obj_in_data = jsonable_encoder(obj_in)
+        # Les dates restent des objets datetime (jsonable_encoder les convertirait en chaînes)
+        if isinstance(obj_in, dict):
+            obj_in_data = obj_in
+        else:
+            obj_in_data = obj_in.dict()
         db_obj = self.model(**obj_in_data)
         self.db.add(db_obj)
+        self.db.flush()
+        self._log_change(db_obj.id, "create")
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
@@ -53,27 +112,160 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Met à jour un objet existant.
         """
-        obj_data = jsonable_encoder(db_obj)
-
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
 
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        # Colonnes lues sur le mapper, sans sérialiser l'objet (ni charger ses relations)
+        columns = self._columns()
+        for field, value in update_data.items():
+            if field in columns:
+                setattr(db_obj, field, value)
 
         self.db.add(db_obj)
+        self._log_change(db_obj.id, "update")
         self.db.commit()
+        self._invalidate(db_obj.id)
         self.db.refresh(db_obj)
         return db_obj
 
+    def update_many(self, *, rows: List[Dict[str, Any]], chunk_size: int = 5000) -> List[int]:
+        """
+        Applique des modifications partielles `{"id": ..., champ: valeur, ...}` en une transaction,
+        sans charger ni relire les objets : un `UPDATE ... WHERE id = ?` exécuté en lot
+        (executemany) par combinaison de champs modifiés. Retourne les IDs mis à jour ;
+        les IDs absents de la table sont ignorés.
+        """
+        columns = self._columns()
+        changes: Dict[Any, Dict[str, Any]] = {}
+        for row in rows:
+            values = dict(row)
+            id = values.pop("id")
+            unknown = set(values) - set(columns) - {"id"}
+            if unknown:
+                raise ValueError(f"Champs inconnus : {', '.join(sorted(unknown))}")
+            changes.setdefault(id, {}).update(values)
+
+        ids = list(changes)
+        existing = set()
+        for start in range(0, len(ids), chunk_size):
+            existing.update(self.db.execute(
+                select(self.model.id).where(self.model.id.in_(ids[start:start + chunk_size]))
+            ).scalars())
+
+        # Une requête préparée par combinaison de champs, exécutée pour toutes les lignes concernées
+        groups: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for id, values in changes.items():
+            if id in existing and values:
+                groups[tuple(sorted(values))].append(
+                    {"_id": id, **{f"_{field}": value for field, value in values.items()}}
+                )
+        table = self.model.__table__
+        for fields, params in groups.items():
+            statement = (
+                table.update()
+                .where(table.c.id == bindparam("_id"))
+                .values({columns[field]: bindparam(f"_{field}") for field in fields})
+            )
+            self.db.execute(statement, params)
+
+        updated = [id for id in ids if id in existing]
+        self._log_changes(updated, "update")
+        self.db.commit()
+        for id in updated:
+            self._invalidate(id)
+        return updated
+
     def remove(self, *, id: int) -> ModelType:
         """
         Supprime un objet.
         """
         obj = self.db.query(self.model).get(id)
+        self._log_cascaded_deletes([id])
         self.db.delete(obj)
+        self._log_change(id, "delete")
+        self.db.commit()
+        self._invalidate(id)
+        return obj
+
+    def remove_many(self, *, ids: List[int], chunk_size: int = 5000) -> List[int]:
+        """
+        Supprime plusieurs objets en une transaction (une requête par lot d'IDs) et retourne
+        les IDs effectivement supprimés. Les lignes dépendantes sont supprimées par la base
+        (ON DELETE CASCADE), sans être chargées.
+        """
+        ids = list(dict.fromkeys(ids))
+        deleted = []
+        for start in range(0, len(ids), chunk_size):
+            self._log_cascaded_deletes(ids[start:start + chunk_size])
+            deleted.extend(self.db.execute(
+                delete(self.model)
+                .where(self.model.id.in_(ids[start:start + chunk_size]))
+                .returning(self.model.id)
+            ).scalars())
+        self._log_changes(deleted, "delete")
         self.db.commit()
-        return obj
\ No newline at end of file
+        for id in deleted:
+            self._invalidate(id)
+        return deleted
+
+    def _load_cached(self, query: Query) -> Optional[ModelType]:
+        # Lecture en base puis mise en cache de la ligne, si elle n'a pas été invalidée entre-temps
+        generation = self.cache.generation
+        obj = query.first()
+        if obj is not None and not inspect(obj).modified:
+            self.cache.set(self._cache_data(obj), generation)
+        return obj
+
+    def _columns(self) -> Dict[str, Column]:
+        # Attributs associés à une colonne de la table (hors expressions SQL calculées)
+        return {
+            attr.key: attr.columns[0]
+            for attr in inspect(self.model).column_attrs
+            if isinstance(attr.columns[0], Column)
+        }
+
+    def _computed_columns(self) -> set:
+        # Attributs calculés par une expression SQL (stock courant d'un livre, ...)
+        return {attr.key for attr in inspect(self.model).column_attrs} - self._columns().keys()
+
+    def _cache_data(self, obj: ModelType) -> Dict[str, Any]:
+        return {key: getattr(obj, key) for key in self._columns()}
+
+    def _from_cache(self, data: Dict[str, Any]) -> ModelType:
+        # Objet reconstruit à partir des colonnes en cache et rattaché à la session sans requête
+        obj = self.model(**data)
+        make_transient_to_detached(obj)
+        return self.db.merge(obj, load=False)
+
+    def _invalidate(self, id: Any) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(int(id))
+
+    def _log_change(self, entity_id: int, operation: str) -> None:
+        # Écrit dans la même transaction que la modification : les autres processus
+        # ne voient l'entrée du journal qu'une fois la modification validée
+        self.db.add(ChangeLog(entity=self.model.__tablename__, entity_id=entity_id, operation=operation))
+
+    def _log_cascaded_deletes(self, ids: List[int]) -> None:
+        # Lignes dépendantes qui seront supprimées par la base : journalisées avant la suppression,
+        # dans la même transaction, pour que les autres processus les oublient aussi
+        parent = self.model.__table__
+        for child in self.logged_cascades:
+            table = child.__table__
+            for foreign_key in table.foreign_keys:
+                if foreign_key.column.table is parent and foreign_key.ondelete == "CASCADE":
+                    self.db.execute(insert(ChangeLog).from_select(
+                        ["entity", "entity_id", "operation"],
+                        select(literal(table.name), table.c.id, literal("delete"))
+                        .where(foreign_key.parent.in_(ids)),
+                    ))
+
+    def _log_changes(self, entity_ids: List[int], operation: str, entity: Optional[str] = None) -> None:
+        # Variante groupée de _log_change pour les écritures en masse (d'une autre entité si précisé)
+        if entity_ids:
+            self.db.execute(insert(ChangeLog), [
+                {"entity": entity or self.model.__tablename__, "entity_id": entity_id, "operation": operation}
+                for entity_id in entity_ids
+            ])
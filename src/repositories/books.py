@@ -1,25 +1,64 @@
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func
+from typing import List, Optional, Tuple
 
 from .base import BaseRepository
+from .cache import EntityCache
+from ..config import settings
 from ..models.books import Book
+from ..models.loans import Loan
+from ..utils.cache import LRUCache
+
+# Cache de second niveau des livres, par ID et par ISBN-13 canonique
+book_cache = EntityCache(LRUCache(maxsize=settings.BOOK_CACHE_SIZE), unique_keys=("isbn13",))
 
 
 class BookRepository(BaseRepository[Book, None, None]):
-    def get_by_isbn(self, db: Session, *, isbn: str) -> Book:
+    cache = book_cache
+    logged_cascades = (Loan,)
+
+    def get_by_isbn(self, *, isbn13: str) -> Book:
         """
-        Récupère un livre par son ISBN.
+        Récupère un livre par son ISBN-13 canonique.
         """
-        return db.query(Book).filter(Book.isbn == isbn).first()
+        book_id = self.cache.get_id("isbn13", isbn13)
+        if book_id is not None:
+            book = self.get(book_id)
+            # L'entrée peut être périmée si le livre a été modifié ailleurs
+            if book is not None and book.isbn13 == isbn13:
+                return book
+        return self._load_cached(self.db.query(Book).filter(Book.isbn13 == isbn13))
 
-    def get_by_title(self, db: Session, *, title: str) -> List[Book]:
+    def get_by_title(self, *, title: str) -> List[Book]:
         """
         Récupère des livres par leur titre (recherche partielle).
         """
-        return db.query(Book).filter(Book.title.ilike(f"%{title}%")).all()
+        return self.db.query(Book).filter(Book.title.ilike(f"%{title}%")).all()
 
-    def get_by_author(self, db: Session, *, author: str) -> List[Book]:
+    def get_by_author(self, *, author: str) -> List[Book]:
         """
         Récupère des livres par leur auteur (recherche partielle).
         """
-        return db.query(Book).filter(Book.author.ilike(f"%{author}%")).all()
\ No newline at end of file
+        return self.db.query(Book).filter(Book.author.ilike(f"%{author}%")).all()
+
+    def get_search_rows(self, *, ids: Optional[List[int]] = None) -> List[Tuple[int, str, str]]:
+        """
+        Récupère les couples (id, titre, auteur) de tous les livres (ou des livres `ids`),
+        sans charger les objets ORM.
+        """
+        query = self.db.query(Book.id, Book.title, Book.author)
+        if ids is not None:
+            query = query.filter(Book.id.in_(ids))
+        return query.all()
+
+    def get_popular_ids(self, *, limit: int) -> List[int]:
+        """
+        Récupère les IDs des livres les plus empruntés.
+        """
+        rows = (
+            self.db.query(Loan.book_id)
+            .group_by(Loan.book_id)
+            .order_by(func.count(Loan.id).desc())
+            .limit(limit)
+            .all()
+        )
+        return [book_id for book_id, in rows]
@@ -0,0 +1,72 @@
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+from ..utils.cache import CacheBackend
+
+
+class EntityCache:
+    """
+    Cache de second niveau des lignes d'une table, partagé entre les requêtes.
+
+    Chaque ligne est stockée sous forme de dictionnaire de colonnes, indexé par sa clé
+    primaire ; les colonnes uniques déclarées (ISBN, email, ...) renvoient vers la clé
+    primaire. Les entrées sont invalidées à chaque modification ou suppression.
+    """
+    def __init__(self, backend: CacheBackend, unique_keys: Sequence[str] = ()):
+        self.backend = backend
+        self.unique_keys = tuple(unique_keys)
+        self._generation = 0
+        self._lock = Lock()
+
+    @property
+    def generation(self) -> int:
+        """
+        Compteur d'invalidations, à relever avant de lire une ligne en base.
+        """
+        return self._generation
+
+    def get(self, id: int) -> Optional[Dict[str, Any]]:
+        """
+        Récupère les colonnes d'une ligne par sa clé primaire.
+        """
+        return self.backend.get(("id", id))
+
+    def get_id(self, field: str, value: Hashable) -> Optional[int]:
+        """
+        Récupère la clé primaire associée à une valeur de colonne unique.
+        """
+        return self.backend.get((field, value))
+
+    def set(self, data: Dict[str, Any], generation: int) -> None:
+        """
+        Stocke une ligne lue en base, sauf si une invalidation a eu lieu depuis la
+        lecture (`generation`) : la ligne pourrait alors être déjà périmée.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self.backend.set(("id", data["id"]), data)
+            for field in self.unique_keys:
+                if data.get(field) is not None:
+                    self.backend.set((field, data[field]), data["id"])
+
+    def invalidate(self, id: int) -> None:
+        """
+        Retire une ligne et ses clés secondaires.
+        """
+        with self._lock:
+            self._generation += 1
+            data = self.backend.get(("id", id))
+            self.backend.delete(("id", id))
+            if data:
+                for field in self.unique_keys:
+                    if data.get(field) is not None:
+                        self.backend.delete((field, data[field]))
+
+    def clear(self) -> None:
+        """
+        Vide le cache.
+        """
+        with self._lock:
+            self._generation += 1
+            self.backend.clear()
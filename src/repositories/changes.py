@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import func, select
+
+from .base import BaseRepository
+from ..models.changes import ChangeLog
+
+
+class ChangeLogRepository(BaseRepository[ChangeLog, None, None]):
+    def get_since(
+        self, *, cursor: int, limit: int = 500, entities: Optional[Sequence[str]] = None
+    ) -> List[ChangeLog]:
+        """
+        Récupère les entrées postérieures au curseur, dans l'ordre d'écriture,
+        éventuellement restreintes à certaines tables.
+        """
+        query = self.db.query(ChangeLog).filter(ChangeLog.id > cursor)
+        if entities is not None:
+            query = query.filter(ChangeLog.entity.in_(entities))
+        return query.order_by(ChangeLog.id).limit(limit).all()
+
+    def get_first_id(self) -> int:
+        """
+        Récupère l'identifiant de la plus ancienne entrée conservée (0 si le journal est vide).
+        """
+        return self.db.query(func.min(ChangeLog.id)).scalar() or 0
+
+    def get_last_id(self) -> int:
+        """
+        Récupère l'identifiant de la dernière entrée (0 si le journal est vide).
+        """
+        return self.db.query(func.max(ChangeLog.id)).scalar() or 0
+
+    def purge(self, *, before: datetime) -> int:
+        """
+        Supprime les entrées antérieures à une date, sauf la dernière : le journal n'est jamais
+        vidé, la plus ancienne entrée conservée marque la limite de la purge et le curseur
+        courant (get_last_id) reste exact.
+        """
+        last_id = select(func.max(ChangeLog.id)).scalar_subquery()
+        count = self.db.query(ChangeLog).filter(
+            ChangeLog.created_at < before, ChangeLog.id < last_id
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return count
@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert, literal, select, update
+
+from .base import BaseRepository
+from ..models.books import Book, snapshot_position
+from ..models.inventory import InventoryMovement, InventorySnapshot
+
+
+class InventoryRepository(BaseRepository[InventoryMovement, None, None]):
+    def record(
+        self,
+        *,
+        book_id: int,
+        delta: int,
+        reason: str,
+        user_id: Optional[int] = None,
+        commit: bool = True
+    ) -> bool:
+        """
+        Ajoute un mouvement de stock. Une sortie n'est enregistrée que si le stock courant
+        reste positif : vérification et insertion forment une seule requête, sans verrou
+        sur la ligne du livre. Retourne False si le stock est insuffisant (ou le livre inconnu).
+        `commit=False` laisse le mouvement dans la transaction en cours (validé avec l'emprunt, ...).
+
+        Le livre est signalé modifié dans le journal des modifications (flux, autres processus).
+        """
+        now = datetime.utcnow()
+        source = select(
+            literal(book_id), literal(delta), literal(reason), literal(user_id), literal(now), literal(now)
+        ).where(select(Book.quantity).where(Book.id == book_id).scalar_subquery() + delta >= 0)
+        result = self.db.execute(
+            insert(InventoryMovement).from_select(
+                ["book_id", "delta", "reason", "user_id", "created_at", "updated_at"], source
+            )
+        )
+        recorded = result.rowcount == 1
+        if recorded:
+            self._log_changes([book_id], "update", entity="book")
+        if commit:
+            self.db.commit()
+        return recorded
+
+    def set_quantities(
+        self,
+        *,
+        quantities: Dict[int, int],
+        reason: str,
+        commit: bool = True,
+        chunk_size: int = 500
+    ) -> List[int]:
+        """
+        Ramène le stock courant de livres aux quantités `{book_id: quantité}` (inventaire).
+        L'écart est calculé dans la requête d'insertion, sur le stock au moment de l'écriture :
+        un emprunt concurrent ne peut pas être compté deux fois ni rendre le stock négatif.
+        Retourne les livres corrigés (les livres inconnus ou déjà à la bonne quantité sont ignorés).
+        """
+        now = datetime.utcnow()
+        items = list(quantities.items())
+        changed = []
+        for start in range(0, len(items), chunk_size):
+            chunk = dict(items[start:start + chunk_size])
+            target = case(chunk, value=Book.id)
+            source = (
+                select(Book.id, target - Book.quantity, literal(reason), literal(now), literal(now))
+                .where(Book.id.in_(list(chunk)), Book.quantity != target)
+            )
+            changed.extend(self.db.execute(
+                insert(InventoryMovement)
+                .from_select(["book_id", "delta", "reason", "created_at", "updated_at"], source)
+                .returning(InventoryMovement.book_id)
+            ).scalars())
+        self._log_changes(changed, "update", entity="book")
+        if commit:
+            self.db.commit()
+        return changed
+
+    def get_pending_total(self) -> int:
+        """
+        Somme des mouvements de tous les livres depuis le dernier compactage.
+        """
+        return self.db.execute(
+            select(func.coalesce(func.sum(InventoryMovement.delta), 0))
+            .where(InventoryMovement.id > snapshot_position())
+        ).scalar()
+
+    def get_movements(
+        self, *, book_id: int, skip: int = 0, limit: int = 50
+    ) -> Tuple[List[InventoryMovement], int]:
+        """
+        Page des mouvements d'un livre, du plus récent au plus ancien, et leur nombre total.
+        """
+        query = self.db.query(InventoryMovement).filter(InventoryMovement.book_id == book_id)
+        items = query.order_by(InventoryMovement.id.desc()).offset(skip).limit(limit).all()
+        return items, query.count()
+
+    def compact(self) -> Optional[InventorySnapshot]:
+        """
+        Reporte dans la quantité enregistrée des livres les mouvements postérieurs au dernier
+        instantané, puis enregistre le nouvel instantané, en une transaction.
+        Retourne None s'il n'y avait aucun mouvement à reporter.
+        """
+        position = snapshot_position()
+        latest = select(func.coalesce(func.max(InventoryMovement.id), 0)).scalar_subquery()
+        window = (InventoryMovement.id > position, InventoryMovement.id <= latest)
+        # Écriture en premier : les autres écrivains sont bloqués jusqu'au commit, les bornes
+        # relues ensuite sont donc celles utilisées par la mise à jour
+        books = self.db.execute(
+            update(Book)
+            .where(Book.id.in_(select(InventoryMovement.book_id).where(*window)))
+            .values(quantity_snapshot=Book.quantity_snapshot + select(func.sum(InventoryMovement.delta))
+                    .where(InventoryMovement.book_id == Book.id, *window)
+                    .scalar_subquery())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        start, end = self.db.execute(select(position, latest)).one()
+        if end <= start:
+            # Aucun mouvement à reporter : la mise à jour n'a rien modifié
+            self.db.commit()
+            return None
+
+        snapshot = InventorySnapshot(position=end, books=books)
+        self.db.add(snapshot)
+        self.db.commit()
+        return snapshot
@@ -1,9 +1,34 @@
+from sqlalchemy import Boolean, DateTime, and_, case, exists, func, literal, or_, select, union_all, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 from .base import BaseRepository
-from ..models.loans import Loan
+from ..models.loans import Loan, LoanHistory
+
+
+# Clés de tri des listes d'emprunts en cours : (colonne, ordre croissant) ; le préfixe "-"
+# inverse l'ordre. L'identifiant départage les ex aequo pour une pagination stable.
+LOAN_SORT_KEYS = {
+    "due_date": ((Loan.due_date, True),),
+    # Plus de jours de retard = échéance plus ancienne
+    "days_overdue": ((Loan.due_date, False),),
+    "loan_date": ((Loan.loan_date, True),),
+    "user": ((Loan.user_id, True), (Loan.due_date, True)),
+}
+
+
+def overdue_condition(loans, now: datetime):
+    """
+    Emprunts en retard parmi `loans` (le modèle Loan ou les colonnes d'une sous-requête) :
+    marqués par l'échéancier, ou échus sans l'être encore (échéancier pas encore passé, ou
+    arrêté faute de processus de maintenance).
+    """
+    return and_(
+        # La condition sur return_date limite le parcours à l'index partiel ix_loan_active_due_date
+        loans.return_date.is_(None),
+        or_(loans.is_overdue == True, loans.due_date < now),
+    )
 
 
 class LoanRepository(BaseRepository[Loan, None, None]):
@@ -13,24 +38,226 @@ class LoanRepository(BaseRepository[Loan, None, None]):
         """
         return self.db.query(Loan).filter(Loan.return_date == None).all()
 
+    def get_active_loans_by_user(self, *, user_id: int) -> List[Loan]:
+        """
+        Récupère les emprunts actifs d'un utilisateur.
+        """
+        return self.db.query(Loan).filter(Loan.user_id == user_id, Loan.return_date == None).all()
+
+    def get_current_page(
+        self,
+        *,
+        overdue: bool = False,
+        skip: int = 0,
+        limit: int = 100,
+        sort: str = "due_date",
+        user_id: Optional[int] = None,
+        book_id: Optional[int] = None,
+        due_from: Optional[datetime] = None,
+        due_to: Optional[datetime] = None,
+        loan_from: Optional[datetime] = None,
+        loan_to: Optional[datetime] = None
+    ) -> Tuple[List[Loan], int]:
+        """
+        Page d'emprunts actifs (ou en retard) filtrés et triés, avec le nombre total
+        de lignes correspondant aux filtres. `sort` doit être une clé de LOAN_SORT_KEYS,
+        éventuellement préfixée par "-".
+        """
+        # Mêmes conditions que les index partiels ix_loan_active_*
+        conditions = [overdue_condition(Loan, datetime.utcnow()) if overdue else Loan.return_date == None]
+        if user_id is not None:
+            conditions.append(Loan.user_id == user_id)
+        if book_id is not None:
+            conditions.append(Loan.book_id == book_id)
+        if due_from is not None:
+            conditions.append(Loan.due_date >= due_from)
+        if due_to is not None:
+            conditions.append(Loan.due_date < due_to)
+        if loan_from is not None:
+            conditions.append(Loan.loan_date >= loan_from)
+        if loan_to is not None:
+            conditions.append(Loan.loan_date < loan_to)
+
+        descending = sort.startswith("-")
+        order_by = [
+            column.asc() if ascending != descending else column.desc()
+            for column, ascending in (*LOAN_SORT_KEYS[sort.lstrip("-")], (Loan.id, True))
+        ]
+
+        total = self.db.query(func.count(Loan.id)).filter(*conditions).scalar()
+        items = self.db.query(Loan).filter(*conditions).order_by(*order_by).offset(skip).limit(limit).all()
+        return items, total
+
     def get_overdue_loans(self) -> List[Loan]:
         """
-        Récupère les emprunts en retard.
+        Récupère les emprunts en retard (marqués par l'échéancier ou échus).
+        """
+        return self.db.query(Loan).filter(overdue_condition(Loan, datetime.utcnow())).all()
+
+    def get_pending_due_dates(self) -> List[Tuple[int, datetime, bool]]:
+        """
+        Échéances des emprunts actifs pas encore marqués en retard :
+        (id, date d'échéance, rappel envoyé), par échéance croissante.
         """
-        now = datetime.utcnow()
-        return self.db.query(Loan).filter(
-            Loan.return_date == None,
-            Loan.due_date < now
+        return self.db.execute(
+            select(Loan.id, Loan.due_date, Loan.reminder_sent)
+            .where(Loan.return_date.is_(None), Loan.is_overdue == False)
+            .order_by(Loan.due_date)
         ).all()
 
-    def get_loans_by_user(self, *, user_id: int) -> List[Loan]:
+    def mark_overdue(self, *, loan_id: int, now: datetime) -> bool:
+        """
+        Marque un emprunt actif échu comme en retard, sans valider la transaction.
+        Retourne False s'il a été rendu, prolongé ou déjà marqué (par un autre processus).
+        """
+        result = self.db.execute(
+            update(Loan)
+            .where(
+                Loan.id == loan_id,
+                Loan.return_date.is_(None),
+                Loan.due_date <= now,
+                Loan.is_overdue == False,
+            )
+            .values(is_overdue=True, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False
+        self._log_change(loan_id, "update")
+        return True
+
+    def mark_reminded(self, *, loan_id: int, due_date: datetime) -> bool:
+        """
+        Note l'envoi du rappel d'échéance, sans valider la transaction.
+        Retourne False si l'emprunt a été rendu, prolongé ou déjà rappelé.
         """
-        Récupère les emprunts d'un utilisateur.
+        result = self.db.execute(
+            update(Loan)
+            .where(
+                Loan.id == loan_id,
+                Loan.return_date.is_(None),
+                Loan.due_date == due_date,
+                Loan.reminder_sent == False,
+            )
+            .values(reminder_sent=True)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    def get_loans_by_user(
+        self, *, user_id: int, include_history: bool = False
+    ) -> List[Union[Loan, LoanHistory]]:
         """
-        return self.db.query(Loan).filter(Loan.user_id == user_id).all()
+        Récupère les emprunts d'un utilisateur, avec ou sans les emprunts archivés.
+        """
+        loans = self.db.query(Loan).filter(Loan.user_id == user_id).all()
+        if include_history:
+            loans += self.db.query(LoanHistory).filter(LoanHistory.user_id == user_id).all()
+            loans.sort(key=lambda loan: loan.id)
+        return loans
+
+    def get_loans_by_book(
+        self, *, book_id: int, include_history: bool = False
+    ) -> List[Union[Loan, LoanHistory]]:
+        """
+        Récupère les emprunts d'un livre, avec ou sans les emprunts archivés.
+        """
+        loans = self.db.query(Loan).filter(Loan.book_id == book_id).all()
+        if include_history:
+            loans += self.db.query(LoanHistory).filter(LoanHistory.book_id == book_id).all()
+            loans.sort(key=lambda loan: loan.id)
+        return loans
+
+    def _user_loans(self, user_id: int, include_history: bool, newest: Optional[int] = None):
+        # Colonnes du schéma Loan ; les emprunts archivés sont rendus, donc jamais en retard.
+        # `newest` : seuls les N plus récents de chaque table sont lus (parcours d'index borné)
+        columns = ("id", "user_id", "book_id", "loan_date", "return_date", "due_date", "created_at", "updated_at")
+        tables = [(Loan.__table__, Loan.__table__.c.is_overdue)]
+        if include_history:
+            tables.append((LoanHistory.__table__, literal(False, Boolean)))
+
+        branches = []
+        for table, is_overdue in tables:
+            branch = select(*(table.c[name] for name in columns), is_overdue.label("is_overdue")).where(
+                table.c.user_id == user_id
+            )
+            if newest is not None:
+                branch = branch.order_by(table.c.loan_date.desc(), table.c.id.desc()).limit(newest)
+                branch = select(branch.subquery())
+            branches.append(branch)
+        return (branches[0] if len(branches) == 1 else union_all(*branches)).subquery("user_loans")
 
-    def get_loans_by_book(self, *, book_id: int) -> List[Loan]:
+    def get_user_history(
+        self, *, user_id: int, skip: int = 0, limit: int = 50, include_history: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int]:
         """
-        Récupère les emprunts d'un livre.
+        Page de l'historique d'un emprunteur, du plus récent au plus ancien
+        (index ix_loan_user_id_loan_date), et nombre total d'emprunts.
         """
-        return self.db.query(Loan).filter(Loan.book_id == book_id).all()
\ No newline at end of file
+        loans = self._user_loans(user_id, include_history, newest=skip + limit)
+        rows = self.db.execute(
+            select(loans).order_by(loans.c.loan_date.desc(), loans.c.id.desc()).offset(skip).limit(limit)
+        ).mappings().all()
+        total = self.db.execute(select(func.count()).select_from(self._user_loans(user_id, include_history))).scalar()
+        return [dict(row) for row in rows], total
+
+    def get_user_summary(self, *, user_id: int, include_history: bool = True) -> Dict[str, int]:
+        """
+        Compteurs des emprunts d'un utilisateur, calculés en une seule requête d'agrégat.
+        """
+        loans = self._user_loans(user_id, include_history)
+        returned = loans.c.return_date.isnot(None)
+        row = self.db.execute(select(
+            func.count().label("total_loans"),
+            func.coalesce(func.sum(case((loans.c.return_date.is_(None), 1), else_=0)), 0).label("active_loans"),
+            func.coalesce(func.sum(case(
+                (overdue_condition(loans.c, datetime.utcnow()), 1), else_=0
+            )), 0).label("overdue_loans"),
+            func.coalesce(func.sum(case((returned, 1), else_=0)), 0).label("returned_loans"),
+            func.coalesce(func.sum(case(
+                (and_(returned, loans.c.return_date <= loans.c.due_date), 1), else_=0
+            )), 0).label("returned_on_time"),
+        )).mappings().one()
+        return dict(row)
+
+    def archive_returned(self, *, before: datetime, batch_size: int = 5000) -> int:
+        """
+        Déplace vers `loan_history` les emprunts rendus avant `before`, par lots.
+        Chaque lot est copié puis supprimé dans une même transaction ; retourne le nombre archivé.
+        Seuls les emprunts effectivement copiés sont supprimés. Lève ValueError si un ID
+        est déjà présent dans l'historique (ID réattribué) : ces emprunts ne sont pas déplacés.
+        """
+        loan = Loan.__table__
+        history = LoanHistory.__table__
+        columns = [column.name for column in loan.columns if column.name in history.c]
+        total = 0
+        while True:
+            ids = self.db.execute(
+                select(loan.c.id)
+                .where(loan.c.return_date.isnot(None), loan.c.return_date < before)
+                .order_by(loan.c.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return total
+
+            # Un lot archivé en parallèle par un autre processus n'est plus dans `loan` ; un ID présent
+            # dans les deux tables a été réattribué à un nouvel emprunt, qui ne doit pas être perdu
+            reused = self.db.execute(
+                select(loan.c.id).where(loan.c.id.in_(ids), exists().where(history.c.id == loan.c.id))
+            ).scalars().all()
+            if reused:
+                raise ValueError(f"Emprunts déjà présents dans l'historique (ID réattribués) : {reused}")
+
+            copied = self.db.execute(history.insert().from_select(
+                columns + ["archived_at"],
+                select(*(loan.c[name] for name in columns), literal(datetime.utcnow(), DateTime))
+                .where(loan.c.id.in_(ids)),
+            ).returning(history.c.id)).scalars().all()
+            self.db.execute(loan.delete().where(loan.c.id.in_(copied)))
+            # Emprunts sortis de `loan` : retirés des caches et de l'échéancier des autres processus
+            self._log_changes(copied, "delete")
+            self.db.commit()
+            total += len(copied)
+            if len(ids) < batch_size:
+                return total
\ No newline at end of file
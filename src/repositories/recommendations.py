@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, union
+
+from .base import BaseRepository
+from ..models.books import Book
+from ..models.loans import Loan, LoanHistory
+from ..models.recommendations import BookRecommendation, RecommendationBuild
+
+
+class RecommendationRepository(BaseRepository[BookRecommendation, None, None]):
+    def get_for_book(self, *, book_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Livres recommandés pour un livre, du plus similaire au moins similaire
+        (index ix_book_recommendation_book_id_rank).
+        """
+        rows = self.db.execute(
+            select(Book.id, Book.title, Book.author)
+            .join(BookRecommendation, BookRecommendation.recommended_book_id == Book.id)
+            .where(BookRecommendation.book_id == book_id)
+            .order_by(BookRecommendation.rank)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in rows]
+
+    def get_borrowings(self) -> List[Tuple[int, int]]:
+        """
+        Couples (emprunteur, livre) distincts, emprunts en cours et archivés.
+        """
+        return self.db.execute(union(
+            select(Loan.user_id, Loan.book_id),
+            select(LoanHistory.user_id, LoanHistory.book_id),
+        )).all()
+
+    def get_latest_loan_id(self) -> int:
+        """
+        ID du dernier emprunt enregistré (les emprunts archivés conservent leur ID).
+        """
+        return max(
+            self.db.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+            for model in (Loan, LoanHistory)
+        )
+
+    def get_position(self) -> Optional[int]:
+        """
+        Position du dernier calcul (None si les recommandations n'ont jamais été calculées).
+        """
+        return self.db.execute(select(func.max(RecommendationBuild.position))).scalar()
+
+    def get_books_to_refresh(self, *, position: int) -> List[int]:
+        """
+        Livres dont les recommandations changent avec les emprunts postérieurs à `position` :
+        tous les livres empruntés par les lecteurs de ces nouveaux emprunts, y compris de ceux
+        archivés depuis (ils conservent leur ID).
+        """
+        borrowers = union(
+            select(Loan.user_id).where(Loan.id > position),
+            select(LoanHistory.user_id).where(LoanHistory.id > position),
+        )
+        return list(self.db.execute(union(
+            select(Loan.book_id).where(Loan.user_id.in_(borrowers)),
+            select(LoanHistory.book_id).where(LoanHistory.user_id.in_(borrowers)),
+        )).scalars())
+
+    def replace(
+        self,
+        *,
+        book_ids: Optional[List[int]],
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 5000
+    ) -> None:
+        """
+        Remplace les recommandations des livres `book_ids` (de tous les livres si None) par `rows`,
+        sans valider la transaction : les lecteurs voient les anciennes jusqu'au commit.
+        """
+        if book_ids is None:
+            self.db.execute(delete(BookRecommendation))
+        else:
+            for start in range(0, len(book_ids), chunk_size):
+                self.db.execute(
+                    delete(BookRecommendation)
+                    .where(BookRecommendation.book_id.in_(book_ids[start:start + chunk_size]))
+                )
+        for start in range(0, len(rows), chunk_size):
+            self.db.execute(insert(BookRecommendation), rows[start:start + chunk_size])
+
+    def record_build(self, *, position: int, books: int, full: bool) -> RecommendationBuild:
+        """
+        Enregistre un calcul et valide la transaction (recommandations remplacées comprises).
+        """
+        build = RecommendationBuild(position=position, books=books, full=full)
+        self.db.add(build)
+        self.db.commit()
+        return build
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List, Optional
+
+from .base import BaseRepository
+from ..models.tokens import RevokedToken
+
+
+class RevokedTokenRepository(BaseRepository[RevokedToken, None, None]):
+    def get_by_jti(self, *, jti: str) -> Optional[RevokedToken]:
+        """
+        Récupère une révocation par l'identifiant du token.
+        """
+        return self.db.query(RevokedToken).filter(RevokedToken.jti == jti).first()
+
+    def get_active_jtis(self, *, now: datetime) -> List[str]:
+        """
+        Identifiants des tokens révoqués pas encore expirés.
+        """
+        rows = self.db.query(RevokedToken.jti).filter(RevokedToken.expires_at > now).all()
+        return [jti for jti, in rows]
+
+    def purge(self, *, before: datetime) -> int:
+        """
+        Supprime les révocations des tokens expirés avant une date.
+        """
+        count = self.db.query(RevokedToken).filter(RevokedToken.expires_at < before).delete(synchronize_session=False)
+        self.db.commit()
+        return count
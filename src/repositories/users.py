@@ -1,12 +1,52 @@
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from .base import BaseRepository
+from .cache import EntityCache
+from ..config import settings
+from ..models.loans import Loan
 from ..models.users import User
+from ..utils.cache import LRUCache
+
+# Cache de second niveau des utilisateurs, par ID et par email
+user_cache = EntityCache(LRUCache(maxsize=settings.USER_CACHE_SIZE), unique_keys=("email",))
 
 
 class UserRepository(BaseRepository[User, None, None]):
+    cache = user_cache
+    logged_cascades = (Loan,)
+
     def get_by_email(self, *, email: str) -> User:
         """
         Récupère un utilisateur par son email.
         """
-        return self.db.query(User).filter(User.email == email).first()
\ No newline at end of file
+        user_id = self.cache.get_id("email", email)
+        if user_id is not None:
+            user = self.get(user_id)
+            # L'entrée peut être périmée si l'utilisateur a été modifié ailleurs
+            if user is not None and user.email == email:
+                return user
+        return self._load_cached(self.db.query(User).filter(User.email == email))
+
+    def get_existing_emails(self, *, emails: Iterable[str], chunk_size: int = 5000) -> Set[str]:
+        """
+        Retourne, parmi les emails donnés, ceux déjà utilisés (une requête IN par paquet).
+        """
+        emails = list(emails)
+        existing = set()
+        for start in range(0, len(emails), chunk_size):
+            chunk = emails[start:start + chunk_size]
+            existing.update(email for email, in self.db.query(User.email).filter(User.email.in_(chunk)))
+        return existing
+
+    def create_many(self, *, rows: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+        """
+        Insère des utilisateurs (mots de passe déjà hashés) en une insertion groupée
+        et une transaction ; retourne les couples (id, email) créés.
+        """
+        created = self.db.execute(insert(User).returning(User.id, User.email), rows).all()
+        self._log_changes([user_id for user_id, _ in created], "create")
+        self.db.commit()
+        return [(user_id, email) for user_id, email in created]
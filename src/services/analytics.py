@@ -0,0 +1,227 @@
+import csv
+import io
+from itertools import chain
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, select, union_all
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.books import Book, snapshot_position
+from ..models.inventory import InventoryMovement
+from ..models.loans import Loan, LoanHistory
+from ..utils.singleflight import SingleFlight
+
+DAY = 86400.0
+
+# Colonnes du rapport d'utilisation (page JSON et export CSV), dans l'ordre de l'export
+UTILISATION_COLUMNS = (
+    "id", "title", "author", "copies", "days_owned", "loans", "loan_days", "utilisation", "turnover", "idle_days"
+)
+UTILISATION_SORT_KEYS = ("utilisation", "turnover", "idle_days", "loans", "loan_days", "days_owned", "id")
+
+# Derniers calculs par fenêtre (parcours des pages, export) : fenêtre -> (instant du calcul, colonnes)
+_tables: Dict[Optional[int], Tuple[float, Dict[str, Any]]] = {}
+_tables_lock = Lock()
+_TABLES_MAX = 8
+_computations = SingleFlight(
+    "utilisation", timeout=settings.SINGLE_FLIGHT_TIMEOUT, enabled=settings.SINGLE_FLIGHT_ENABLED
+)
+
+
+def _epoch(column):
+    # Secondes depuis l'époque, calculées par SQLite (évite la conversion ligne à ligne en datetime)
+    return cast(func.strftime("%s", column), Integer)
+
+
+def utilisation_metrics(
+    *,
+    owned_since: np.ndarray,
+    copies: np.ndarray,
+    loan_book: np.ndarray,
+    loan_start: np.ndarray,
+    loan_end: np.ndarray,
+    now: float,
+    window_start: float = -np.inf
+) -> Dict[str, np.ndarray]:
+    """
+    Indicateurs d'utilisation par livre à partir des intervalles d'emprunt (horodatages en secondes,
+    `loan_book` = indice du livre, `loan_end` = NaN pour un emprunt en cours), sans boucle Python :
+
+    - days_owned : jours de possession (depuis l'ajout au catalogue ou le premier emprunt) dans la fenêtre ;
+    - loan_days : jours-exemplaires empruntés dans la fenêtre ;
+    - utilisation : loan_days / (days_owned × exemplaires) ;
+    - turnover : emprunts commencés dans la fenêtre par exemplaire ;
+    - idle_days : jours depuis le dernier retour (0 si un exemplaire est sorti, NaN si jamais emprunté).
+    """
+    books = len(owned_since)
+    active = np.isnan(loan_end)
+    loan_end = np.where(active, now, loan_end)
+
+    # Un livre importé avec son historique a pu être emprunté avant son ajout au catalogue
+    owned_since = owned_since.astype(np.float64)
+    np.minimum.at(owned_since, loan_book, loan_start)
+    period_start = np.maximum(owned_since, window_start)
+    days_owned = np.maximum(now - period_start, 0.0) / DAY
+
+    # Intersection de chaque intervalle avec la période observée du livre
+    overlap = np.maximum(loan_end - np.maximum(loan_start, period_start[loan_book]), 0.0)
+    loan_days = np.bincount(loan_book, weights=overlap, minlength=books) / DAY
+    loans = np.bincount(loan_book[loan_start >= period_start[loan_book]], minlength=books)
+
+    last_end = np.full(books, -np.inf)
+    np.maximum.at(last_end, loan_book, loan_end)
+    on_loan = np.bincount(loan_book[active], minlength=books) > 0
+    idle_days = np.where(on_loan, 0.0, (now - last_end) / DAY)
+    idle_days[np.isneginf(last_end)] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilisation = np.where((copies > 0) & (days_owned > 0), loan_days / (days_owned * copies), np.nan)
+        turnover = np.where(copies > 0, loans / copies, np.nan)
+    return {
+        "days_owned": days_owned,
+        "loans": loans,
+        "loan_days": loan_days,
+        "utilisation": utilisation,
+        "turnover": turnover,
+        "idle_days": idle_days,
+    }
+
+
+class UtilisationService:
+    """
+    Indicateurs d'utilisation de tout le fonds (acquisitions, désherbage), calculés en une passe
+    vectorisée sur les emprunts en cours et archivés.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _columns(self, statement, count: int) -> np.ndarray:
+        # Lignes numériques lues directement en un tableau NumPy (lignes × `count`)
+        rows = self.db.execute(statement).all()
+        return np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=count * len(rows)).reshape(-1, count)
+
+    def compute(self, *, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Calcule les indicateurs de tous les livres, sur les `days` derniers jours ou depuis leur acquisition.
+        Retourne des colonnes (tableaux NumPy, listes pour les textes) alignées sur `id`.
+        """
+        # Secondes UTC, comme les dates naïves (UTC) converties par SQLite
+        now = time()
+        books = self.db.execute(
+            select(Book.id, Book.title, Book.author, _epoch(Book.created_at), Book.quantity_snapshot).order_by(Book.id)
+        ).all()
+        ids = np.fromiter((book[0] for book in books), dtype=np.int64, count=len(books))
+        created = np.fromiter((book[3] if book[3] is not None else now for book in books), dtype=np.float64, count=len(books))
+        available = np.fromiter((book[4] for book in books), dtype=np.int64, count=len(books))
+
+        # Stock courant : instantanés + mouvements non compactés, regroupés par livre
+        pending = self._columns(
+            select(InventoryMovement.book_id, func.sum(InventoryMovement.delta))
+            .where(InventoryMovement.id > snapshot_position())
+            .group_by(InventoryMovement.book_id), 2
+        )
+        # Livres supprimés entre deux lectures ignorés
+        pending = pending[np.isin(pending[:, 0], ids)]
+        np.add.at(available, np.searchsorted(ids, pending[:, 0].astype(np.int64)), pending[:, 1].astype(np.int64))
+
+        intervals = self._columns(union_all(
+            select(Loan.book_id, _epoch(Loan.loan_date), func.coalesce(_epoch(Loan.return_date), -1)),
+            select(LoanHistory.book_id, _epoch(LoanHistory.loan_date), _epoch(LoanHistory.return_date)),
+        ), 3)
+        intervals = intervals[np.isin(intervals[:, 0], ids)]
+        loan_book = np.searchsorted(ids, intervals[:, 0].astype(np.int64))
+        loan_end = np.where(intervals[:, 2] < 0, np.nan, intervals[:, 2])
+
+        # Exemplaires possédés : disponibles + sortis
+        copies = available + np.bincount(loan_book[np.isnan(loan_end)], minlength=len(ids))
+        metrics = utilisation_metrics(
+            owned_since=created,
+            copies=copies,
+            loan_book=loan_book,
+            loan_start=intervals[:, 1],
+            loan_end=loan_end,
+            now=now,
+            window_start=now - days * DAY if days else -np.inf,
+        )
+        return {
+            "id": ids,
+            "title": [book[1] for book in books],
+            "author": [book[2] for book in books],
+            "copies": copies,
+            **metrics,
+        }
+
+    def _table(self, days: Optional[int]) -> Dict[str, Any]:
+        # Calcul réutilisé pendant UTILISATION_CACHE_TTL secondes, un seul calcul simultané par fenêtre
+        with _tables_lock:
+            cached = _tables.get(days)
+        if cached is not None and monotonic() - cached[0] < settings.UTILISATION_CACHE_TTL:
+            return cached[1]
+        table = _computations.do(days, lambda: self.compute(days=days))
+        with _tables_lock:
+            _tables[days] = (monotonic(), table)
+            if len(_tables) > _TABLES_MAX:
+                del _tables[min(_tables, key=lambda key: _tables[key][0])]
+        return table
+
+    @staticmethod
+    def _check_sort(sort: str) -> None:
+        if sort.lstrip("-") not in UTILISATION_SORT_KEYS:
+            raise ValueError(
+                f"Tri inconnu : {sort} (choix : {', '.join(UTILISATION_SORT_KEYS)}, préfixe - pour décroissant)"
+            )
+
+    def _order(self, table: Dict[str, Any], sort: str) -> np.ndarray:
+        values = table[sort.lstrip("-")].astype(np.float64)
+        # Valeurs absentes (jamais emprunté, aucun exemplaire) en dernier dans les deux sens, ID à égalité
+        return np.lexsort((table["id"], -values if sort.startswith("-") else values))
+
+    def _rows(self, table: Dict[str, Any], indices: np.ndarray) -> Iterator[Dict[str, Any]]:
+        for i in indices.tolist():
+            row = {}
+            for column in UTILISATION_COLUMNS:
+                value = table[column][i]
+                if isinstance(value, (np.floating, float)):
+                    value = None if np.isnan(value) else round(float(value), 4)
+                elif isinstance(value, np.integer):
+                    value = int(value)
+                row[column] = value
+            yield row
+
+    def get_page(
+        self, *, skip: int = 0, limit: int = 100, sort: str = "utilisation", days: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page du rapport d'utilisation (tri sur tout le fonds) et nombre total de livres.
+        """
+        self._check_sort(sort)
+        table = self._table(days)
+        order = self._order(table, sort)
+        return list(self._rows(table, order[skip:skip + limit])), len(order)
+
+    def export_csv(self, *, sort: str = "utilisation", days: Optional[int] = None) -> Iterator[str]:
+        """
+        Rapport d'utilisation complet au format CSV, produit par blocs de lignes.
+        Le calcul est fait avant le premier bloc : la session peut être fermée pendant l'envoi.
+        """
+        self._check_sort(sort)
+        table = self._table(days)
+        order = self._order(table, sort)
+
+        def lines() -> Iterator[str]:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=UTILISATION_COLUMNS)
+            writer.writeheader()
+            for start in range(0, len(order), 1000):
+                writer.writerows(self._rows(table, order[start:start + 1000]))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+
+        return lines()
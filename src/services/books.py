@@ -1,25 +1,48 @@
-from typing import List, Optional, Any, Dict, Union
+from typing import List, Optional, Any, Dict, Tuple, Union
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..repositories.books import BookRepository
+from ..repositories.books import BookRepository, book_cache
+from ..repositories.inventory import InventoryRepository
 from ..models.books import Book
-from ..api.schemas.books import BookCreate, BookUpdate
+from ..models.inventory import ADJUSTMENT, InventoryMovement, InventorySnapshot
+from ..api.schemas.books import BookBulkUpdateItem, BookCreate, BookUpdate
+from ..utils.isbn import compact_isbn, normalize_isbn
 from .base import BaseService
+from .changes import change_listener
+from .search import BookSearchIndex, book_search_index
 
 
 class BookService(BaseService[Book, BookCreate, BookUpdate]):
     """
     Service pour la gestion des livres.
     """
-    def __init__(self, repository: BookRepository):
+    def __init__(
+        self,
+        repository: BookRepository,
+        search_index: BookSearchIndex = book_search_index,
+        inventory_repository: Optional[InventoryRepository] = None
+    ):
         super().__init__(repository)
         self.repository = repository
+        self.search_index = search_index
+        self.inventory_repository = inventory_repository or InventoryRepository(InventoryMovement, repository.db)
 
     def get_by_isbn(self, *, isbn: str) -> Optional[Book]:
         """
-        Récupère un livre par son ISBN.
+        Récupère un livre par son ISBN (ISBN-10 ou ISBN-13, avec ou sans tirets).
         """
-        return self.repository.get_by_isbn(isbn=isbn)
+        try:
+            isbn13 = normalize_isbn(isbn)
+        except ValueError:
+            return None
+        return self.repository.get_by_isbn(isbn13=isbn13)
+
+    def warm_cache(self, *, limit: int) -> int:
+        """
+        Précharge le cache de second niveau avec les livres les plus empruntés.
+        """
+        return self.repository.warm_cache(ids=self.repository.get_popular_ids(limit=limit))
 
     def get_by_title(self, *, title: str) -> List[Book]:
         """
@@ -33,27 +56,174 @@ class BookService(BaseService[Book, BookCreate, BookUpdate]):
         """
         return self.repository.get_by_author(author=author)
 
+    def search_fuzzy(
+        self, *, query: str, field: Optional[str] = None, limit: int = 20
+    ) -> List[Book]:
+        """
+        Recherche approximative par titre et/ou auteur, classée par similarité.
+        """
+        matches = self.search_index.fuzzy_search(query=query, field=field, limit=limit)
+        return self.repository.get_many([book_id for book_id, _ in matches])
+
+    def autocomplete(self, *, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Suggère des livres dont le titre ou l'auteur commence par `query`.
+        """
+        return self.search_index.autocomplete(query=query, limit=limit)
+
     def create(self, *, obj_in: BookCreate) -> Book:
         """
-        Crée un nouveau livre, en vérifiant que l'ISBN n'est pas déjà utilisé.
+        Crée un nouveau livre, en vérifiant que l'ISBN est valide et n'est pas déjà utilisé.
         """
+        book_data = obj_in.dict()
+        book_data.update(self._isbn_fields(book_data["isbn"]))
+
         # Vérifier si l'ISBN est déjà utilisé
-        existing_book = self.get_by_isbn(isbn=obj_in.isbn)
+        existing_book = self.get_by_isbn(isbn=book_data["isbn13"])
         if existing_book:
             raise ValueError("L'ISBN est déjà utilisé")
 
-        return self.repository.create(obj_in=obj_in)
+        book = self.repository.create(obj_in=book_data)
+        self.search_index.add(book)
+        return book
+
+    def update(
+        self,
+        *,
+        db_obj: Book,
+        obj_in: Union[BookUpdate, Dict[str, Any]]
+    ) -> Book:
+        """
+        Met à jour un livre et réindexe son titre et son auteur.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+
+        if update_data.get("isbn"):
+            update_data.update(self._isbn_fields(update_data["isbn"]))
+            if update_data["isbn13"] != db_obj.isbn13:
+                existing_book = self.get_by_isbn(isbn=update_data["isbn13"])
+                if existing_book and existing_book.id != db_obj.id:
+                    raise ValueError("L'ISBN est déjà utilisé")
+
+        # Nouvelle quantité : correction d'inventaire ajoutée au journal ; la ligne du livre
+        # n'est réécrite que si d'autres champs changent
+        quantity = update_data.pop("quantity", None)
+        if quantity is not None:
+            self.inventory_repository.set_quantities(
+                quantities={db_obj.id: quantity}, reason=ADJUSTMENT, commit=not update_data
+            )
+            if not update_data:
+                return self.repository.get(id=db_obj.id, use_cache=False)
+
+        book = super().update(db_obj=db_obj, obj_in=update_data)
+        self.search_index.add(book)
+        return book
+
+    def update_many(self, *, items: List[BookBulkUpdateItem]) -> Dict[str, List[int]]:
+        """
+        Applique des modifications partielles à plusieurs livres en une transaction
+        (inventaires) et réindexe ceux dont le titre ou l'auteur change. Les nouvelles
+        quantités sont enregistrées comme corrections dans le journal des mouvements.
+        Les IDs inconnus sont rapportés dans `not_found`.
+        """
+        rows = []
+        quantities = {}
+        for item in items:
+            data = item.dict(exclude_unset=True)
+            if data.get("isbn"):
+                data.update(self._isbn_fields(data["isbn"]))
+            quantity = data.pop("quantity", None)
+            if quantity is not None:
+                quantities[data["id"]] = quantity
+            rows.append(data)
+
+        self.inventory_repository.set_quantities(quantities=quantities, reason=ADJUSTMENT, commit=False)
+
+        try:
+            updated = self.repository.update_many(rows=rows)
+        except IntegrityError as e:
+            # Toute la transaction est annulée (ISBN déjà utilisé, champ obligatoire vide, ...)
+            self.repository.db.rollback()
+            raise ValueError(f"Modifications refusées, aucun livre mis à jour : {e.orig}")
+
+        found = set(updated)
+        reindex = {row["id"] for row in rows if row["id"] in found and ("title" in row or "author" in row)}
+        if reindex:
+            for book in self.repository.get_search_rows(ids=list(reindex)):
+                self.search_index.add(book)
+        return {
+            "updated": updated,
+            "not_found": [book_id for book_id in dict.fromkeys(row["id"] for row in rows) if book_id not in found],
+        }
+
+    def remove(self, *, id: int) -> Book:
+        """
+        Supprime un livre et le retire de l'index de recherche.
+        """
+        book = super().remove(id=id)
+        self.search_index.remove(id)
+        return book
+
+    def remove_many(self, *, ids: List[int]) -> Dict[str, List[int]]:
+        """
+        Supprime plusieurs livres (et, par cascade en base, leurs emprunts) et les retire
+        de l'index de recherche. Les IDs inconnus sont rapportés dans `not_found`.
+        """
+        deleted = self.repository.remove_many(ids=ids)
+        for book_id in deleted:
+            self.search_index.remove(book_id)
+        found = set(deleted)
+        return {
+            "deleted": deleted,
+            "not_found": [book_id for book_id in dict.fromkeys(ids) if book_id not in found],
+        }
 
     def update_quantity(self, *, book_id: int, quantity_change: int) -> Book:
         """
-        Met à jour la quantité d'un livre.
+        Met à jour la quantité d'un livre (mouvement ajouté au journal, sans réécrire le livre).
         """
-        book = self.get(id=book_id)
+        book = self.repository.get(id=book_id, use_cache=False)
         if not book:
             raise ValueError(f"Livre avec l'ID {book_id} non trouvé")
 
-        new_quantity = book.quantity + quantity_change
-        if new_quantity < 0:
+        if not self.inventory_repository.record(book_id=book_id, delta=quantity_change, reason=ADJUSTMENT):
             raise ValueError("La quantité ne peut pas être négative")
 
-        return self.repository.update(db_obj=book, obj_in={"quantity": new_quantity})
\ No newline at end of file
+        return self.repository.get(id=book_id, use_cache=False)
+
+    def get_movements(
+        self, *, book_id: int, skip: int = 0, limit: int = 50
+    ) -> Tuple[List[InventoryMovement], int]:
+        """
+        Récupère une page des mouvements de stock d'un livre (plus récents d'abord) et leur nombre total.
+        """
+        return self.inventory_repository.get_movements(book_id=book_id, skip=skip, limit=limit)
+
+    @staticmethod
+    def _isbn_fields(isbn: str) -> Dict[str, str]:
+        # ISBN stocké sans séparateurs, plus sa forme ISBN-13 canonique pour les recherches
+        return {"isbn": compact_isbn(isbn), "isbn13": normalize_isbn(isbn)}
+
+
+def compact_inventory(db: Session) -> Optional[InventorySnapshot]:
+    """
+    Reporte les mouvements de stock récents dans la quantité enregistrée des livres.
+    """
+    return InventoryRepository(InventoryMovement, db).compact()
+
+
+def _on_book_change(db: Session, book_id: int, operation: str) -> None:
+    # Modification faite par un autre processus : invalide le cache de second niveau
+    # puis resynchronise l'index de recherche
+    book_cache.invalidate(book_id)
+    book = BookRepository(Book, db).get(id=book_id) if operation != "delete" else None
+    if book is None:
+        book_search_index.remove(book_id)
+    else:
+        book_search_index.add(book)
+
+
+change_listener.subscribe("book", _on_book_change)
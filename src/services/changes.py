@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.changes import ChangeLog
+from ..repositories.base import BaseRepository
+from ..repositories.changes import ChangeLogRepository
+
+# Gestionnaire appelé pour chaque entité modifiée : (session, id de l'entité, opération)
+ChangeHandler = Callable[[Session, int, str], None]
+
+
+class ChangeListener:
+    """
+    Suit le journal des modifications (`change_log`) à partir d'un curseur et notifie
+    les caches en mémoire concernés, pour rester cohérent avec les écritures des
+    autres processus.
+
+    Les gestionnaires doivent être idempotents : les modifications faites par le
+    processus lui-même (déjà appliquées à ses caches) repassent aussi par le journal.
+    """
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.cursor: Optional[int] = None
+        self._handlers: Dict[str, List[ChangeHandler]] = defaultdict(list)
+        self._lock = Lock()
+
+    def subscribe(self, entity: str, handler: ChangeHandler) -> None:
+        """
+        Abonne un gestionnaire aux modifications d'une table.
+        """
+        self._handlers[entity].append(handler)
+
+    def start(self, db: Session) -> None:
+        """
+        Place le curseur à la fin du journal : les caches viennent d'être construits.
+        """
+        self.cursor = ChangeLogRepository(ChangeLog, db).get_last_id()
+
+    def poll(self, db: Session) -> int:
+        """
+        Applique les nouvelles entrées du journal et retourne leur nombre.
+        """
+        with self._lock:
+            repository = ChangeLogRepository(ChangeLog, db)
+            if self.cursor is None:
+                self.cursor = repository.get_last_id()
+                return 0
+
+            count = 0
+            while True:
+                entries = repository.get_since(cursor=self.cursor, limit=self.batch_size)
+                if not entries:
+                    return count
+
+                # Une seule notification par entité et par lot, avec la dernière opération
+                latest = {}
+                for entry in entries:
+                    latest[(entry.entity, entry.entity_id)] = entry.operation
+                for (entity, entity_id), operation in latest.items():
+                    for handler in self._handlers.get(entity, ()):
+                        handler(db, entity_id, operation)
+
+                self.cursor = entries[-1].id
+                count += len(entries)
+                if len(entries) < self.batch_size:
+                    return count
+
+
+change_listener = ChangeListener()
+
+
+def poll_changes(db: Session) -> int:
+    """
+    Applique les modifications récentes aux caches du processus.
+    """
+    return change_listener.poll(db)
+
+
+def purge_change_log(db: Session, retention_days: int) -> int:
+    """
+    Supprime les entrées du journal plus anciennes que la durée de rétention.
+    """
+    before = datetime.utcnow() - timedelta(days=retention_days)
+    return ChangeLogRepository(ChangeLog, db).purge(before=before)
+
+
+class CursorExpiredError(ValueError):
+    """
+    Le curseur désigne des entrées déjà purgées : le client doit se resynchroniser entièrement.
+    """
+
+
+class ChangeFeedService:
+    """
+    Service du flux de modifications pour la synchronisation incrémentale des livres et emprunts.
+    """
+    ENTITIES = ("book", "loan")
+
+    def __init__(
+        self,
+        change_repository: ChangeLogRepository,
+        repositories: Dict[str, BaseRepository]
+    ):
+        self.change_repository = change_repository
+        self.repositories = repositories
+
+    def get_cursor(self) -> int:
+        """
+        Retourne le curseur courant, point de départ après un téléchargement complet.
+        """
+        return self.change_repository.get_last_id()
+
+    def get_changes(
+        self, *, cursor: int, limit: int = 500, entities: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Tuple[ChangeLog, Any]], int, bool]:
+        """
+        Retourne les événements postérieurs au curseur avec l'état actuel de chaque entité
+        (None pour une suppression), le nouveau curseur et l'existence d'une page suivante.
+        """
+        entities = tuple(entities or self.ENTITIES)
+        for entity in entities:
+            if entity not in self.ENTITIES:
+                raise ValueError(f"Entité inconnue : {entity}")
+
+        # Entrées entre le curseur et la plus ancienne conservée purgées : modifications perdues
+        # (la purge conserve toujours la dernière entrée, le journal n'est vide que s'il n'a jamais été écrit)
+        first_id = self.change_repository.get_first_id()
+        if first_id and cursor < first_id - 1:
+            raise CursorExpiredError("Curseur expiré : resynchronisation complète nécessaire")
+
+        entries = self.change_repository.get_since(cursor=cursor, limit=limit + 1, entities=entities)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # État actuel chargé en une requête par table
+        current = {}
+        for entity in entities:
+            ids = list({entry.entity_id for entry in entries if entry.entity == entity})
+            for obj in self.repositories[entity].get_many(ids):
+                current[(entity, obj.id)] = obj
+
+        events = [
+            (entry, None if entry.operation == "delete" else current.get((entry.entity, entry.entity_id)))
+            for entry in entries
+        ]
+        next_cursor = entries[-1].id if entries else cursor
+        return events, next_cursor, has_more
@@ -0,0 +1,241 @@
+import heapq
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from threading import Condition, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.loans import Loan
+from ..repositories.loans import LoanRepository
+from .changes import change_listener
+
+logger = logging.getLogger(__name__)
+
+DUE_SOON = "due_soon"
+OVERDUE = "overdue"
+
+# Gestionnaire appelé pour chaque événement : (session, id de l'emprunt, événement)
+DueDateHandler = Callable[[Session, int, str], None]
+
+# Entrée du tas : (déclenchement, id de l'emprunt, événement, échéance au moment de la planification)
+_Entry = Tuple[datetime, int, str, datetime]
+
+
+class DueDateScheduler:
+    """
+    Échéancier des emprunts actifs : un tas binaire ordonné par date de déclenchement
+    contient le rappel (« bientôt dû ») et le passage en retard de chaque emprunt.
+    Un thread dort jusqu'à la prochaine échéance, marque les indicateurs `reminder_sent`
+    et `is_overdue` puis notifie les abonnés ; aucune relecture complète de `loan`.
+
+    Les entrées périmées (emprunt rendu ou prolongé) restent dans le tas et sont
+    ignorées quand elles sortent. Les mises à jour conditionnelles garantissent
+    qu'un événement n'est émis qu'une fois, même avec plusieurs processus.
+    """
+    RETRY_DELAY = 5.0
+
+    def __init__(self, reminder_days: float):
+        self.reminder = timedelta(days=reminder_days)
+        self._heap: List[_Entry] = []
+        # Échéance courante de chaque emprunt planifié
+        self._due_dates: Dict[int, datetime] = {}
+        self._handlers: Dict[str, List[DueDateHandler]] = defaultdict(list)
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._stopping = False
+        # Faux dans les processus qui n'exécutent pas l'échéancier : rien n'y est planifié
+        self.enabled = True
+
+    def __len__(self) -> int:
+        return len(self._due_dates)
+
+    def subscribe(self, event: str, handler: DueDateHandler) -> None:
+        """
+        Abonne un gestionnaire aux événements `due_soon` ou `overdue`.
+        """
+        self._handlers[event].append(handler)
+
+    def start(self, db: Session) -> int:
+        """
+        Remplit le tas avec les emprunts actifs pas encore en retard (requête indexée).
+        """
+        rows = LoanRepository(Loan, db).get_pending_due_dates()
+        with self._condition:
+            self._heap.clear()
+            self._due_dates.clear()
+            for loan_id, due_date, reminder_sent in rows:
+                self._push(loan_id, due_date, reminder_sent)
+            self._condition.notify()
+        return len(rows)
+
+    def schedule(self, loan_id: int, due_date: datetime, *, reminder_sent: bool = False) -> None:
+        """
+        Planifie (ou replanifie après prolongation) les événements d'un emprunt actif.
+        """
+        if not self.enabled:
+            return
+        with self._condition:
+            # Déjà planifié à cette échéance (écho du journal des modifications, ...)
+            if self._due_dates.get(loan_id) == due_date:
+                return
+            self._push(loan_id, due_date, reminder_sent)
+            self._compact()
+            self._condition.notify()
+
+    def cancel(self, loan_id: int) -> None:
+        """
+        Retire un emprunt de l'échéancier (rendu ou supprimé).
+        """
+        if not self.enabled:
+            return
+        with self._condition:
+            self._due_dates.pop(loan_id, None)
+            self._compact()
+
+    def next_deadline(self) -> Optional[datetime]:
+        """
+        Date du prochain événement à traiter, s'il y en a un.
+        """
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self, db: Session, now: Optional[datetime] = None) -> int:
+        """
+        Traite les événements échus : met à jour les indicateurs en une transaction,
+        puis notifie les abonnés. Retourne le nombre d'événements émis.
+        """
+        now = now or datetime.utcnow()
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                fire_at, loan_id, event, due_date = entry
+                if self._due_dates.get(loan_id) != due_date:
+                    continue
+                # Échéance déjà passée : seul le passage en retard est signalé
+                if event == DUE_SOON and due_date <= now:
+                    continue
+                if event == OVERDUE:
+                    del self._due_dates[loan_id]
+                due.append(entry)
+        if not due:
+            return 0
+
+        repository = LoanRepository(Loan, db)
+        fired = []
+        try:
+            for fire_at, loan_id, event, due_date in due:
+                if event == OVERDUE:
+                    changed = repository.mark_overdue(loan_id=loan_id, now=now)
+                else:
+                    changed = repository.mark_reminded(loan_id=loan_id, due_date=due_date)
+                if changed:
+                    fired.append((loan_id, event))
+            db.commit()
+        except Exception:
+            # Les mises à jour sont conditionnelles : les entrées peuvent être rejouées
+            db.rollback()
+            with self._condition:
+                for entry in due:
+                    if entry[2] == OVERDUE:
+                        self._due_dates.setdefault(entry[1], entry[3])
+                    heapq.heappush(self._heap, entry)
+            raise
+
+        for loan_id, event in fired:
+            for handler in self._handlers[event]:
+                try:
+                    handler(db, loan_id, event)
+                except Exception:
+                    logger.exception("Échec du gestionnaire %s pour l'emprunt %s", event, loan_id)
+        return len(fired)
+
+    def run_in_background(self, session_factory: Callable[[], Session]) -> None:
+        """
+        Démarre le thread qui attend la prochaine échéance et traite les événements.
+        """
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = Thread(target=self._run, args=(session_factory,), name="due-date-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, session_factory: Callable[[], Session]) -> None:
+        delay: Optional[float] = None
+        while True:
+            with self._condition:
+                # Réveil à la prochaine échéance, ou plus tôt si un emprunt est planifié
+                while not self._stopping:
+                    if delay is None:
+                        self._discard_stale()
+                        if self._heap:
+                            delay = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                    if delay is not None and delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                    delay = None
+                if self._stopping:
+                    return
+
+            db = session_factory()
+            try:
+                self.run_pending(db)
+            except Exception:
+                logger.exception("Échec du traitement des échéances")
+                delay = self.RETRY_DELAY
+            else:
+                delay = None
+            finally:
+                db.close()
+
+    def _push(self, loan_id: int, due_date: datetime, reminder_sent: bool) -> None:
+        self._due_dates[loan_id] = due_date
+        if not reminder_sent:
+            heapq.heappush(self._heap, (due_date - self.reminder, loan_id, DUE_SOON, due_date))
+        heapq.heappush(self._heap, (due_date, loan_id, OVERDUE, due_date))
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._due_dates.get(self._heap[0][1]) != self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        # Reconstruit le tas quand les entrées périmées dominent
+        if len(self._heap) > 2 * len(self._due_dates) + 1024:
+            self._heap = [entry for entry in self._heap if self._due_dates.get(entry[1]) == entry[3]]
+            heapq.heapify(self._heap)
+
+
+due_date_scheduler = DueDateScheduler(reminder_days=settings.LOAN_REMINDER_DAYS)
+
+
+def _log_event(db: Session, loan_id: int, event: str) -> None:
+    if event == DUE_SOON:
+        logger.info("Emprunt %s : échéance dans moins de %s jours", loan_id, settings.LOAN_REMINDER_DAYS)
+    else:
+        logger.info("Emprunt %s : en retard", loan_id)
+
+
+def _on_loan_change(db: Session, loan_id: int, operation: str) -> None:
+    # Emprunt créé, prolongé ou rendu (éventuellement par un autre processus) : replanifie
+    loan = LoanRepository(Loan, db).get(id=loan_id) if operation != "delete" else None
+    if loan is None or loan.return_date is not None or loan.is_overdue:
+        due_date_scheduler.cancel(loan_id)
+    else:
+        due_date_scheduler.schedule(loan.id, loan.due_date, reminder_sent=loan.reminder_sent)
+
+
+due_date_scheduler.subscribe(DUE_SOON, _log_event)
+due_date_scheduler.subscribe(OVERDUE, _log_event)
+change_listener.subscribe("loan", _on_loan_change)
@@ -1,15 +1,18 @@
-from typing import List, Optional, Any, Dict, Union
+from typing import List, Optional, Any, Dict, Tuple, Union
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from ..repositories.loans import LoanRepository
+from ..repositories.loans import LOAN_SORT_KEYS, LoanRepository
 from ..repositories.books import BookRepository
 from ..repositories.users import UserRepository
+from ..repositories.inventory import InventoryRepository
 from ..models.loans import Loan
 from ..models.books import Book
+from ..models.inventory import CHECKOUT, RETURN, InventoryMovement
 from ..models.users import User
 from ..api.schemas.loans import LoanCreate, LoanUpdate
 from .base import BaseService
+from .due_dates import DueDateScheduler, due_date_scheduler
 
 
 class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
@@ -20,12 +23,16 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         self,
         loan_repository: LoanRepository,
         book_repository: BookRepository,
-        user_repository: UserRepository
+        user_repository: UserRepository,
+        scheduler: DueDateScheduler = due_date_scheduler,
+        inventory_repository: Optional[InventoryRepository] = None
     ):
         super().__init__(loan_repository)
         self.loan_repository = loan_repository
         self.book_repository = book_repository
         self.user_repository = user_repository
+        self.scheduler = scheduler
+        self.inventory_repository = inventory_repository or InventoryRepository(InventoryMovement, loan_repository.db)
 
     def get_active_loans(self) -> List[Loan]:
         """
@@ -39,17 +46,53 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         """
         return self.loan_repository.get_overdue_loans()
 
-    def get_loans_by_user(self, *, user_id: int) -> List[Loan]:
+    def get_current_loans(
+        self,
+        *,
+        overdue: bool = False,
+        skip: int = 0,
+        limit: int = 100,
+        sort: str = "due_date",
+        **filters: Any
+    ) -> Tuple[List[Loan], int]:
+        """
+        Récupère une page d'emprunts actifs (ou en retard) et leur nombre total.
+        Filtres : user_id, book_id, due_from, due_to, loan_from, loan_to.
+        """
+        if sort.lstrip("-") not in LOAN_SORT_KEYS:
+            raise ValueError(f"Tri inconnu : {sort} (choix : {', '.join(LOAN_SORT_KEYS)}, préfixe - pour décroissant)")
+        return self.loan_repository.get_current_page(overdue=overdue, skip=skip, limit=limit, sort=sort, **filters)
+
+    def get_loans_by_user(self, *, user_id: int, include_history: bool = False) -> List[Loan]:
+        """
+        Récupère les emprunts d'un utilisateur, y compris les emprunts archivés si demandé.
         """
-        Récupère les emprunts d'un utilisateur.
+        return self.loan_repository.get_loans_by_user(user_id=user_id, include_history=include_history)
+
+    def get_loans_by_book(self, *, book_id: int, include_history: bool = False) -> List[Loan]:
+        """
+        Récupère les emprunts d'un livre, y compris les emprunts archivés si demandé.
+        """
+        return self.loan_repository.get_loans_by_book(book_id=book_id, include_history=include_history)
+
+    def get_user_history(
+        self, *, user_id: int, skip: int = 0, limit: int = 50, include_history: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Récupère une page de l'historique d'un utilisateur (plus récents d'abord) et son nombre total.
         """
-        return self.loan_repository.get_loans_by_user(user_id=user_id)
+        return self.loan_repository.get_user_history(
+            user_id=user_id, skip=skip, limit=limit, include_history=include_history
+        )
 
-    def get_loans_by_book(self, *, book_id: int) -> List[Loan]:
+    def get_user_summary(self, *, user_id: int, include_history: bool = True) -> Dict[str, int]:
         """
-        Récupère les emprunts d'un livre.
+        Récupère le bilan des emprunts d'un utilisateur : en cours, en retard, total,
+        rendus et rendus à temps.
         """
-        return self.loan_repository.get_loans_by_book(book_id=book_id)
+        summary = self.loan_repository.get_user_summary(user_id=user_id, include_history=include_history)
+        summary["user_id"] = user_id
+        return summary
 
     def create_loan(
         self,
@@ -80,16 +123,22 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
             raise ValueError("Le livre n'est pas disponible pour l'emprunt")
 
         # Vérifier si l'utilisateur a déjà emprunté ce livre et ne l'a pas rendu
-        active_loans = self.loan_repository.get_active_loans()
-        for loan in active_loans:
-            if loan.user_id == user_id and loan.book_id == book_id:
+        user_active_loans = self.loan_repository.get_active_loans_by_user(user_id=user_id)
+        for loan in user_active_loans:
+            if loan.book_id == book_id:
                 raise ValueError("L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu")
 
         # Vérifier le nombre d'emprunts actifs de l'utilisateur (limite à 5 par exemple)
-        user_active_loans = [loan for loan in active_loans if loan.user_id == user_id]
         if len(user_active_loans) >= 5:
             raise ValueError("L'utilisateur a atteint la limite d'emprunts simultanés (5)")
 
+        # Réserver un exemplaire : la sortie n'est ajoutée au journal que s'il en reste un
+        # (contrôle et insertion atomiques), puis validée avec l'emprunt
+        if not self.inventory_repository.record(
+            book_id=book_id, delta=-1, reason=CHECKOUT, user_id=user_id, commit=False
+        ):
+            raise ValueError("Le livre n'est pas disponible pour l'emprunt")
+
         # Créer l'emprunt
         loan_data = {
             "user_id": user_id,
@@ -100,11 +149,7 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         }
 
         loan = self.loan_repository.create(obj_in=loan_data)
-
-        # Mettre à jour la quantité de livres disponibles
-        book.quantity -= 1
-        self.book_repository.update(db_obj=book, obj_in={"quantity": book.quantity})
-
+        self.scheduler.schedule(loan.id, loan.due_date)
         return loan
 
     def return_loan(self, *, loan_id: int) -> Loan:
@@ -120,16 +165,15 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         if loan.return_date:
             raise ValueError("L'emprunt a déjà été retourné")
 
-        # Marquer l'emprunt comme retourné
-        loan_data = {"return_date": datetime.utcnow()}
-        loan = self.loan_repository.update(db_obj=loan, obj_in=loan_data)
-
-        # Mettre à jour la quantité de livres disponibles
-        book = self.book_repository.get(id=loan.book_id)
-        if book:
-            book.quantity += 1
-            self.book_repository.update(db_obj=book, obj_in={"quantity": book.quantity})
+        # Remettre l'exemplaire en stock, dans la même transaction que le retour
+        self.inventory_repository.record(
+            book_id=loan.book_id, delta=1, reason=RETURN, user_id=loan.user_id, commit=False
+        )
 
+        # Marquer l'emprunt comme retourné (il n'est plus en retard)
+        loan_data = {"return_date": datetime.utcnow(), "is_overdue": False}
+        loan = self.loan_repository.update(db_obj=loan, obj_in=loan_data)
+        self.scheduler.cancel(loan.id)
         return loan
 
     def extend_loan(self, *, loan_id: int, extension_days: int = 7) -> Loan:
@@ -156,6 +200,16 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
 
         # Prolonger l'emprunt
         new_due_date = loan.due_date + timedelta(days=extension_days)
-        loan_data = {"due_date": new_due_date}
+        loan_data = {"due_date": new_due_date, "reminder_sent": False}
 
-        return self.loan_repository.update(db_obj=loan, obj_in=loan_data)
\ No newline at end of file
+        loan = self.loan_repository.update(db_obj=loan, obj_in=loan_data)
+        self.scheduler.schedule(loan.id, loan.due_date)
+        return loan
+
+
+def archive_returned_loans(db: Session, *, older_than_days: int, batch_size: int) -> int:
+    """
+    Archive les emprunts rendus depuis plus de `older_than_days` jours.
+    """
+    before = datetime.utcnow() - timedelta(days=older_than_days)
+    return LoanRepository(Loan, db).archive_returned(before=before, batch_size=batch_size)
@@ -0,0 +1,120 @@
+from itertools import chain
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.recommendations import BookRecommendation
+from ..repositories.recommendations import RecommendationRepository
+
+
+def borrowing_matrix(borrowings: np.ndarray) -> sparse.csc_matrix:
+    """
+    Matrice creuse emprunteurs × livres (1 si le lecteur a emprunté le livre) à partir
+    de couples (user_id, book_id) distincts, colonnes dans l'ordre de `np.unique` des livres.
+    """
+    _, user_index = np.unique(borrowings[:, 0], return_inverse=True)
+    book_ids, book_index = np.unique(borrowings[:, 1], return_inverse=True)
+    return sparse.csc_matrix(
+        (np.ones(len(borrowings), dtype=np.float32), (user_index, book_index)),
+        shape=(user_index.max() + 1, len(book_ids)),
+    )
+
+
+def top_similar(
+    matrix: sparse.csc_matrix,
+    columns: np.ndarray,
+    *,
+    k: int,
+    min_common: int = 1
+) -> Dict[str, np.ndarray]:
+    """
+    Pour chaque colonne de `columns`, les `k` colonnes les plus similaires (cosinus des vecteurs
+    d'emprunteurs, au moins `min_common` emprunteurs en commun), triées par similarité décroissante.
+    Retourne des tableaux parallèles : source, target (indices de colonnes), rank, score.
+    """
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    # Emprunteurs communs avec chaque livre : produit creux (colonnes ciblées)ᵀ × matrice
+    common = (matrix[:, columns].T @ matrix).tocoo()
+    source = columns[common.row]
+    keep = (common.data >= min_common) & (common.col != source)
+    source, target, shared = source[keep], common.col[keep], common.data[keep]
+    score = shared / np.sqrt(counts[source] * counts[target])
+
+    # Tri par livre source puis similarité décroissante (ID croissant à égalité), rang dans le groupe
+    order = np.lexsort((target, -score, source))
+    source, target, score = source[order], target[order], score[order]
+    rank = np.arange(len(source)) - np.searchsorted(source, source, side="left")
+    keep = rank < k
+    return {"source": source[keep], "target": target[keep], "rank": rank[keep], "score": score[keep]}
+
+
+class RecommendationService:
+    def __init__(self, repository: RecommendationRepository):
+        self.repository = repository
+
+    def get_for_book(self, *, book_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Livres empruntés par les lecteurs de ce livre (« ont aussi emprunté »), précalculés.
+        """
+        return self.repository.get_for_book(book_id=book_id, limit=limit or settings.RECOMMENDATION_COUNT)
+
+    def refresh(self, *, full: bool = False) -> Dict[str, Any]:
+        """
+        Recalcule les recommandations à partir des emprunts, en une transaction.
+
+        En mode incrémental, seuls les livres empruntés par les lecteurs des emprunts arrivés
+        depuis le dernier calcul sont recalculés ; les scores des autres livres ne tiennent
+        pas compte de la popularité nouvelle de leurs voisins jusqu'au prochain recalcul complet.
+        """
+        position = self.repository.get_latest_loan_id()
+        previous = self.repository.get_position()
+        full = full or previous is None
+
+        book_ids = None if full else self.repository.get_books_to_refresh(position=previous)
+        if book_ids == []:
+            return {"books": 0, "position": previous, "full": False}
+
+        pairs = self.repository.get_borrowings()
+        # Lecture directe des entiers (np.array sur des lignes SQLAlchemy est bien plus lent)
+        borrowings = np.fromiter(chain.from_iterable(pairs), dtype=np.int64, count=2 * len(pairs)).reshape(-1, 2)
+        rows = []
+        if len(borrowings):
+            matrix = borrowing_matrix(borrowings)
+            all_book_ids = np.unique(borrowings[:, 1])
+            if full:
+                columns = np.arange(len(all_book_ids))
+            else:
+                columns = np.searchsorted(all_book_ids, np.intersect1d(book_ids, all_book_ids))
+            # Par lots de livres : le produit creux d'un lot tient en mémoire
+            batch_size = settings.RECOMMENDATION_BATCH_SIZE
+            for start in range(0, len(columns), batch_size):
+                similar = top_similar(
+                    matrix,
+                    columns[start:start + batch_size],
+                    k=settings.RECOMMENDATION_COUNT,
+                    min_common=settings.RECOMMENDATION_MIN_CO_BORROWERS,
+                )
+                rows.extend(
+                    {"book_id": book_id, "recommended_book_id": target, "rank": rank, "score": score}
+                    for book_id, target, rank, score in zip(
+                        all_book_ids[similar["source"]].tolist(),
+                        all_book_ids[similar["target"]].tolist(),
+                        similar["rank"].tolist(),
+                        similar["score"].tolist(),
+                    )
+                )
+
+        self.repository.replace(book_ids=book_ids, rows=rows)
+        books = len({row["book_id"] for row in rows}) if full else len(book_ids)
+        self.repository.record_build(position=position, books=books, full=full)
+        return {"books": books, "position": position, "full": full}
+
+
+def refresh_recommendations(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Met à jour les recommandations avec les emprunts arrivés depuis le dernier calcul.
+    """
+    return RecommendationService(RecommendationRepository(BookRecommendation, db)).refresh(full=full)
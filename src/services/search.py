@@ -0,0 +1,116 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from ..models.books import Book
+from ..repositories.books import BookRepository
+from ..utils.prefix_index import PrefixIndex
+from ..utils.text import normalize_text
+from ..utils.trigram_index import TrigramIndex
+
+SEARCH_FIELDS = ("title", "author")
+
+
+class BookSearchIndex:
+    """
+    Index de recherche en mémoire sur les titres et auteurs des livres.
+
+    Construit au démarrage, puis tenu à jour par `BookService` à chaque
+    création, modification ou suppression de livre.
+    """
+    def __init__(self):
+        self.prefixes = PrefixIndex()
+        self.trigrams = {field: TrigramIndex() for field in SEARCH_FIELDS}
+        self._books: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def build(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        """
+        Reconstruit l'index à partir de couples (id, titre, auteur).
+        """
+        books = {
+            book_id: {"id": book_id, "title": title, "author": author}
+            for book_id, title, author in rows
+        }
+        self.prefixes.build(
+            (book_id, self._keys(book["title"], book["author"]))
+            for book_id, book in books.items()
+        )
+        for field, index in self.trigrams.items():
+            index.build(
+                (book_id, normalize_text(book[field])) for book_id, book in books.items()
+            )
+        self._books = books
+
+    def add(self, book: Book) -> None:
+        """
+        Indexe (ou réindexe) un livre.
+        """
+        self._books[book.id] = {"id": book.id, "title": book.title, "author": book.author}
+        self.prefixes.add(book.id, self._keys(book.title, book.author))
+        for field, index in self.trigrams.items():
+            index.add(book.id, normalize_text(getattr(book, field)))
+
+    def remove(self, book_id: int) -> None:
+        """
+        Retire un livre de l'index.
+        """
+        self.prefixes.remove(book_id)
+        for index in self.trigrams.values():
+            index.remove(book_id)
+        self._books.pop(book_id, None)
+
+    def autocomplete(self, *, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retourne les livres dont le titre ou l'auteur commence par `query`
+        (début de chaîne ou début de mot).
+        """
+        prefix = normalize_text(query)
+        book_ids = self.prefixes.search(prefix, limit=limit)
+        return [self._books[book_id] for book_id in book_ids if book_id in self._books]
+
+    def fuzzy_search(
+        self,
+        *,
+        query: str,
+        field: Optional[str] = None,
+        limit: int = 10,
+        threshold: float = 0.3
+    ) -> List[Tuple[int, float]]:
+        """
+        Recherche approximative (tolérante aux fautes de frappe) par similarité
+        de trigrammes sur le titre et/ou l'auteur.
+        Retourne des couples (id du livre, similarité) triés par similarité.
+        """
+        fields = (field,) if field else SEARCH_FIELDS
+        text = normalize_text(query)
+
+        # Un livre peut correspondre par son titre et par son auteur : on garde le meilleur score
+        best: Dict[int, float] = {}
+        for name in fields:
+            for book_id, similarity in self.trigrams[name].search(text, limit=limit, threshold=threshold):
+                if similarity > best.get(book_id, 0.0):
+                    best[book_id] = similarity
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    @staticmethod
+    def _keys(title: str, author: str) -> List[str]:
+        # Une clé par début de mot pour que "potter" retrouve "Harry Potter"
+        keys = []
+        for text in (title, author):
+            words = normalize_text(text).split()
+            keys.extend(" ".join(words[i:]) for i in range(len(words)))
+        return keys
+
+
+book_search_index = BookSearchIndex()
+
+
+def build_book_search_index(db: Session) -> None:
+    """
+    Construit l'index de recherche des livres à partir de la base de données.
+    """
+    repository = BookRepository(Book, db)
+    book_search_index.build(repository.get_search_rows())
@@ -1,11 +1,14 @@
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, select, union_all
 from sqlalchemy.orm import Session
 
 from ..models.books import Book
+from ..models.inventory import InventoryMovement
 from ..models.users import User
-from ..models.loans import Loan
+from ..models.loans import Loan, LoanHistory
+from ..repositories.inventory import InventoryRepository
+from ..repositories.loans import overdue_condition
 
 
 class StatsService:
@@ -15,19 +18,34 @@ class StatsService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_general_stats(self) -> Dict[str, Any]:
+    def _loans(self, include_history: bool):
+        """
+        Source des emprunts pour les agrégats : la table `loan`, ou son union avec
+        `loan_history` pour inclure les emprunts archivés.
+        """
+        if not include_history:
+            return Loan.__table__
+        columns = ("id", "user_id", "book_id", "loan_date")
+        return union_all(
+            select(*(Loan.__table__.c[name] for name in columns)),
+            select(*(LoanHistory.__table__.c[name] for name in columns)),
+        ).subquery("all_loans")
+
+    def get_general_stats(self, include_history: bool = False) -> Dict[str, Any]:
         """
         Récupère des statistiques générales sur la bibliothèque.
         """
-        total_books = self.db.query(func.sum(Book.quantity)).scalar() or 0
+        # Instantanés des livres + mouvements non compactés (plutôt que le stock courant livre par livre)
+        total_books = (self.db.query(func.sum(Book.quantity_snapshot)).scalar() or 0) + \
+            InventoryRepository(InventoryMovement, self.db).get_pending_total()
         unique_books = self.db.query(func.count(Book.id)).scalar() or 0
         total_users = self.db.query(func.count(User.id)).scalar() or 0
         active_users = self.db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
-        total_loans = self.db.query(func.count(Loan.id)).scalar() or 0
+        loans = self._loans(include_history)
+        total_loans = self.db.query(func.count(loans.c.id)).scalar() or 0
         active_loans = self.db.query(func.count(Loan.id)).filter(Loan.return_date == None).scalar() or 0
         overdue_loans = self.db.query(func.count(Loan.id)).filter(
-            Loan.return_date == None,
-            Loan.due_date < datetime.utcnow()
+            overdue_condition(Loan, datetime.utcnow())
         ).scalar() or 0
 
         return {
@@ -40,16 +58,17 @@ class StatsService:
             "overdue_loans": overdue_loans
         }
 
-    def get_most_borrowed_books(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_most_borrowed_books(self, limit: int = 10, include_history: bool = False) -> List[Dict[str, Any]]:
         """
         Récupère les livres les plus empruntés.
         """
+        loans = self._loans(include_history)
         result = self.db.query(
             Book.id,
             Book.title,
             Book.author,
-            func.count(Loan.id).label("loan_count")
-        ).join(Loan).group_by(Book.id).order_by(func.count(Loan.id).desc()).limit(limit).all()
+            func.count(loans.c.id).label("loan_count")
+        ).join(loans, loans.c.book_id == Book.id).group_by(Book.id).order_by(func.count(loans.c.id).desc()).limit(limit).all()
 
         return [
             {
@@ -61,16 +80,17 @@ class StatsService:
             for book in result
         ]
 
-    def get_most_active_users(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_most_active_users(self, limit: int = 10, include_history: bool = False) -> List[Dict[str, Any]]:
         """
         Récupère les utilisateurs les plus actifs.
         """
+        loans = self._loans(include_history)
         result = self.db.query(
             User.id,
             User.full_name,
             User.email,
-            func.count(Loan.id).label("loan_count")
-        ).join(Loan).group_by(User.id).order_by(func.count(Loan.id).desc()).limit(limit).all()
+            func.count(loans.c.id).label("loan_count")
+        ).join(loans, loans.c.user_id == User.id).group_by(User.id).order_by(func.count(loans.c.id).desc()).limit(limit).all()
 
         return [
             {
@@ -82,7 +102,7 @@ class StatsService:
             for user in result
         ]
 
-    def get_monthly_loans(self, months: int = 12) -> List[Dict[str, Any]]:
+    def get_monthly_loans(self, months: int = 12, include_history: bool = False) -> List[Dict[str, Any]]:
         """
         Récupère le nombre d'emprunts par mois pour les derniers mois.
         """
@@ -90,15 +110,16 @@ class StatsService:
 
         # Cette requête est simplifiée et peut ne pas fonctionner avec tous les SGBD
         # Pour une solution plus robuste, utilisez des fonctions spécifiques au SGBD
+        loans = self._loans(include_history)
         result = self.db.query(
-            func.strftime("%Y-%m", Loan.loan_date).label("month"),
-            func.count(Loan.id).label("loan_count")
+            func.strftime("%Y-%m", loans.c.loan_date).label("month"),
+            func.count(loans.c.id).label("loan_count")
         ).filter(
-            Loan.loan_date >= start_date
+            loans.c.loan_date >= start_date
         ).group_by(
-            func.strftime("%Y-%m", Loan.loan_date)
+            func.strftime("%Y-%m", loans.c.loan_date)
         ).order_by(
-            func.strftime("%Y-%m", Loan.loan_date)
+            func.strftime("%Y-%m", loans.c.loan_date)
         ).all()
 
         return [
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+from threading import RLock
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..api.schemas.token import TokenPayload
+from ..config import settings
+from ..models.tokens import RevokedToken
+from ..repositories.tokens import RevokedTokenRepository
+from ..utils.bloom import BloomFilter
+from .changes import change_listener
+
+
+class RevocationList:
+    """
+    Liste des tokens révoqués de ce processus : un filtre de Bloom chargé au démarrage
+    écarte sans requête les tokens jamais révoqués (l'immense majorité) ; seuls les
+    positifs, vrais ou faux, sont vérifiés dans la table `revoked_token`.
+
+    Les révocations des autres processus arrivent par le journal des modifications.
+    Le filtre est reconstruit quand il atteint sa capacité et après chaque purge.
+    """
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        # Ajouts et reconstructions sérialisés : une révocation arrivée pendant une reconstruction
+        # n'est pas perdue avec l'ancien filtre (réentrant : `add` reconstruit un filtre plein)
+        self._lock = RLock()
+        # Vérifications en base (positifs du filtre), pour suivre le taux de faux positifs
+        self.lookups = 0
+
+    def __len__(self) -> int:
+        return len(self._filter)
+
+    def load(self, db: Session) -> int:
+        """
+        Reconstruit le filtre à partir des révocations non expirées.
+        """
+        with self._lock:
+            jtis = RevokedTokenRepository(RevokedToken, db).get_active_jtis(now=datetime.utcnow())
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            bloom.update(jtis)
+            self._filter = bloom
+        return len(jtis)
+
+    def add(self, db: Session, jti: str) -> None:
+        """
+        Ajoute un token révoqué au filtre, en l'agrandissant s'il est plein.
+        """
+        with self._lock:
+            self._filter.add(jti)
+            if self._filter.is_full:
+                self.load(db)
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        """
+        Vérifie si un token est révoqué ; la base n'est lue que si le filtre le signale.
+        """
+        if jti not in self._filter:
+            return False
+        self.lookups += 1
+        return RevokedTokenRepository(RevokedToken, db).get_by_jti(jti=jti) is not None
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOKED_TOKEN_BLOOM_CAPACITY,
+    error_rate=settings.REVOKED_TOKEN_BLOOM_ERROR_RATE,
+)
+
+
+class TokenService:
+    """
+    Service de révocation des tokens d'accès.
+    """
+    def __init__(self, repository: RevokedTokenRepository, revocations: RevocationList = revocation_list):
+        self.repository = repository
+        self.revocations = revocations
+
+    def is_revoked(self, *, token_data: TokenPayload) -> bool:
+        """
+        Vérifie si un token décodé a été révoqué (les tokens sans jti ne peuvent pas l'être).
+        """
+        return token_data.jti is not None and self.revocations.is_revoked(self.repository.db, token_data.jti)
+
+    def revoke(self, *, token_data: TokenPayload) -> RevokedToken:
+        """
+        Révoque un token décodé jusqu'à son expiration.
+        """
+        if not token_data.jti:
+            raise ValueError("Token émis sans identifiant (jti) : il ne peut pas être révoqué")
+
+        revoked = self.repository.get_by_jti(jti=token_data.jti)
+        if revoked:
+            return revoked
+
+        expires_at = token_data.exp or datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        if expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+        try:
+            revoked = self.repository.create(obj_in={
+                "jti": token_data.jti,
+                "user_id": token_data.sub,
+                "expires_at": expires_at,
+            })
+        except IntegrityError:
+            # Révoqué au même moment par une autre requête
+            self.repository.db.rollback()
+            revoked = self.repository.get_by_jti(jti=token_data.jti)
+            if revoked is None:
+                raise
+        self.revocations.add(self.repository.db, token_data.jti)
+        return revoked
+
+
+def purge_revoked_tokens(db: Session) -> int:
+    """
+    Supprime les révocations des tokens expirés puis reconstruit le filtre. La reconstruction
+    a lieu même si un autre processus a déjà purgé : ses bits périmés sont ainsi effacés.
+    """
+    count = RevokedTokenRepository(RevokedToken, db).purge(before=datetime.utcnow())
+    revocation_list.load(db)
+    return count
+
+
+def _on_revoked_token_change(db: Session, revoked_id: int, operation: str) -> None:
+    # Révocation faite par un autre processus : ajoutée au filtre (les purges le reconstruisent)
+    if operation == "delete":
+        return
+    revoked = RevokedTokenRepository(RevokedToken, db).get(id=revoked_id)
+    if revoked is not None:
+        revocation_list.add(db, revoked.jti)
+
+
+change_listener.subscribe("revoked_token", _on_revoked_token_change)
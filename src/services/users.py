@@ -1,11 +1,17 @@
-from typing import Optional, List, Any, Dict, Union
+from typing import Optional, List, Any, Dict, Sequence, Union
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..repositories.users import UserRepository
+from ..repositories.users import UserRepository, user_cache
 from ..models.users import User
 from ..api.schemas.users import UserCreate, UserUpdate
-from ..utils.security import get_password_hash, verify_password
+from ..utils.security import get_password_hash, hash_passwords, verify_password
 from .base import BaseService
+from .changes import change_listener
+
+# En dessous, le démarrage du pool de processus coûte plus que le hachage lui-même
+PARALLEL_HASH_THRESHOLD = 16
 
 
 class UserService(BaseService[User, UserCreate, UserUpdate]):
@@ -71,6 +77,73 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
             return None
         return user
 
+    def import_users(
+        self,
+        *,
+        rows: Sequence[Dict[str, Any]],
+        batch_size: int = 1000,
+        workers: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Crée des utilisateurs en masse. Chaque ligne est validée comme un UserCreate ;
+        l'unicité des emails est vérifiée en une requête, les mots de passe sont hashés
+        en parallèle et les insertions groupées par transactions de `batch_size` lignes.
+        Les lignes refusées sont rapportées avec leur numéro (à partir de 1).
+        """
+        errors = []
+        valid = []
+        seen = set()
+        for row_number, row in enumerate(rows, start=1):
+            try:
+                user_in = UserCreate(**row)
+            except ValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])} : {error['msg']}" for error in e.errors()
+                )
+                email = row.get("email")
+                errors.append({"row": row_number, "email": None if email is None else str(email), "error": message})
+                continue
+            if user_in.email in seen:
+                errors.append({"row": row_number, "email": user_in.email, "error": "Email en double dans l'import"})
+                continue
+            seen.add(user_in.email)
+            valid.append((row_number, user_in))
+
+        existing = self.repository.get_existing_emails(emails=seen)
+        for row_number, user_in in valid:
+            if user_in.email in existing:
+                errors.append({"row": row_number, "email": user_in.email, "error": "L'email est déjà utilisé"})
+        valid = [(row_number, user_in) for row_number, user_in in valid if user_in.email not in existing]
+
+        hashes = hash_passwords(
+            [user_in.password for _, user_in in valid],
+            workers=workers if len(valid) >= PARALLEL_HASH_THRESHOLD else 1,
+        )
+        users = []
+        for (row_number, user_in), hashed_password in zip(valid, hashes):
+            user_data = user_in.dict()
+            del user_data["password"]
+            user_data["hashed_password"] = hashed_password
+            users.append((row_number, user_data))
+
+        created = 0
+        for start in range(0, len(users), batch_size):
+            batch = users[start:start + batch_size]
+            try:
+                created += len(self.repository.create_many(rows=[user_data for _, user_data in batch]))
+            except IntegrityError:
+                # Email créé entre-temps par une autre requête : ligne à ligne pour isoler les fautives
+                self.repository.db.rollback()
+                for row_number, user_data in batch:
+                    try:
+                        created += len(self.repository.create_many(rows=[user_data]))
+                    except IntegrityError:
+                        self.repository.db.rollback()
+                        errors.append({"row": row_number, "email": user_data["email"], "error": "L'email est déjà utilisé"})
+
+        errors.sort(key=lambda error: error["row"])
+        return {"created": created, "errors": errors}
+
     def is_active(self, *, user: User) -> bool:
         """
         Vérifie si un utilisateur est actif.
@@ -81,4 +154,12 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         """
         Vérifie si un utilisateur est administrateur.
         """
-        return user.is_admin
\ No newline at end of file
+        return user.is_admin
+
+
+def _on_user_change(db: Session, user_id: int, operation: str) -> None:
+    # Modification faite par un autre processus : l'entrée du cache est périmée
+    user_cache.invalidate(user_id)
+
+
+change_listener.subscribe("user", _on_user_change)
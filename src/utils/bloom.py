@@ -0,0 +1,51 @@
+import hashlib
+import math
+from threading import Lock
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom : ensemble probabiliste sans faux négatif. Une clé absente du
+    filtre n'a jamais été ajoutée ; une clé présente l'a été avec une probabilité
+    d'erreur proche de `error_rate` tant que `capacity` n'est pas dépassée.
+
+    Les k positions sont dérivées de deux empreintes (double hachage de Kirsch-Mitzenmacher).
+    Sûr entre threads ; une clé ne peut pas être retirée, il faut reconstruire le filtre.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def is_full(self) -> bool:
+        return self._count >= self.capacity
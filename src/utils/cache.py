@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class CacheBackend:
+    """
+    Interface d'un stockage clé-valeur pour les caches. `LRUCache` en est
+    l'implémentation en mémoire ; un stockage externe partagé entre processus
+    peut la remplacer en implémentant les mêmes méthodes.
+    """
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Cache en mémoire de taille bornée, avec éviction de l'entrée la moins
+    récemment utilisée. Sûr entre threads.
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Récupère une valeur et la marque comme récemment utilisée.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Ajoute ou remplace une valeur, en évinçant la plus ancienne si besoin.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Supprime une valeur si elle est présente.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Vide le cache.
+        """
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,59 @@
+import re
+
+_SEPARATORS = re.compile(r"[\s\-]")
+
+
+def compact_isbn(value: str) -> str:
+    """
+    Retire les séparateurs (tirets, espaces) d'un ISBN saisi.
+    """
+    return _SEPARATORS.sub("", value or "").upper()
+
+
+def isbn10_check_digit(digits: str) -> str:
+    """
+    Calcule la clé de contrôle ISBN-10 à partir des 9 premiers chiffres.
+    """
+    total = sum((10 - i) * int(d) for i, d in enumerate(digits[:9]))
+    check = (11 - total % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def isbn13_check_digit(digits: str) -> str:
+    """
+    Calcule la clé de contrôle ISBN-13 à partir des 12 premiers chiffres.
+    """
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits[:12]))
+    return str((10 - total % 10) % 10)
+
+
+def normalize_isbn(value: str) -> str:
+    """
+    Convertit un ISBN-10 ou ISBN-13 (avec ou sans séparateurs) en ISBN-13 canonique.
+    Lève une ValueError si le format ou la clé de contrôle est invalide.
+    """
+    isbn = compact_isbn(value)
+
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        if isbn10_check_digit(isbn) != isbn[9]:
+            raise ValueError("ISBN invalide : clé de contrôle incorrecte")
+        isbn13 = "978" + isbn[:9]
+        return isbn13 + isbn13_check_digit(isbn13)
+
+    if len(isbn) == 13 and isbn.isdigit():
+        if isbn13_check_digit(isbn) != isbn[12]:
+            raise ValueError("ISBN invalide : clé de contrôle incorrecte")
+        return isbn
+
+    raise ValueError("ISBN invalide : 10 ou 13 chiffres attendus")
+
+
+def is_valid_isbn(value: str) -> bool:
+    """
+    Vérifie si une valeur est un ISBN-10 ou ISBN-13 valide.
+    """
+    try:
+        normalize_isbn(value)
+    except ValueError:
+        return False
+    return True
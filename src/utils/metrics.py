@@ -0,0 +1,340 @@
+import json
+import os
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """
+    Compteur monotone, éventuellement étiqueté.
+    """
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def state(self) -> List[list]:
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def merge(self, states: Iterable[List[list]]) -> Dict[Tuple[str, ...], float]:
+        # Somme des valeurs de chaque processus, par jeu d'étiquettes
+        merged: Dict[Tuple[str, ...], float] = {}
+        for state in states:
+            for labels, value in state:
+                merged[tuple(labels)] = merged.get(tuple(labels), 0.0) + value
+        return merged
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], float]] = None) -> List[str]:
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in values.items()
+        ]
+
+
+class Gauge(Counter):
+    """
+    Valeur instantanée pouvant monter et descendre.
+    """
+    type = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """
+    Histogramme à seaux cumulés (format Prometheus), éventuellement étiqueté.
+    """
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Par jeu d'étiquettes : [compte par seau (+Inf en dernier), somme, total]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def state(self) -> List[list]:
+        with self._lock:
+            return [[list(labels), list(state[0]), state[1], state[2]] for labels, state in self._values.items()]
+
+    def merge(self, states: Iterable[List[list]]) -> Dict[Tuple[str, ...], tuple]:
+        # Seaux, sommes et totaux additionnés entre processus, par jeu d'étiquettes
+        merged: Dict[Tuple[str, ...], list] = {}
+        for state in states:
+            for labels, bucket_counts, total, count in state:
+                current = merged.setdefault(tuple(labels), [[0] * (len(self.buckets) + 1), 0.0, 0])
+                current[0] = [a + b for a, b in zip(current[0], bucket_counts)]
+                current[1] += total
+                current[2] += count
+        return {labels: tuple(state) for labels, state in merged.items()}
+
+    def samples(self, values: Optional[Dict[Tuple[str, ...], tuple]] = None) -> List[str]:
+        if values is None:
+            with self._lock:
+                values = {labels: (list(state[0]), state[1], state[2]) for labels, state in self._values.items()}
+
+        lines = []
+        for labels, (bucket_counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registre des métriques de l'application, exportées au format texte Prometheus.
+
+    Les métriques sont tenues par processus. Avec plusieurs processus (voir `src.cli.serve`),
+    chacun dépose régulièrement son état dans un répertoire partagé (`share`, `dump`) et
+    l'export additionne les états de tous les processus, quel que soit celui qui répond.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        # Répertoire partagé entre processus et nom du fichier de ce processus (None : pas de partage)
+        self._directory: Optional[str] = None
+        self._worker: Optional[str] = None
+        self._dump_lock = Lock()
+
+    @property
+    def shared(self) -> bool:
+        return self._directory is not None
+
+    def share(self, directory: str, worker: str) -> None:
+        """
+        Active l'agrégation entre processus : l'état de ce processus est déposé dans
+        `directory` sous le nom `worker` (un processus relancé reprend le fichier de son prédécesseur).
+        """
+        self._directory = directory
+        self._worker = worker
+
+    def dump(self) -> None:
+        """
+        Écrit l'état des métriques de ce processus dans le répertoire partagé (remplacement atomique).
+        """
+        if self._directory is None:
+            return
+        path = os.path.join(self._directory, f"{self._worker}.json")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        # Dépôt périodique et export concurrents dans un même processus : même fichier temporaire
+        with self._dump_lock:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({name: metric.state() for name, metric in self._metrics.items()}, f)
+            os.replace(temporary, path)
+
+    def _shared_states(self) -> List[Dict[str, Any]]:
+        states = []
+        for entry in os.scandir(self._directory):
+            if entry.is_file() and entry.name.endswith(".json"):
+                try:
+                    with open(entry.path, encoding="utf-8") as f:
+                        states.append(json.load(f))
+                except (OSError, ValueError):
+                    # Fichier retiré entre-temps : ignoré jusqu'au prochain dépôt
+                    continue
+        return states
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Produit l'export texte de toutes les métriques enregistrées.
+        """
+        states = None
+        if self._directory is not None:
+            # État de ce processus déposé d'abord : il est à jour, les autres datent de leur dernier dépôt
+            self.dump()
+            states = self._shared_states()
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if states is None:
+                lines.extend(metric.samples())
+            else:
+                lines.extend(metric.samples(metric.merge(state.get(metric.name, []) for state in states)))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Nombre de requêtes HTTP traitées", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Durée de traitement des requêtes HTTP", ("method", "route")
+)
+HTTP_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "Requêtes HTTP en cours de traitement"
+)
+DB_QUERIES = registry.counter(
+    "db_queries_total", "Nombre de requêtes SQL exécutées"
+)
+DB_QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "Durée d'exécution des requêtes SQL"
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "http_request_db_queries", "Nombre de requêtes SQL par requête HTTP", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "http_request_db_duration_seconds", "Temps SQL cumulé par requête HTTP", ("method", "route")
+)
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "single_flight_calls_total",
+    "Lectures regroupées : calculs exécutés, appels servis par un calcul en cours, attentes abandonnées",
+    ("group", "result")
+)
+DB_POOL_CHECKOUT = registry.histogram(
+    "db_pool_checkout_seconds", "Temps d'attente pour obtenir une connexion du pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+
+
+class RequestDBStats:
+    """
+    Statistiques SQL accumulées pendant le traitement d'une requête HTTP.
+    """
+    __slots__ = ("queries", "duration")
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+
+# Statistiques de la requête HTTP en cours (propagées aux threads du threadpool)
+current_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "current_request_db_stats", default=None
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Enregistre les écouteurs SQLAlchemy qui mesurent les requêtes SQL et
+    l'attente de connexion sur le pool.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Départ associé au contexte d'exécution, pour le retirer si la requête échoue
+        conn.info.setdefault("query_start", []).append((context, perf_counter()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_start"].pop()[1]
+        DB_QUERIES.inc()
+        DB_QUERY_LATENCY.observe(elapsed)
+        stats = current_request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.duration += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # Requête en échec : after_cursor_execute n'est pas appelé, son départ est retiré de la pile
+        conn = exception_context.connection
+        starts = conn.info.get("query_start") if conn is not None else None
+        if starts and starts[-1][0] is exception_context.execution_context:
+            starts.pop()
+
+    # Le pool n'expose pas d'événement avant l'obtention d'une connexion (`checkout` n'est émis
+    # qu'une fois l'attente terminée) : on chronomètre donc son point d'entrée, sur chaque pool
+    # de l'engine (engine.dispose() le remplace, par exemple après un fork)
+    _time_pool_checkout(engine.pool)
+
+    @event.listens_for(engine, "engine_disposed")
+    def _engine_disposed(engine):
+        _time_pool_checkout(engine.pool)
+
+
+def _time_pool_checkout(pool: Pool) -> None:
+    connect = pool.connect
+
+    def timed_connect():
+        start = perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_CHECKOUT.observe(perf_counter() - start)
+
+    pool.connect = timed_connect
@@ -0,0 +1,83 @@
+from bisect import bisect_left, insort
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+
+
+class PrefixIndex:
+    """
+    Index de préfixes en mémoire basé sur un tableau trié de couples (clé, id).
+
+    Une recherche coûte une dichotomie (O(log n)) puis un parcours limité
+    aux clés qui commencent par le préfixe demandé.
+    """
+    def __init__(self):
+        self._entries: List[Tuple[str, int]] = []
+        self._keys_by_id: Dict[int, List[str]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys_by_id)
+
+    def build(self, items: Iterable[Tuple[int, Iterable[str]]]) -> None:
+        """
+        Reconstruit entièrement l'index à partir de couples (id, clés).
+        """
+        entries = []
+        keys_by_id = {}
+        for doc_id, keys in items:
+            unique_keys = sorted({key for key in keys if key})
+            keys_by_id[doc_id] = unique_keys
+            entries.extend((key, doc_id) for key in unique_keys)
+        entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._keys_by_id = keys_by_id
+
+    def add(self, doc_id: int, keys: Iterable[str]) -> None:
+        """
+        Ajoute (ou remplace) les clés associées à un identifiant.
+        """
+        with self._lock:
+            self._discard(doc_id)
+            unique_keys = sorted({key for key in keys if key})
+            self._keys_by_id[doc_id] = unique_keys
+            for key in unique_keys:
+                insort(self._entries, (key, doc_id))
+
+    def remove(self, doc_id: int) -> None:
+        """
+        Retire toutes les clés associées à un identifiant.
+        """
+        with self._lock:
+            self._discard(doc_id)
+
+    def search(self, prefix: str, limit: int = 10) -> List[int]:
+        """
+        Retourne au plus `limit` identifiants dont une clé commence par `prefix`,
+        dans l'ordre lexicographique des clés.
+        """
+        if not prefix or limit <= 0:
+            return []
+
+        results: List[int] = []
+        seen = set()
+        # add/remove modifient le tableau en place : lecture sous le verrou (dichotomie + parcours court)
+        with self._lock:
+            entries = self._entries
+            position = bisect_left(entries, (prefix, -1))
+            while position < len(entries) and len(results) < limit:
+                key, doc_id = entries[position]
+                if not key.startswith(prefix):
+                    break
+                if doc_id not in seen:
+                    seen.add(doc_id)
+                    results.append(doc_id)
+                position += 1
+        return results
+
+    def _discard(self, doc_id: int) -> None:
+        for key in self._keys_by_id.pop(doc_id, []):
+            position = bisect_left(self._entries, (key, doc_id))
+            if position < len(self._entries) and self._entries[position] == (key, doc_id):
+                del self._entries[position]
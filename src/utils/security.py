@@ -1,5 +1,11 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from threading import Lock
+from uuid import uuid4
+from typing import Any, List, Sequence, Union, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -15,7 +21,7 @@ def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
     """
-    Crée un token JWT.
+    Crée un token JWT, identifié par un claim `jti` unique pour pouvoir le révoquer.
     """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -24,7 +30,7 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -40,4 +46,53 @@ def get_password_hash(password: str) -> str:
     """
     Génère un hash à partir d'un mot de passe en clair.
     """
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+# Pool de processus de hachage, créé au premier import parallèle puis réutilisé par les suivants
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_executor_lock = Lock()
+
+
+def _get_hash_executor(workers: int) -> ProcessPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            # "spawn" : pas de fork d'un serveur multi-thread (verrous hérités dans un état incohérent)
+            context = multiprocessing.get_context("spawn")
+            _hash_executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _hash_executor
+
+
+def hash_passwords(passwords: Sequence[str], workers: int = 0) -> List[str]:
+    """
+    Hashe une liste de mots de passe en parallèle dans un pool de processus partagé
+    (bcrypt est coûteux en CPU). `workers` = 0 : un processus par CPU ; le pool garde
+    la taille demandée à sa création.
+    """
+    workers = workers or os.cpu_count() or 1
+    if min(workers, len(passwords)) <= 1:
+        return [get_password_hash(password) for password in passwords]
+    global _hash_executor
+    executor = _get_hash_executor(workers)
+    chunksize = max(1, len(passwords) // (workers * 4))
+    try:
+        return list(executor.map(get_password_hash, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # Processus de hachage mort : pool recréé au prochain appel
+        with _hash_executor_lock:
+            if _hash_executor is executor:
+                _hash_executor = None
+        executor.shutdown(wait=False)
+        raise
+
+
+def shutdown_hash_executor() -> None:
+    """
+    Arrête le pool de hachage s'il a été créé (arrêt du serveur, fin d'un import en ligne de commande).
+    """
+    global _hash_executor
+    with _hash_executor_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,79 @@
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .metrics import SINGLE_FLIGHT_CALLS
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents identiques (même clé) : le premier exécute le calcul,
+    ceux qui arrivent pendant son exécution l'attendent et reçoivent le même résultat,
+    ou la même exception. Rien n'est conservé une fois le calcul terminé : ce n'est pas
+    un cache, les données restent aussi fraîches qu'une lecture directe.
+
+    Le résultat est partagé entre les appelants : il doit être indépendant de la session
+    de base de données (schémas pydantic, dictionnaires) et ne pas être modifié.
+    """
+    def __init__(self, name: str, *, timeout: Optional[float] = None, enabled: bool = True):
+        self.name = name
+        # Attente maximale d'un calcul en cours, au-delà l'appelant calcule lui-même
+        self.timeout = timeout
+        self.enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Exécute `func`, ou attend le calcul identique déjà en cours et retourne son résultat.
+        """
+        if not self.enabled:
+            return func()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.timeout):
+                SINGLE_FLIGHT_CALLS.inc(self.name, "coalesced")
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            SINGLE_FLIGHT_CALLS.inc(self.name, "timeout")
+            return func()
+
+        SINGLE_FLIGHT_CALLS.inc(self.name, "executed")
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """
+        Nombre de calculs en cours.
+        """
+        return len(self._calls)
+
+
+def flight_key(route: str, **params: Any) -> Hashable:
+    """
+    Clé d'un appel : gabarit de route et paramètres normalisés (ordre indifférent).
+    """
+    return (route, tuple(sorted(params.items())))
@@ -0,0 +1,102 @@
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBERS = re.compile(r"\b\d+\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Réduit une requête SQL à sa « forme » : espaces normalisés, littéraux
+    numériques et listes IN remplacés par un marqueur unique.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _NUMBERS.sub("?", shape)
+    return _PLACEHOLDER_LISTS.sub("(?)", shape)
+
+
+class RequestSQLTrace:
+    """
+    Trace des requêtes SQL exécutées pendant une requête HTTP.
+    """
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.shapes: Counter = Counter()
+        self.durations: Dict[str, float] = {}
+        self.total_time = 0.0
+
+    @property
+    def total_queries(self) -> int:
+        return sum(self.shapes.values())
+
+    def record(self, statement: str, elapsed: float) -> None:
+        shape = statement_shape(statement)
+        self.shapes[shape] += 1
+        self.durations[shape] = self.durations.get(shape, 0.0) + elapsed
+        self.total_time += elapsed
+
+    def n_plus_one_suspects(self) -> List[str]:
+        """
+        Formes de requêtes répétées au moins `threshold` fois.
+        """
+        return [shape for shape, count in self.shapes.most_common() if count >= self.threshold]
+
+    def summary(self) -> str:
+        """
+        Résumé compact, destiné à un en-tête HTTP.
+        """
+        return (
+            f"queries={self.total_queries}; time_ms={self.total_time * 1000:.1f}; "
+            f"shapes={len(self.shapes)}; n_plus_one={len(self.n_plus_one_suspects())}"
+        )
+
+    def log(self, method: str, path: str) -> None:
+        suspects = self.n_plus_one_suspects()
+        if not suspects:
+            logger.info("SQL %s %s : %s", method, path, self.summary())
+            return
+        details = "; ".join(
+            f"{self.shapes[shape]}x ({self.durations[shape] * 1000:.1f} ms) {shape[:200]}"
+            for shape in suspects
+        )
+        logger.warning("SQL %s %s : %s - N+1 suspecté : %s", method, path, self.summary(), details)
+
+
+# Trace de la requête HTTP en cours, uniquement en mode debug SQL
+current_sql_trace: ContextVar[Optional[RequestSQLTrace]] = ContextVar("current_sql_trace", default=None)
+
+
+def instrument_sql_debug(engine: Engine) -> None:
+    """
+    Enregistre les écouteurs SQLAlchemy qui attribuent chaque requête SQL
+    à la requête HTTP en cours.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_sql_trace.get() is not None:
+            conn.info.setdefault("sql_debug_start", []).append((context, perf_counter()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = current_sql_trace.get()
+        starts = conn.info.get("sql_debug_start")
+        if trace is not None and starts:
+            trace.record(statement, perf_counter() - starts.pop()[1])
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # Requête en échec : son départ n'est pas consommé par after_cursor_execute
+        conn = exception_context.connection
+        starts = conn.info.get("sql_debug_start") if conn is not None else None
+        if starts and starts[-1][0] is exception_context.execution_context:
+            starts.pop()
@@ -0,0 +1,16 @@
+import re
+import unicodedata
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(value: str) -> str:
+    """
+    Normalise un texte pour la recherche : minuscules, sans accents,
+    ponctuation remplacée par des espaces simples.
+    """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", without_accents).strip()
@@ -0,0 +1,113 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Découpe un texte normalisé en trigrammes, chaque mot étant encadré
+    d'espaces (même convention que pg_trgm).
+    """
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class TrigramIndex:
+    """
+    Index inversé trigramme -> documents, pour la recherche approximative.
+
+    La génération des candidats est bornée : les trigrammes sont parcourus du
+    plus rare au plus fréquent, ceux dont la liste dépasse `max_posting` sont
+    ignorés (trop peu discriminants) et au plus `max_candidates` documents
+    sont évalués, quelle que soit la taille du catalogue.
+    """
+    def __init__(self, *, max_posting: int = 5000, max_candidates: int = 500):
+        self.max_posting = max_posting
+        self.max_candidates = max_candidates
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        self._doc_trigrams: Dict[Hashable, Set[str]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_trigrams)
+
+    def build(self, items: Iterable[Tuple[Hashable, str]]) -> None:
+        """
+        Reconstruit entièrement l'index à partir de couples (id, texte normalisé).
+        """
+        postings: Dict[str, Set[Hashable]] = defaultdict(set)
+        doc_trigrams = {}
+        for doc_id, text in items:
+            grams = trigrams(text)
+            doc_trigrams[doc_id] = grams
+            for gram in grams:
+                postings[gram].add(doc_id)
+
+        with self._lock:
+            self._postings = postings
+            self._doc_trigrams = doc_trigrams
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """
+        Indexe (ou réindexe) un document.
+        """
+        grams = trigrams(text)
+        with self._lock:
+            self._discard(doc_id)
+            self._doc_trigrams[doc_id] = grams
+            for gram in grams:
+                self._postings[gram].add(doc_id)
+
+    def remove(self, doc_id: Hashable) -> None:
+        """
+        Retire un document de l'index.
+        """
+        with self._lock:
+            self._discard(doc_id)
+
+    def search(
+        self, text: str, *, limit: int = 10, threshold: float = 0.3
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Retourne les documents les plus proches de `text` sous forme de couples
+        (id, similarité), triés par similarité décroissante.
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+
+        with self._lock:
+            postings = [self._postings[gram] for gram in query if gram in self._postings]
+            postings.sort(key=len)
+            selective = [docs for docs in postings if len(docs) <= self.max_posting]
+
+            # Les trigrammes rares sont les plus discriminants : ils remplissent
+            # en premier le budget de candidats
+            candidates: Set[Hashable] = set()
+            for docs in selective or postings[:1]:
+                for doc_id in docs:
+                    if len(candidates) >= self.max_candidates:
+                        break
+                    candidates.add(doc_id)
+
+            scored = []
+            for doc_id in candidates:
+                doc_grams = self._doc_trigrams[doc_id]
+                common = len(query & doc_grams)
+                similarity = common / (len(query) + len(doc_grams) - common)
+                if similarity >= threshold:
+                    scored.append((doc_id, similarity))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def _discard(self, doc_id: Hashable) -> None:
+        for gram in self._doc_trigrams.pop(doc_id, ()):
+            docs = self._postings.get(gram)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._postings[gram]
@@ -1,11 +1,20 @@
+from itertools import count
+from typing import Dict
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.models.base import Base
-from src.db.session import get_db
+from src.db.session import enable_sqlite_foreign_keys, get_db
 from src.main import app
+from src.models.users import User
+from src.repositories.books import book_cache
+from src.repositories.users import user_cache
+from src.utils.security import create_access_token
+
+_user_numbers = count(1)
 
 
 @pytest.fixture(scope="session")
@@ -18,6 +27,7 @@ def engine():
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    enable_sqlite_foreign_keys(engine)
     Base.metadata.create_all(engine)
     return engine
 
@@ -27,6 +37,9 @@ def db_session(engine):
     """
     Crée une nouvelle session de base de données pour un test.
     """
+    # Les caches de second niveau survivent aux sessions : ils sont vidés avec la base de test
+    book_cache.clear()
+    user_cache.clear()
     connection = engine.connect()
     transaction = connection.begin()
     session = sessionmaker(bind=connection)()
@@ -52,7 +65,22 @@ def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
 
     from fastapi.testclient import TestClient
-    with TestClient(app) as client:
-        yield client
+    # Sans le lifespan : préchauffage et tâches périodiques travailleraient sur la base réelle
+    yield TestClient(app)
+
+    app.dependency_overrides = {}
 
-    app.dependency_overrides = {}
\ No newline at end of file
+@pytest.fixture(scope="function")
+def auth_headers(db_session):
+    """
+    Crée un utilisateur actif (administrateur si demandé) et retourne ses en-têtes d'authentification.
+    """
+    def make(*, is_admin: bool = False) -> Dict[str, str]:
+        user = User(
+            email=f"client{next(_user_numbers)}@example.com", hashed_password="x",
+            full_name="Client", is_active=True, is_admin=is_admin
+        )
+        db_session.add(user)
+        db_session.commit()
+        return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+    return make
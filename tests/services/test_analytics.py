@@ -0,0 +1,143 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.books import Book
+from src.models.loans import Loan, LoanHistory
+from src.models.users import User
+from src.services.analytics import DAY, UTILISATION_COLUMNS, UtilisationService, utilisation_metrics
+
+
+def test_utilisation_metrics():
+    """
+    Teste l'arithmétique des intervalles : chevauchement avec la fenêtre, emprunts en cours, livres jamais empruntés.
+    """
+    now = 100 * DAY
+    metrics = utilisation_metrics(
+        owned_since=np.array([0.0, 50 * DAY, 90 * DAY]),
+        copies=np.array([2, 1, 1]),
+        loan_book=np.array([0, 0, 1]),
+        loan_start=np.array([10 * DAY, 60 * DAY, 40 * DAY]),
+        loan_end=np.array([30 * DAY, np.nan, 45 * DAY]),
+        now=now,
+    )
+    # Livre 1 emprunté avant son ajout au catalogue : possédé depuis le premier emprunt
+    np.testing.assert_allclose(metrics["days_owned"], [100, 60, 10])
+    np.testing.assert_allclose(metrics["loan_days"], [60, 5, 0])
+    np.testing.assert_allclose(metrics["utilisation"], [0.3, 5 / 60, 0])
+    np.testing.assert_allclose(metrics["turnover"], [1, 1, 0])
+    np.testing.assert_allclose(metrics["idle_days"], [0, 55, np.nan])
+
+    # Fenêtre des 50 derniers jours : seul l'emprunt en cours du livre 0 compte
+    windowed = utilisation_metrics(
+        owned_since=np.array([0.0]), copies=np.array([2]), loan_book=np.array([0, 0]),
+        loan_start=np.array([10 * DAY, 60 * DAY]), loan_end=np.array([30 * DAY, np.nan]),
+        now=now, window_start=now - 50 * DAY,
+    )
+    assert (windowed["days_owned"][0], windowed["loan_days"][0], windowed["loans"][0]) == (50, 40, 1)
+
+
+def test_utilisation_page_and_export(db_session: Session):
+    """
+    Teste le rapport paginé et l'export CSV sur les emprunts en cours et archivés.
+    """
+    now = datetime.utcnow()
+    user = User(email="usage@example.com", hashed_password="x", full_name="Lecteur", is_active=True)
+    books = [
+        Book(title=f"Livre {i}", author="Auteur", isbn=f"978000000000{i}", publication_year=2000,
+             quantity=1, created_at=now - timedelta(days=100))
+        for i in range(3)
+    ]
+    db_session.add_all([user, *books])
+    db_session.commit()
+    db_session.add_all([
+        Loan(user_id=user.id, book_id=books[0].id, loan_date=now - timedelta(days=10), due_date=now + timedelta(days=4)),
+        LoanHistory(id=1000, user_id=user.id, book_id=books[1].id, loan_date=now - timedelta(days=50),
+                    return_date=now - timedelta(days=40), due_date=now - timedelta(days=36)),
+    ])
+    db_session.commit()
+
+    service = UtilisationService(db_session)
+    rows, total = service.get_page(sort="-utilisation", limit=2)
+    assert total == 3
+    assert [row["id"] for row in rows] == [books[1].id, books[0].id]
+    assert (rows[1]["copies"], rows[1]["loans"], rows[1]["idle_days"]) == (2, 1, 0)
+    assert round(rows[0]["loan_days"]) == 10 and round(rows[0]["idle_days"]) == 40
+
+    # Jamais emprunté : inactivité inconnue, classé en dernier
+    rows, _ = service.get_page(sort="idle_days", skip=2)
+    assert (rows[0]["id"], rows[0]["idle_days"]) == (books[2].id, None)
+
+    lines = "".join(service.export_csv(sort="id")).splitlines()
+    assert lines[0].startswith("id,title,author,copies")
+    assert [line.split(",")[0] for line in lines[1:]] == [str(book.id) for book in books]
+
+
+def test_utilisation_on_non_utc_host(db_session: Session, monkeypatch):
+    """
+    Teste que les durées ne dépendent pas du fuseau horaire du serveur.
+    """
+    now = datetime.utcnow()
+    book = Book(title="Livre", author="Auteur", isbn="9780000000010", publication_year=2000,
+                quantity=1, created_at=now - timedelta(days=100))
+    db_session.add(book)
+    db_session.commit()
+
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        table = UtilisationService(db_session).compute()
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert round(float(table["days_owned"][list(table["id"]).index(book.id)]), 1) == 100.0
+
+
+def test_utilisation_routes(client, db_session: Session, auth_headers, monkeypatch):
+    """
+    Teste les routes du rapport : page et X-Total-Count, tri inconnu, export CSV en flux et droits.
+    """
+    # Calcul refait à chaque requête : pas de table d'un autre test
+    monkeypatch.setattr(settings, "UTILISATION_CACHE_TTL", 0)
+    now = datetime.utcnow()
+    user = User(email="usage-route@example.com", hashed_password="x", full_name="Lecteur", is_active=True)
+    books = [
+        Book(title=f"Livre {i}", author="Auteur", isbn=f"978000000001{i}", publication_year=2000,
+             quantity=1, created_at=now - timedelta(days=100))
+        for i in range(3)
+    ]
+    db_session.add_all([user, *books])
+    db_session.commit()
+    db_session.add(
+        Loan(user_id=user.id, book_id=books[1].id, loan_date=now - timedelta(days=10), due_date=now + timedelta(days=4))
+    )
+    db_session.commit()
+    total = db_session.query(Book).count()
+    headers = auth_headers(is_admin=True)
+    url = f"{settings.API_V1_STR}/stats/utilisation"
+
+    response = client.get(url, params={"sort": "-utilisation", "limit": 1}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == str(total)
+    assert [(row["id"], row["copies"], row["loans"]) for row in response.json()] == [(books[1].id, 2, 1)]
+
+    response = client.get(url, params={"sort": "popularity"}, headers=headers)
+    assert response.status_code == 400
+    assert "Tri inconnu" in response.json()["detail"]
+    assert client.get(url, params={"days": 0}, headers=headers).status_code == 422
+    assert client.get(url, headers=auth_headers()).status_code == 403
+
+    with client.stream("GET", f"{url}/export", params={"sort": "id"}, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "utilisation.csv" in response.headers["content-disposition"]
+        lines = "".join(response.iter_text()).splitlines()
+    assert lines[0] == ",".join(UTILISATION_COLUMNS)
+    assert len(lines) == total + 1
+    assert [line.split(",")[0] for line in lines[-3:]] == [str(book.id) for book in books]
+
+    assert client.get(f"{url}/export", params={"sort": "-popularity"}, headers=headers).status_code == 400
+    assert client.get(f"{url}/export", headers=auth_headers()).status_code == 403
@@ -1,10 +1,16 @@
+from datetime import datetime, timedelta
+
 import pytest
 from sqlalchemy.orm import Session
 
+from src.config import settings
 from src.models.books import Book
+from src.models.loans import Loan, LoanHistory
+from src.models.users import User
 from src.repositories.books import BookRepository
+from src.repositories.users import UserRepository
 from src.services.books import BookService
-from src.api.schemas.books import BookCreate, BookUpdate
+from src.api.schemas.books import BookBulkUpdateItem, BookCreate, BookUpdate
 
 
 def test_create_book(db_session: Session):
@@ -17,7 +23,7 @@ def test_create_book(db_session: Session):
     book_in = BookCreate(
         title="Test Book",
         author="Test Author",
-        isbn="1234567890123",
+        isbn="9781234567897",
         publication_year=2020,
         description="A test book",
         quantity=5
@@ -27,7 +33,7 @@ def test_create_book(db_session: Session):
 
     assert book.title == "Test Book"
     assert book.author == "Test Author"
-    assert book.isbn == "1234567890123"
+    assert book.isbn == "9781234567897"
     assert book.publication_year == 2020
     assert book.description == "A test book"
     assert book.quantity == 5
@@ -43,7 +49,7 @@ def test_create_book_duplicate_isbn(db_session: Session):
     book_in = BookCreate(
         title="Test Book",
         author="Test Author",
-        isbn="1234567890123",
+        isbn="9781234567897",
         publication_year=2020,
         quantity=5
     )
@@ -65,7 +71,7 @@ def test_get_by_isbn(db_session: Session):
     book_in = BookCreate(
         title="Test Book",
         author="Test Author",
-        isbn="1234567890123",
+        isbn="9781234567897",
         publication_year=2020,
         quantity=5
     )
@@ -73,13 +79,13 @@ def test_get_by_isbn(db_session: Session):
     created_book = service.create(obj_in=book_in)
 
     # Récupération réussie
-    book = service.get_by_isbn(isbn="1234567890123")
+    book = service.get_by_isbn(isbn="9781234567897")
     assert book is not None
     assert book.id == created_book.id
-    assert book.isbn == "1234567890123"
+    assert book.isbn == "9781234567897"
 
     # Récupération échouée - ISBN inexistant
-    book = service.get_by_isbn(isbn="9999999999999")
+    book = service.get_by_isbn(isbn="9789999999991")
     assert book is None
 
 
@@ -93,14 +99,14 @@ def test_get_by_title(db_session: Session):
     book_in1 = BookCreate(
         title="Python Programming",
         author="Author One",
-        isbn="1111111111111",
+        isbn="9781111111113",
         publication_year=2020,
         quantity=3
     )
     book_in2 = BookCreate(
         title="Advanced Python",
         author="Author Two",
-        isbn="2222222222222",
+        isbn="9782222222224",
         publication_year=2021,
         quantity=2
     )
@@ -129,14 +135,14 @@ def test_get_by_author(db_session: Session):
     book_in1 = BookCreate(
         title="Book One",
         author="John Doe",
-        isbn="3333333333333",
+        isbn="9783333333335",
         publication_year=2020,
         quantity=3
     )
     book_in2 = BookCreate(
         title="Book Two",
         author="Jane Doe",
-        isbn="4444444444444",
+        isbn="9784444444446",
         publication_year=2021,
         quantity=2
     )
@@ -165,7 +171,7 @@ def test_update_quantity(db_session: Session):
     book_in = BookCreate(
         title="Test Book",
         author="Test Author",
-        isbn="1234567890123",
+        isbn="9781234567897",
         publication_year=2020,
         quantity=5
     )
@@ -186,4 +192,150 @@ def test_update_quantity(db_session: Session):
 
     # Tentative de mise à jour d’un livre inexistant
     with pytest.raises(ValueError, match="Livre avec l'ID 999 non trouvé"):
-        service.update_quantity(book_id=999, quantity_change=1)
\ No newline at end of file
+        service.update_quantity(book_id=999, quantity_change=1)
+
+def test_isbn_normalisation(db_session: Session):
+    """
+    Teste la recherche d'un même livre par ISBN-10, ISBN-13 et ISBN avec tirets.
+    """
+    repository = BookRepository(Book, db_session)
+    service = BookService(repository)
+
+    book_in = BookCreate(
+        title="Test Book",
+        author="Test Author",
+        isbn="0-306-40615-2",
+        publication_year=2020,
+        quantity=1
+    )
+
+    book = service.create(obj_in=book_in)
+    assert book.isbn == "0306406152"
+    assert book.isbn13 == "9780306406157"
+
+    for isbn in ("0306406152", "978-0-306-40615-7", "9780306406157"):
+        found = service.get_by_isbn(isbn=isbn)
+        assert found is not None
+        assert found.id == book.id
+
+    # Le même livre saisi en ISBN-13 est un doublon
+    book_in.isbn = "9780306406157"
+    with pytest.raises(ValueError, match="L'ISBN est déjà utilisé"):
+        service.create(obj_in=book_in)
+
+
+def test_create_book_invalid_isbn(db_session: Session):
+    """
+    Teste le rejet d'un ISBN dont la clé de contrôle est incorrecte.
+    """
+    repository = BookRepository(Book, db_session)
+    service = BookService(repository)
+
+    book_in = BookCreate(
+        title="Test Book",
+        author="Test Author",
+        isbn="9780306406158",
+        publication_year=2020,
+        quantity=1
+    )
+
+    with pytest.raises(ValueError, match="ISBN invalide"):
+        service.create(obj_in=book_in)
+
+
+def test_remove_cascades_to_loans(db_session: Session):
+    """
+    Teste la suppression en masse de livres et d'un utilisateur, avec suppression
+    de leurs emprunts (en cours et archivés) par la base.
+    """
+    user = User(email="cascade@example.com", hashed_password="x", full_name="Cascade", is_active=True)
+    books = [
+        Book(title=f"Livre {i}", author="Auteur", isbn=isbn, isbn13=isbn, publication_year=2000, quantity=1)
+        for i, isbn in enumerate(("9780441013593", "9782070360024", "9782253004226"))
+    ]
+    db_session.add_all([user, *books])
+    db_session.flush()
+    now = datetime.utcnow()
+    for book in books:
+        db_session.add(Loan(user_id=user.id, book_id=book.id, loan_date=now, due_date=now + timedelta(days=14)))
+        db_session.add(LoanHistory(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=30),
+                                   due_date=now - timedelta(days=16), return_date=now - timedelta(days=20)))
+    db_session.commit()
+    user_id, book_ids = user.id, [book.id for book in books]
+    db_session.expunge_all()
+
+    service = BookService(BookRepository(Book, db_session))
+    result = service.remove_many(ids=[book_ids[0], book_ids[1], book_ids[0], 999999])
+
+    assert result == {"deleted": book_ids[:2], "not_found": [999999]}
+    assert [loan.book_id for loan in db_session.query(Loan)] == [book_ids[2]]
+    assert [loan.book_id for loan in db_session.query(LoanHistory)] == [book_ids[2]]
+
+    UserRepository(User, db_session).remove(id=user_id)
+    assert db_session.query(Loan).count() == 0
+    assert db_session.query(LoanHistory).count() == 0
+
+
+def test_update_many(db_session: Session):
+    """
+    Teste la mise à jour en masse : quantités, réindexation des titres, IDs inconnus
+    et annulation complète en cas de conflit d'ISBN.
+    """
+    repository = BookRepository(Book, db_session)
+    service = BookService(repository)
+    books = [
+        service.create(obj_in=BookCreate(title=f"Inventaire {i}", author="Auteur", isbn=isbn,
+                                         publication_year=2000, quantity=1))
+        for i, isbn in enumerate(("9780441013593", "9782070360024", "9782253004226"))
+    ]
+    ids = [book.id for book in books]
+
+    result = service.update_many(items=[
+        BookBulkUpdateItem(id=ids[0], quantity=7),
+        BookBulkUpdateItem(id=ids[1], quantity=0, title="Stock épuisé"),
+        BookBulkUpdateItem(id=999999, quantity=3),
+    ])
+    assert result == {"updated": ids[:2], "not_found": [999999]}
+    assert [(book.quantity, book.title) for book in repository.get_many(ids)] == [
+        (7, "Inventaire 0"), (0, "Stock épuisé"), (1, "Inventaire 2")
+    ]
+    assert [match["id"] for match in service.autocomplete(query="stock")] == [ids[1]]
+
+    # Dernière vérification : l'annulation emporte aussi la transaction de test
+    with pytest.raises(ValueError, match="aucun livre mis à jour"):
+        service.update_many(items=[
+            BookBulkUpdateItem(id=ids[0], quantity=2),
+            BookBulkUpdateItem(id=ids[2], isbn="978-2-07-036002-4"),
+        ])
+
+
+def test_bulk_delete_route(client, db_session: Session, auth_headers, monkeypatch):
+    """
+    Teste la route de suppression groupée : livres et emprunts supprimés, IDs inconnus, limites et droits.
+    """
+    url = f"{settings.API_V1_STR}/books/bulk-delete"
+    user = User(email="bulk@example.com", hashed_password="x", full_name="Lecteur", is_active=True)
+    books = [
+        Book(title=f"Livre {i}", author="Auteur", isbn=f"978000000000{i}", publication_year=2000, quantity=2)
+        for i in range(3)
+    ]
+    db_session.add_all([user, *books])
+    db_session.commit()
+    now = datetime.utcnow()
+    db_session.add(Loan(user_id=user.id, book_id=books[0].id, loan_date=now, due_date=now + timedelta(days=14)))
+    db_session.commit()
+    ids = [book.id for book in books]
+    headers = auth_headers(is_admin=True)
+
+    response = client.post(url, json={"ids": [ids[0], ids[1], 999999]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"deleted": [ids[0], ids[1]], "not_found": [999999]}
+    db_session.expire_all()
+    assert [book.id for book in db_session.query(Book).filter(Book.id.in_(ids))] == [ids[2]]
+    assert db_session.query(Loan).filter(Loan.user_id == user.id).count() == 0
+
+    assert client.post(url, json={"ids": []}, headers=headers).status_code == 422
+    monkeypatch.setattr(settings, "BOOK_BULK_MAX_ITEMS", 1)
+    assert client.post(url, json={"ids": [ids[2], 999999]}, headers=headers).status_code == 413
+    assert client.post(url, json={"ids": [ids[2]]}, headers=auth_headers()).status_code == 403
+    assert db_session.query(Book).filter(Book.id == ids[2]).count() == 1
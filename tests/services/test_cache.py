@@ -0,0 +1,84 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.users import User
+from src.repositories.books import BookRepository, book_cache
+from src.repositories.cache import EntityCache
+from src.repositories.users import UserRepository
+from src.services.books import BookService
+from src.services.search import BookSearchIndex
+from src.services.users import UserService
+from src.utils.cache import LRUCache
+from src.api.schemas.books import BookCreate, BookUpdate
+from src.api.schemas.users import UserCreate
+
+
+def _count_queries(session: Session):
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_book_served_from_cache(db_session: Session):
+    """
+    Teste la lecture d'un livre depuis le cache de second niveau, par ID et par ISBN.
+    """
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book_in = BookCreate(title="Dune", author="Frank Herbert", isbn="978-0-441-01359-3", publication_year=1965, quantity=2)
+    book = service.create(obj_in=book_in)
+    book_id = book.id
+    service.get(id=book_id)
+    db_session.expunge_all()
+
+    statements = _count_queries(db_session)
+    cached = service.get(id=book_id)
+    assert cached.title == "Dune"
+    assert service.get_by_isbn(isbn="0441013597").id == book_id
+    assert statements == []
+
+
+def test_cache_invalidated_on_update_and_remove(db_session: Session):
+    """
+    Teste l'invalidation du cache lors de la modification et de la suppression.
+    """
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book_in = BookCreate(title="Dune", author="Frank Herbert", isbn="9780441013593", publication_year=1965, quantity=2)
+    book_id = service.create(obj_in=book_in).id
+    service.get(id=book_id)
+
+    service.update(db_obj=service.get(id=book_id), obj_in=BookUpdate(title="Dune Messiah", isbn="9780441172696"))
+    assert book_cache.get(book_id) is None
+    db_session.expunge_all()
+    assert service.get(id=book_id).title == "Dune Messiah"
+    assert service.get_by_isbn(isbn="9780441013593") is None
+
+    service.remove(id=book_id)
+    db_session.expunge_all()
+    assert service.get(id=book_id) is None
+
+
+def test_user_by_email_cached(db_session: Session):
+    """
+    Teste la lecture d'un utilisateur par email depuis le cache.
+    """
+    service = UserService(UserRepository(User, db_session))
+    user = service.create(obj_in=UserCreate(email="cache@example.com", password="password123", full_name="Cache"))
+    service.get_by_email(email="cache@example.com")
+    db_session.expunge_all()
+
+    statements = _count_queries(db_session)
+    assert service.get_by_email(email="cache@example.com").id == user.id
+    assert statements == []
+
+
+def test_stale_read_not_cached():
+    """
+    Teste qu'une ligne lue avant une invalidation n'est pas mise en cache.
+    """
+    cache = EntityCache(LRUCache(maxsize=10), unique_keys=("email",))
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.set({"id": 1, "email": "old@example.com"}, generation)
+    assert cache.get(1) is None
+    assert cache.get_id("email", "old@example.com") is None
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.books import Book
+from src.models.changes import ChangeLog
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.changes import ChangeLogRepository
+from src.repositories.loans import LoanRepository
+from src.services.books import BookService
+from src.services.changes import ChangeFeedService, ChangeListener, CursorExpiredError, purge_change_log
+from src.services.search import BookSearchIndex
+from src.api.schemas.books import BookCreate, BookUpdate
+
+
+def _create_book(service: BookService) -> Book:
+    book_in = BookCreate(title="Dune", author="Frank Herbert", isbn="9780441013593", publication_year=1965, quantity=2)
+    return service.create(obj_in=book_in)
+
+
+def test_change_log_written_by_repository(db_session: Session):
+    """
+    Teste l'écriture du journal lors de la création, la modification et la suppression.
+    """
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    cursor = ChangeLogRepository(ChangeLog, db_session).get_last_id()
+
+    book = _create_book(service)
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(title="Dune Messiah"))
+    service.remove(id=book.id)
+
+    entries = ChangeLogRepository(ChangeLog, db_session).get_since(cursor=cursor)
+    assert [(entry.entity, entry.entity_id, entry.operation) for entry in entries] == [
+        ("book", book.id, "create"),
+        ("book", book.id, "update"),
+        ("book", book.id, "delete"),
+    ]
+
+
+def test_cascaded_loan_deletes_logged(db_session: Session):
+    """
+    Teste la journalisation des emprunts supprimés en cascade avec leur livre.
+    """
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book = _create_book(service)
+    user = User(email="cascade@example.com", hashed_password="x", full_name="Lecteur", is_active=True)
+    db_session.add(user)
+    db_session.flush()
+    now = datetime.utcnow()
+    loans = [Loan(user_id=user.id, book_id=book.id, loan_date=now, due_date=now + timedelta(days=14)) for _ in range(2)]
+    db_session.add_all(loans)
+    db_session.commit()
+    loan_ids = [loan.id for loan in loans]
+    cursor = ChangeLogRepository(ChangeLog, db_session).get_last_id()
+
+    assert BookRepository(Book, db_session).remove_many(ids=[book.id]) == [book.id]
+
+    entries = ChangeLogRepository(ChangeLog, db_session).get_since(cursor=cursor)
+    assert sorted((entry.entity, entry.entity_id, entry.operation) for entry in entries) == sorted([
+        ("book", book.id, "delete"),
+        *(("loan", loan_id, "delete") for loan_id in loan_ids),
+    ])
+
+
+def test_change_listener_poll(db_session: Session):
+    """
+    Teste la lecture du journal à partir du curseur et le regroupement par entité.
+    """
+    listener = ChangeListener(batch_size=2)
+    calls = []
+    listener.subscribe("book", lambda db, entity_id, operation: calls.append((entity_id, operation)))
+    listener.start(db_session)
+
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book = _create_book(service)
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(quantity=5))
+    service.remove(id=book.id)
+
+    assert listener.poll(db_session) == 3
+    # Lots de 2 entrées : create + update regroupés, puis delete
+    assert calls == [(book.id, "update"), (book.id, "delete")]
+    assert listener.poll(db_session) == 0
+
+
+def test_change_feed(db_session: Session):
+    """
+    Teste le flux de modifications : état actuel, suppressions et pagination par curseur.
+    """
+    feed = ChangeFeedService(
+        ChangeLogRepository(ChangeLog, db_session),
+        {"book": BookRepository(Book, db_session), "loan": LoanRepository(Loan, db_session)},
+    )
+    cursor = feed.get_cursor()
+
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book = _create_book(service)
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(quantity=5))
+
+    events, cursor, has_more = feed.get_changes(cursor=cursor, limit=1)
+    assert has_more
+    assert [(entry.operation, obj.quantity) for entry, obj in events] == [("create", 5)]
+
+    service.remove(id=book.id)
+    events, cursor, has_more = feed.get_changes(cursor=cursor, limit=10, entities=["book"])
+    assert not has_more
+    assert [(entry.operation, obj) for entry, obj in events] == [("update", None), ("delete", None)]
+    assert feed.get_changes(cursor=cursor)[0] == []
+
+
+def test_change_feed_cursor_expired_after_full_purge(db_session: Session):
+    """
+    Teste l'expiration d'un curseur quand toutes les entrées qui le suivent ont été purgées.
+    """
+    changes = ChangeLogRepository(ChangeLog, db_session)
+    feed = ChangeFeedService(
+        changes, {"book": BookRepository(Book, db_session), "loan": LoanRepository(Loan, db_session)}
+    )
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    cursor = feed.get_cursor()
+    book = _create_book(service)
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(quantity=5))
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(quantity=6))
+    last_id = changes.get_last_id()
+
+    # Rétention nulle : seule la dernière entrée est conservée, le curseur courant reste exact
+    purge_change_log(db_session, retention_days=-1)
+    assert changes.get_first_id() == last_id
+    assert feed.get_cursor() == last_id
+    assert feed.get_changes(cursor=last_id - 1)[1] == last_id
+    with pytest.raises(CursorExpiredError):
+        feed.get_changes(cursor=cursor)
+
+
+def test_changes_route(client, db_session: Session, auth_headers):
+    """
+    Teste la route du flux : curseur initial, événements, accès aux emprunts et erreurs.
+    """
+    url = f"{settings.API_V1_STR}/changes/"
+    headers = auth_headers()
+    admin_headers = auth_headers(is_admin=True)
+
+    response = client.get(url, params={"entity": "book"}, headers=headers)
+    assert response.status_code == 200
+    cursor = response.json()["cursor"]
+    assert response.json()["events"] == []
+
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book = _create_book(service)
+    response = client.get(url, params={"since": cursor, "entity": "book"}, headers=headers)
+    assert response.status_code == 200
+    feed = response.json()
+    assert [(event["entity_id"], event["operation"], event["data"]["title"]) for event in feed["events"]] == [
+        (book.id, "create", "Dune")
+    ]
+    assert not feed["has_more"] and feed["cursor"] > cursor
+
+    # Emprunts réservés aux administrateurs, y compris via le flux complet par défaut
+    assert client.get(url, params={"since": cursor}, headers=headers).status_code == 403
+    assert client.get(url, params={"since": cursor, "entity": "loan"}, headers=headers).status_code == 403
+    assert client.get(url, params={"since": cursor}, headers=admin_headers).status_code == 200
+    assert client.get(url, params={"since": cursor, "entity": "author"}, headers=headers).status_code == 400
+    assert client.get(url, params={"since": cursor}).status_code == 401
+
+
+def test_changes_route_cursor_expired(client, db_session: Session, auth_headers):
+    """
+    Teste la réponse 410 pour un curseur dont les entrées suivantes ont été purgées.
+    """
+    headers = auth_headers()
+    cursor = ChangeLogRepository(ChangeLog, db_session).get_last_id()
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    book = _create_book(service)
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(quantity=5))
+    service.update(db_obj=service.get(id=book.id), obj_in=BookUpdate(quantity=6))
+    purge_change_log(db_session, retention_days=-1)
+
+    response = client.get(f"{settings.API_V1_STR}/changes/", params={"since": cursor, "entity": "book"}, headers=headers)
+    assert response.status_code == 410
+    assert "resynchronisation" in response.json()["detail"]
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.loans import LoanRepository
+from src.services.due_dates import DUE_SOON, OVERDUE, DueDateScheduler
+
+
+def _create_loan(db: Session, due_in: timedelta) -> Loan:
+    user = User(email="due@example.com", hashed_password="x", full_name="Due", is_active=True)
+    book = Book(title="Dune", author="Frank Herbert", isbn="9780441013593", isbn13="9780441013593", publication_year=1965, quantity=3)
+    db.add_all([user, book])
+    db.flush()
+    now = datetime.utcnow()
+    loan = Loan(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=10), due_date=now + due_in)
+    db.add(loan)
+    db.commit()
+    return loan
+
+
+def test_scheduler_fires_due_soon_then_overdue(db_session: Session):
+    """
+    Teste le rappel puis le passage en retard, émis une seule fois.
+    """
+    loan = _create_loan(db_session, timedelta(days=3))
+    scheduler = DueDateScheduler(reminder_days=2)
+    events = []
+    scheduler.subscribe(DUE_SOON, lambda db, loan_id, event: events.append((loan_id, event)))
+    scheduler.subscribe(OVERDUE, lambda db, loan_id, event: events.append((loan_id, event)))
+
+    assert scheduler.start(db_session) == 1
+    assert scheduler.next_deadline() == loan.due_date - timedelta(days=2)
+    assert scheduler.run_pending(db_session) == 0
+
+    assert scheduler.run_pending(db_session, now=loan.due_date - timedelta(days=1)) == 1
+    assert scheduler.next_deadline() == loan.due_date
+    assert scheduler.run_pending(db_session, now=loan.due_date + timedelta(seconds=1)) == 1
+    assert events == [(loan.id, DUE_SOON), (loan.id, OVERDUE)]
+    assert scheduler.next_deadline() is None
+
+    db_session.refresh(loan)
+    assert loan.reminder_sent and loan.is_overdue
+    assert [overdue.id for overdue in LoanRepository(Loan, db_session).get_overdue_loans()] == [loan.id]
+
+    # Un autre processus reprenant le même emprunt n'émet rien
+    other = DueDateScheduler(reminder_days=2)
+    other.schedule(loan.id, loan.due_date)
+    assert other.run_pending(db_session, now=loan.due_date + timedelta(seconds=2)) == 0
+
+
+def test_scheduler_reschedule_and_cancel(db_session: Session):
+    """
+    Teste la replanification après prolongation et le retrait après retour.
+    """
+    loan = _create_loan(db_session, timedelta(days=1))
+    scheduler = DueDateScheduler(reminder_days=2)
+    scheduler.start(db_session)
+
+    new_due_date = loan.due_date + timedelta(days=7)
+    loan.due_date = new_due_date
+    db_session.commit()
+    scheduler.schedule(loan.id, new_due_date)
+    # Les entrées de l'ancienne échéance sont ignorées
+    assert scheduler.run_pending(db_session, now=new_due_date - timedelta(days=5)) == 0
+    assert scheduler.next_deadline() == new_due_date - timedelta(days=2)
+
+    scheduler.cancel(loan.id)
+    assert scheduler.next_deadline() is None
+    assert scheduler.run_pending(db_session, now=new_due_date + timedelta(days=1)) == 0
+    assert len(scheduler) == 0
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.books import Book
+from src.models.inventory import ADJUSTMENT, CHECKOUT, RETURN, InventoryMovement
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.inventory import InventoryRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.books import BookService, compact_inventory
+from src.services.loans import LoanService
+from src.services.search import BookSearchIndex
+from src.api.schemas.books import BookBulkUpdateItem
+
+
+def test_loans_write_to_inventory_ledger(db_session: Session):
+    """
+    Teste le stock courant calculé à partir du journal : emprunts, retours,
+    refus quand le stock est épuisé, puis compactage dans l'instantané.
+    """
+    users = [User(email=f"stock{i}@example.com", hashed_password="x", full_name="Stock", is_active=True) for i in range(3)]
+    book = Book(title="Dune", author="Frank Herbert", isbn="9780441013593", isbn13="9780441013593", publication_year=1965, quantity=2)
+    db_session.add_all([*users, book])
+    db_session.commit()
+    user_ids, book_id = [user.id for user in users], book.id
+
+    book_repository = BookRepository(Book, db_session)
+    service = LoanService(LoanRepository(Loan, db_session), book_repository, UserRepository(User, db_session))
+    loans = [service.create_loan(user_id=user_id, book_id=book_id) for user_id in user_ids[:2]]
+    with pytest.raises(ValueError, match="pas disponible"):
+        service.create_loan(user_id=user_ids[2], book_id=book_id)
+    service.return_loan(loan_id=loans[0].id)
+
+    book = book_repository.get(id=book_id, use_cache=False)
+    assert (book.quantity, book.quantity_snapshot) == (1, 2)
+    movements = db_session.query(InventoryMovement).order_by(InventoryMovement.id).all()
+    assert [(m.reason, m.delta, m.user_id) for m in movements] == [
+        (CHECKOUT, -1, user_ids[0]), (CHECKOUT, -1, user_ids[1]), (RETURN, 1, user_ids[0])
+    ]
+
+    snapshot = compact_inventory(db_session)
+    assert (snapshot.position, snapshot.books) == (movements[-1].id, 1)
+    assert compact_inventory(db_session) is None
+    book = book_repository.get(id=book_id, use_cache=False)
+    assert (book.quantity, book.quantity_snapshot) == (1, 1)
+    assert InventoryRepository(InventoryMovement, db_session).get_pending_total() == 0
+
+
+def test_book_quantity_adjustments(db_session: Session):
+    """
+    Teste les corrections de stock : ajout au journal, refus d'un stock négatif, historique.
+    """
+    book = Book(title="Dune", author="Frank Herbert", isbn="9780441013593", isbn13="9780441013593", publication_year=1965, quantity=1)
+    db_session.add(book)
+    db_session.commit()
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+
+    assert service.update_quantity(book_id=book.id, quantity_change=2).quantity == 3
+    with pytest.raises(ValueError, match="négative"):
+        service.update_quantity(book_id=book.id, quantity_change=-4)
+    assert service.update(db_obj=service.get(id=book.id), obj_in={"quantity": 5}).quantity == 5
+
+    movements, total = service.get_movements(book_id=book.id, limit=1)
+    assert total == 2
+    assert [(m.reason, m.delta) for m in movements] == [(ADJUSTMENT, 2)]
+    assert service.get(id=book.id).quantity_snapshot == 1
+
+
+def test_inventory_after_compaction_and_deletion(db_session: Session):
+    """
+    Teste qu'un mouvement n'est jamais ignoré après compactage et suppression d'un livre,
+    et qu'une quantité d'inventaire s'applique au stock au moment de l'écriture.
+    """
+    books = [
+        Book(title=f"Livre {i}", author="Auteur", isbn=f"978000000000{i}", isbn13=f"978000000000{i}",
+             publication_year=2000, quantity=5)
+        for i in range(2)
+    ]
+    db_session.add_all(books)
+    db_session.commit()
+    book_id, deleted_id = books[0].id, books[1].id
+    inventory = InventoryRepository(InventoryMovement, db_session)
+    book_repository = BookRepository(Book, db_session)
+
+    assert inventory.record(book_id=book_id, delta=-1, reason=CHECKOUT)
+    assert inventory.record(book_id=deleted_id, delta=-1, reason=CHECKOUT)
+    compact_inventory(db_session)
+    # La suppression emporte le dernier mouvement compacté : son ID ne doit pas resservir
+    book_repository.remove_many(ids=[deleted_id])
+    assert inventory.record(book_id=book_id, delta=-1, reason=CHECKOUT)
+    assert book_repository.get(id=book_id, use_cache=False).quantity == 3
+
+    # Inventaire à 0 : l'écart (-3) est calculé sur le stock courant, qui ne peut plus descendre
+    service = BookService(book_repository, search_index=BookSearchIndex())
+    result = service.update_many(items=[BookBulkUpdateItem(id=book_id, quantity=0), BookBulkUpdateItem(id=deleted_id, quantity=2)])
+    assert result == {"updated": [book_id], "not_found": [deleted_id]}
+    assert book_repository.get(id=book_id, use_cache=False).quantity == 0
+    assert not inventory.record(book_id=book_id, delta=-1, reason=CHECKOUT)
+    assert inventory.set_quantities(quantities={book_id: 0}, reason=ADJUSTMENT) == []
+
+
+def test_movements_route(client, db_session: Session, auth_headers):
+    """
+    Teste la route des mouvements d'un livre : page la plus récente d'abord, total, livre inconnu et droits.
+    """
+    book = Book(title="Dune", author="Frank Herbert", isbn="9780441013593", isbn13="9780441013593", publication_year=1965, quantity=1)
+    db_session.add(book)
+    db_session.commit()
+    service = BookService(BookRepository(Book, db_session), search_index=BookSearchIndex())
+    for change in (2, -1, 3):
+        service.update_quantity(book_id=book.id, quantity_change=change)
+    headers = auth_headers(is_admin=True)
+
+    response = client.get(f"{settings.API_V1_STR}/books/{book.id}/movements", params={"limit": 2}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "3"
+    assert [(m["delta"], m["reason"]) for m in response.json()] == [(3, ADJUSTMENT), (-1, ADJUSTMENT)]
+
+    assert client.get(f"{settings.API_V1_STR}/books/999999/movements", headers=headers).status_code == 404
+    assert client.get(f"{settings.API_V1_STR}/books/{book.id}/movements", params={"limit": 0}, headers=headers).status_code == 422
+    assert client.get(f"{settings.API_V1_STR}/books/{book.id}/movements", headers=auth_headers()).status_code == 403
@@ -0,0 +1,23 @@
+from src.cli.loadtest import Recorder
+
+
+def test_recorder_errors():
+    """
+    Teste le décompte des erreurs : statuts >= 400 et échecs de transport, hors refus métier attendus.
+    """
+    recorder = Recorder()
+    recorder.record("GET /books/{id}", 0.01, 200)
+    recorder.record("GET /books/{id}", 0.01, 404)
+    recorder.record("GET /stats/general", 0.01, 403)
+    recorder.record("POST /loans/", 0.01, 400)
+    recorder.record("POST /loans/", 0.01, 422)
+    recorder.record("POST /loans/{id}/return", 0.01, 400)
+    recorder.record("POST /loans/{id}/return", 0.01, None)
+
+    report = recorder.report(1.0)
+    assert report["GET /books/{id}"]["errors"] == 1
+    assert report["GET /stats/general"]["errors"] == 1
+    assert report["POST /loans/"]["errors"] == 1
+    assert report["POST /loans/"]["statuses"] == {400: 1, 422: 1}
+    assert report["POST /loans/{id}/return"]["errors"] == 1
+    assert report["TOTAL"]["errors"] == 4
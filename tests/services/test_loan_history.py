@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.changes import ChangeLog
+from src.models.loans import Loan, LoanHistory
+from src.models.users import User
+from src.repositories.changes import ChangeLogRepository
+from src.repositories.loans import LoanRepository
+from src.services.loans import archive_returned_loans
+from src.services.stats import StatsService
+
+
+def _create_loans(db: Session):
+    user = User(email="archive@example.com", hashed_password="x", full_name="Archive", is_active=True)
+    book = Book(title="Dune", author="Frank Herbert", isbn="9780441013593", isbn13="9780441013593", publication_year=1965, quantity=3)
+    db.add_all([user, book])
+    db.flush()
+    now = datetime.utcnow()
+    loans = [
+        # Rendu il y a longtemps : à archiver
+        Loan(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=200),
+             due_date=now - timedelta(days=186), return_date=now - timedelta(days=190)),
+        Loan(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=150),
+             due_date=now - timedelta(days=136), return_date=now - timedelta(days=140)),
+        # Rendu récemment, puis en cours : restent dans `loan`
+        Loan(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=20),
+             due_date=now - timedelta(days=6), return_date=now - timedelta(days=10)),
+        Loan(user_id=user.id, book_id=book.id, loan_date=now - timedelta(days=2),
+             due_date=now + timedelta(days=12)),
+    ]
+    db.add_all(loans)
+    db.commit()
+    return user.id, book.id, [(loan.id, loan.return_date) for loan in loans]
+
+
+def test_archive_returned_loans(db_session: Session):
+    """
+    Teste le déplacement par lots des anciens emprunts rendus vers l'historique.
+    """
+    user_id, book_id, loans = _create_loans(db_session)
+    cursor = ChangeLogRepository(ChangeLog, db_session).get_last_id()
+
+    assert archive_returned_loans(db_session, older_than_days=90, batch_size=1) == 2
+    assert archive_returned_loans(db_session, older_than_days=90, batch_size=1) == 0
+    # Emprunts sortis de `loan` : journalisés comme supprimés pour les autres processus
+    entries = ChangeLogRepository(ChangeLog, db_session).get_since(cursor=cursor)
+    assert [(entry.entity, entry.entity_id, entry.operation) for entry in entries] == [
+        ("loan", loans[0][0], "delete"),
+        ("loan", loans[1][0], "delete"),
+    ]
+
+    repository = LoanRepository(Loan, db_session)
+    assert [loan.id for loan in repository.get_loans_by_user(user_id=user_id)] == [loans[2][0], loans[3][0]]
+    history = repository.get_loans_by_book(book_id=book_id, include_history=True)
+    assert [(loan.id, loan.return_date) for loan in history] == loans
+    assert isinstance(history[0], LoanHistory)
+
+
+def test_archive_keeps_loan_ids_unique(db_session: Session):
+    """
+    Teste qu'un ID archivé n'est pas réattribué, et qu'un emprunt dont l'ID figure déjà
+    dans l'historique n'est jamais supprimé.
+    """
+    user_id, book_id, loans = _create_loans(db_session)
+    db_session.query(Loan).filter(Loan.id.in_([loans[2][0], loans[3][0]])).delete()
+    db_session.commit()
+    archive_returned_loans(db_session, older_than_days=90, batch_size=100)
+
+    now = datetime.utcnow()
+    loan = Loan(user_id=user_id, book_id=book_id, loan_date=now, due_date=now + timedelta(days=14))
+    db_session.add(loan)
+    db_session.commit()
+    assert loan.id > loans[3][0]
+
+    # ID réattribué (base migrée sans AUTOINCREMENT) : l'archivage refuse le lot
+    reused = Loan(id=loans[0][0], user_id=user_id, book_id=book_id, loan_date=now - timedelta(days=200),
+                  due_date=now - timedelta(days=186), return_date=now - timedelta(days=190))
+    db_session.add(reused)
+    db_session.commit()
+    with pytest.raises(ValueError, match="réattribués"):
+        archive_returned_loans(db_session, older_than_days=90, batch_size=100)
+    assert db_session.get(Loan, loans[0][0]) is not None
+
+
+def test_stats_include_history(db_session: Session):
+    """
+    Teste l'inclusion des emprunts archivés dans les statistiques.
+    """
+    user_id, book_id, _ = _create_loans(db_session)
+    service = StatsService(db_session)
+    before = service.get_general_stats(include_history=True)["total_loans"]
+
+    archive_returned_loans(db_session, older_than_days=90, batch_size=100)
+
+    assert service.get_general_stats()["total_loans"] == before - 2
+    assert service.get_general_stats(include_history=True)["total_loans"] == before
+    borrowed = {row["id"]: row["loan_count"] for row in service.get_most_borrowed_books(include_history=True)}
+    assert borrowed[book_id] == 4
+    active = {row["id"]: row["loan_count"] for row in service.get_most_active_users()}
+    assert active[user_id] == 2
+
+
+def test_user_history_and_summary(db_session: Session):
+    """
+    Teste l'historique paginé (plus récents d'abord) et le bilan agrégé d'un utilisateur.
+    """
+    user_id, _, loans = _create_loans(db_session)
+    archive_returned_loans(db_session, older_than_days=90, batch_size=100)
+    repository = LoanRepository(Loan, db_session)
+
+    page, total = repository.get_user_history(user_id=user_id, limit=1)
+    assert total == 2
+    assert [row["id"] for row in page] == [loans[3][0]]
+
+    page, total = repository.get_user_history(user_id=user_id, skip=1, limit=10, include_history=True)
+    assert total == 4
+    assert [row["id"] for row in page] == [loans[2][0], loans[1][0], loans[0][0]]
+
+    assert repository.get_user_summary(user_id=user_id) == {
+        "total_loans": 4,
+        "active_loans": 1,
+        "overdue_loans": 0,
+        "returned_loans": 3,
+        "returned_on_time": 3,
+    }
+    assert repository.get_user_summary(user_id=user_id, include_history=False)["total_loans"] == 2
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+from src.services.stats import StatsService
+
+
+@pytest.fixture
+def current_loans(db_session: Session):
+    users = [User(email=f"list{i}@example.com", hashed_password="x", full_name=f"Liste {i}", is_active=True) for i in range(2)]
+    book = Book(title="Dune", author="Frank Herbert", isbn="9780441013593", isbn13="9780441013593", publication_year=1965, quantity=9)
+    db_session.add_all([*users, book])
+    db_session.flush()
+    now = datetime.utcnow()
+    loans = [
+        Loan(user_id=users[0].id, book_id=book.id, loan_date=now - timedelta(days=30), due_date=now - timedelta(days=16), is_overdue=True),
+        Loan(user_id=users[1].id, book_id=book.id, loan_date=now - timedelta(days=20), due_date=now - timedelta(days=6), is_overdue=True),
+        Loan(user_id=users[0].id, book_id=book.id, loan_date=now - timedelta(days=5), due_date=now + timedelta(days=9)),
+        Loan(user_id=users[1].id, book_id=book.id, loan_date=now - timedelta(days=40), due_date=now - timedelta(days=26),
+             return_date=now - timedelta(days=28)),
+    ]
+    db_session.add_all(loans)
+    db_session.commit()
+    service = LoanService(LoanRepository(Loan, db_session), BookRepository(Book, db_session), UserRepository(User, db_session))
+    return service, [user.id for user in users], [loan.id for loan in loans]
+
+
+def test_current_loans_sort_and_paginate(current_loans):
+    """
+    Teste le tri, la pagination et le nombre total des emprunts actifs et en retard.
+    """
+    service, user_ids, loan_ids = current_loans
+
+    loans, total = service.get_current_loans(sort="-due_date", limit=2)
+    assert total == 3
+    assert [loan.id for loan in loans] == [loan_ids[2], loan_ids[1]]
+    loans, _ = service.get_current_loans(sort="-due_date", skip=2, limit=2)
+    assert [loan.id for loan in loans] == [loan_ids[0]]
+
+    loans, total = service.get_current_loans(overdue=True, sort="-days_overdue")
+    assert total == 2
+    assert [loan.id for loan in loans] == [loan_ids[0], loan_ids[1]]
+
+    loans, _ = service.get_current_loans(sort="user")
+    assert [loan.user_id for loan in loans] == [user_ids[0], user_ids[0], user_ids[1]]
+
+
+def test_current_loans_filters(current_loans):
+    """
+    Teste les filtres par emprunteur et par plage de dates, et le refus d'un tri inconnu.
+    """
+    service, user_ids, loan_ids = current_loans
+    now = datetime.utcnow()
+
+    loans, total = service.get_current_loans(user_id=user_ids[0])
+    assert total == 2
+    assert [loan.id for loan in loans] == [loan_ids[0], loan_ids[2]]
+
+    loans, total = service.get_current_loans(due_from=now - timedelta(days=10), due_to=now)
+    assert total == 1
+    assert loans[0].id == loan_ids[1]
+
+    with pytest.raises(ValueError):
+        service.get_current_loans(sort="title")
+
+
+def test_overdue_without_scheduler(current_loans, db_session: Session):
+    """
+    Teste qu'un emprunt échu compte comme en retard avant d'être marqué par l'échéancier.
+    """
+    service, user_ids, loan_ids = current_loans
+    # Échu depuis une heure, pas encore marqué (échéancier pas encore passé ou arrêté)
+    now = datetime.utcnow()
+    late = Loan(user_id=user_ids[1], book_id=service.loan_repository.get(id=loan_ids[0]).book_id,
+                loan_date=now - timedelta(days=14), due_date=now - timedelta(hours=1))
+    db_session.add(late)
+    db_session.commit()
+
+    loans, total = service.get_current_loans(overdue=True, sort="-days_overdue")
+    assert total == 3
+    assert [loan.id for loan in loans] == [loan_ids[0], loan_ids[1], late.id]
+    assert {loan.id for loan in LoanRepository(Loan, db_session).get_overdue_loans()} == {loan_ids[0], loan_ids[1], late.id}
+    assert StatsService(db_session).get_general_stats()["overdue_loans"] == 3
+    assert LoanRepository(Loan, db_session).get_user_summary(user_id=user_ids[1])["overdue_loans"] == 2
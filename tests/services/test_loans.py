@@ -12,6 +12,9 @@ from src.services.loans import LoanService
 from src.api.schemas.books import BookCreate
 from src.api.schemas.users import UserCreate
 
+# ISBN-13 valides (clé de contrôle correcte) pour les livres créés en série
+ISBNS = ("9781234567002", "9781234567019", "9781234567026", "9781234567033", "9781234567040")
+
 
 @pytest.fixture
 def create_user(db_session: Session):
@@ -39,7 +42,7 @@ def create_book(db_session: Session):
     book_in = BookCreate(
         title="Test Book",
         author="Test Author",
-        isbn="1234567890123",
+        isbn="9781234567897",
         publication_year=2020,
         quantity=5
     )
@@ -133,7 +136,7 @@ def test_create_loan_max_loans(db_session: Session, create_user):
         book_in = BookCreate(
             title=f"Book {i}",
             author="Test Author",
-            isbn=f"1234567890{i:03d}",
+            isbn=ISBNS[i],
             publication_year=2020,
             quantity=1
         )
@@ -148,7 +151,7 @@ def test_create_loan_max_loans(db_session: Session, create_user):
     new_book_in = BookCreate(
         title="New Book",
         author="Test Author",
-        isbn="1234567890999",
+        isbn="9781234567996",
         publication_year=2020,
         quantity=1
     )
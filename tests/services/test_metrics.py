@@ -0,0 +1,35 @@
+from src.utils.metrics import MetricsRegistry
+
+
+def _registry(directory: str, worker: str) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requêtes", ("route",))
+    registry.histogram("latency_seconds", "Durée", buckets=(0.1, 1.0))
+    registry.share(directory, worker)
+    return registry
+
+
+def test_shared_registry_sums_workers(tmp_path):
+    """
+    Teste l'export agrégé des métriques de plusieurs processus.
+    """
+    first, second = _registry(str(tmp_path), "0"), _registry(str(tmp_path), "1")
+    first._metrics["requests_total"].inc("/books")
+    first._metrics["latency_seconds"].observe(0.05)
+    second._metrics["requests_total"].inc("/books", amount=2)
+    second._metrics["requests_total"].inc("/loans")
+    second._metrics["latency_seconds"].observe(0.5)
+    second.dump()
+
+    # Quel que soit le processus qui répond, l'export couvre les deux
+    lines = first.render().splitlines()
+    assert 'requests_total{route="/books"} 3.0' in lines
+    assert 'requests_total{route="/loans"} 1.0' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+
+    # Sans partage, chaque registre n'exporte que ses propres valeurs
+    local = MetricsRegistry()
+    local.counter("requests_total", "Requêtes", ("route",)).inc("/books")
+    assert 'requests_total{route="/books"} 1.0' in local.render().splitlines()
@@ -0,0 +1,89 @@
+import asyncio
+import cProfile
+import pstats
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+from src.api.profiling import ProfiledRoute, current_profiler
+
+
+def busy_a():
+    return sum(range(20000))
+
+
+def busy_b():
+    return sum(range(20000))
+
+
+def busy_sync():
+    return sum(range(20000))
+
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/a")
+async def endpoint_a():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+        busy_a()
+    return {"route": "a"}
+
+
+@router.get("/b")
+async def endpoint_b():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+        busy_b()
+    return {"route": "b"}
+
+
+@router.get("/sync")
+def endpoint_sync():
+    busy_sync()
+    return {"route": "sync"}
+
+
+def _app(profilers: dict) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+
+    async def profiling(scope, receive, send):
+        # Un profileur par requête, comme ProfilingMiddleware (sans la vérification du token)
+        if scope["type"] != "http":
+            await app(scope, receive, send)
+            return
+        profiler = profilers[scope["path"]] = cProfile.Profile()
+        token = current_profiler.set(profiler)
+        try:
+            await app(scope, receive, send)
+        finally:
+            current_profiler.reset(token)
+
+    return profiling
+
+
+def _functions(profiler: cProfile.Profile) -> set:
+    return {function for _, _, function in pstats.Stats(profiler).stats}
+
+
+def test_concurrent_profiled_requests_are_isolated():
+    """
+    Teste que deux requêtes profilées simultanées n'ont chacune que leur propre travail dans leur profil.
+    """
+    profilers = {}
+
+    async def run():
+        transport = httpx.ASGITransport(app=_app(profilers))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(client.get("/a"), client.get("/b"), client.get("/sync"))
+
+    responses = asyncio.run(run())
+    assert [response.json()["route"] for response in responses] == ["a", "b", "sync"]
+
+    a, b, sync = (_functions(profilers[path]) for path in ("/a", "/b", "/sync"))
+    assert {"endpoint_a", "busy_a"} <= a and not {"endpoint_b", "busy_b", "busy_sync"} & a
+    assert {"endpoint_b", "busy_b"} <= b and not {"endpoint_a", "busy_a", "busy_sync"} & b
+    # Endpoint synchrone profilé dans son thread, sérialisation dans celui du gestionnaire
+    assert {"busy_sync", "serialize_response"} <= sync and not {"busy_a", "busy_b"} & sync
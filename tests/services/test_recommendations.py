@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.recommendations import BookRecommendation
+from src.models.users import User
+from src.repositories.loans import LoanRepository
+from src.repositories.recommendations import RecommendationRepository
+from src.services.recommendations import RecommendationService
+
+
+def _borrow(db_session: Session, pairs):
+    now = datetime.utcnow()
+    db_session.add_all([
+        Loan(user_id=user.id, book_id=book.id, loan_date=now, due_date=now + timedelta(days=14))
+        for user, book in pairs
+    ])
+    db_session.commit()
+
+
+def test_recommendations_from_co_borrowing(db_session: Session):
+    """
+    Teste le calcul complet puis incrémental des livres « ont aussi emprunté ».
+    """
+    users = [User(email=f"reco{i}@example.com", hashed_password="x", full_name="Lecteur", is_active=True) for i in range(4)]
+    books = [
+        Book(title=f"Livre {i}", author="Auteur", isbn=f"978000000000{i}", publication_year=2000, quantity=5)
+        for i in range(4)
+    ]
+    db_session.add_all([*users, *books])
+    db_session.commit()
+    a, b, c, d = books
+    # Au moins deux emprunteurs en commun (RECOMMENDATION_MIN_CO_BORROWERS) : seuls A et B sont liés
+    _borrow(db_session, [(users[0], a), (users[0], b), (users[1], a), (users[1], b),
+                         (users[2], a), (users[2], c), (users[3], c), (users[3], d)])
+
+    service = RecommendationService(RecommendationRepository(BookRecommendation, db_session))
+    assert service.refresh()["full"] is True
+    assert [r["id"] for r in service.get_for_book(book_id=a.id)] == [b.id]
+    assert service.get_for_book(book_id=b.id) == [{"id": a.id, "title": a.title, "author": a.author}]
+    assert service.get_for_book(book_id=c.id) == []
+
+    # Sans nouvel emprunt, rien à recalculer
+    assert service.refresh()["books"] == 0
+
+    # Nouveaux emprunts : A et C partagent désormais deux lecteurs, B reste le plus proche de A
+    _borrow(db_session, [(users[2], b), (users[3], a)])
+    result = service.refresh()
+    assert (result["full"], result["books"]) == (False, 4)
+    assert [r["id"] for r in service.get_for_book(book_id=a.id)] == [b.id, c.id]
+    assert [r["id"] for r in service.get_for_book(book_id=c.id)] == [a.id]
+    assert [r["id"] for r in service.get_for_book(book_id=a.id, limit=1)] == [b.id]
+
+    # Emprunt rendu puis archivé avant le calcul suivant : ses livres sont tout de même recalculés
+    _borrow(db_session, [(users[1], d)])
+    loan = db_session.query(Loan).filter(Loan.user_id == users[1].id, Loan.book_id == d.id).one()
+    loan.return_date = datetime.utcnow()
+    db_session.commit()
+    assert LoanRepository(Loan, db_session).archive_returned(before=datetime.utcnow() + timedelta(seconds=1)) >= 1
+    assert db_session.query(Loan).filter(Loan.book_id == d.id, Loan.user_id == users[1].id).count() == 0
+    result = service.refresh()
+    assert (result["full"], result["books"]) == (False, 3)
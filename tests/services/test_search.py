@@ -0,0 +1,116 @@
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.books import Book
+from src.repositories.books import BookRepository
+from src.services.books import BookService
+from src.services.search import BookSearchIndex, build_book_search_index
+from src.utils.trigram_index import TrigramIndex
+from src.api.schemas.books import BookCreate, BookUpdate
+
+
+def _create_books(service: BookService):
+    books = [
+        BookCreate(title="Harry Potter", author="J. K. Rowling", isbn="9780747532699", publication_year=1997, quantity=2),
+        BookCreate(title="Le Petit Prince", author="Antoine de Saint-Exupéry", isbn="9782070612758", publication_year=1943, quantity=1),
+        BookCreate(title="Les Misérables", author="Victor Hugo", isbn="9782253096344", publication_year=1862, quantity=3),
+    ]
+    return [service.create(obj_in=book_in) for book_in in books]
+
+
+def test_autocomplete_prefix(db_session: Session):
+    """
+    Teste l'autocomplétion sur le début du titre, d'un mot ou de l'auteur.
+    """
+    repository = BookRepository(Book, db_session)
+    service = BookService(repository, search_index=BookSearchIndex())
+    potter, prince, miserables = _create_books(service)
+
+    assert [book["id"] for book in service.autocomplete(query="harr")] == [potter.id]
+    assert [book["id"] for book in service.autocomplete(query="Pott")] == [potter.id]
+    assert [book["id"] for book in service.autocomplete(query="saint exu")] == [prince.id]
+    assert [book["id"] for book in service.autocomplete(query="misé")] == [miserables.id]
+    assert {book["id"] for book in service.autocomplete(query="le")} == {prince.id, miserables.id}
+    assert service.autocomplete(query="zzz") == []
+    assert len(service.autocomplete(query="l", limit=1)) == 1
+
+
+def test_autocomplete_incremental_updates(db_session: Session):
+    """
+    Teste la mise à jour de l'index lors de la modification et de la suppression d'un livre.
+    """
+    repository = BookRepository(Book, db_session)
+    service = BookService(repository, search_index=BookSearchIndex())
+    potter, _, _ = _create_books(service)
+
+    book = service.get(id=potter.id)
+    service.update(db_obj=book, obj_in=BookUpdate(title="Dune"))
+    assert service.autocomplete(query="harry") == []
+    assert service.autocomplete(query="dune")[0]["title"] == "Dune"
+
+    service.remove(id=potter.id)
+    assert service.autocomplete(query="dune") == []
+
+
+def test_build_index_from_rows():
+    """
+    Teste la construction complète de l'index.
+    """
+    index = BookSearchIndex()
+    index.build([(1, "Python Programming", "Author One"), (2, "Advanced Python", "Author Two")])
+
+    assert len(index) == 2
+    assert {book["id"] for book in index.autocomplete(query="python")} == {1, 2}
+    assert [book["id"] for book in index.autocomplete(query="author t")] == [2]
+
+
+def test_fuzzy_search_tolerates_typos(db_session: Session):
+    """
+    Teste la recherche approximative sur l'auteur et le titre.
+    """
+    repository = BookRepository(Book, db_session)
+    service = BookService(repository, search_index=BookSearchIndex())
+    potter, prince, miserables = _create_books(service)
+
+    books = service.search_fuzzy(query="Rowlin", field="author")
+    assert [book.id for book in books] == [potter.id]
+
+    books = service.search_fuzzy(query="Victr Hgo")
+    assert books[0].id == miserables.id
+
+    books = service.search_fuzzy(query="petit prins", field="title")
+    assert books[0].id == prince.id
+
+    assert service.search_fuzzy(query="Rowlin", field="title") == []
+
+
+def test_trigram_candidates_are_bounded():
+    """
+    Teste que le nombre de candidats évalués reste borné.
+    """
+    index = TrigramIndex(max_candidates=10)
+    index.build((i, f"book {i}") for i in range(1000))
+
+    results = index.search("book 5", limit=100, threshold=0.0)
+    assert 0 < len(results) <= 10
+
+
+def test_autocomplete_route(client, db_session: Session, auth_headers):
+    """
+    Teste la route d'autocomplétion : suggestions de l'index du processus, validation et authentification.
+    """
+    potter, prince, miserables = _create_books(BookService(BookRepository(Book, db_session)))
+    # Index du processus (construit au démarrage) limité aux livres de la base de test
+    build_book_search_index(db_session)
+    url = f"{settings.API_V1_STR}/books/autocomplete"
+    headers = auth_headers()
+
+    response = client.get(url, params={"q": "les mis"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == [{"id": miserables.id, "title": "Les Misérables", "author": "Victor Hugo"}]
+    assert [book["id"] for book in client.get(url, params={"q": "l", "limit": 1}, headers=headers).json()] == [prince.id]
+    assert client.get(url, params={"q": "zzz"}, headers=headers).json() == []
+
+    assert client.get(url, params={"q": ""}, headers=headers).status_code == 422
+    assert client.get(url, params={"q": "harry", "limit": 51}, headers=headers).status_code == 422
+    assert client.get(url, params={"q": "harry"}).status_code == 401
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import numpy as np
+
+from src.cli.seed import assign_copies, generate_loans
+
+
+def test_assign_copies():
+    """
+    Teste le report sur un livre de repli quand tous les exemplaires sont sortis.
+    """
+    choices = np.array([[1, 2], [1, 2], [1, 2], [1, 2]])
+    starts = np.array([0, 10, 20, 30])
+    ends = np.array([35, 15, np.iinfo(np.int64).max, 40])
+    copies = np.array([2, 1])
+
+    assert assign_copies(choices, starts, ends, copies).tolist() == [1, 1, 1, 2]
+    # Livre de repli sorti lui aussi : emprunt abandonné
+    assert assign_copies(choices, starts, ends, np.array([1, 1])).tolist() == [1, 2, 2, 0]
+
+
+def test_generate_loans_within_copies():
+    """
+    Teste que les emprunts générés sont reproductibles et ne dépassent jamais le nombre d'exemplaires.
+    """
+    now = datetime(2025, 1, 1)
+    copies = np.random.default_rng(0).poisson(1.0, 200) + 1
+    loans = generate_loans(np.random.default_rng(7), 5000, n_users=100, copies=copies, now=now, days=365, overdue_ratio=0.05)
+    again = generate_loans(np.random.default_rng(7), 5000, n_users=100, copies=copies, now=now, days=365, overdue_ratio=0.05)
+    assert all(np.array_equal(loans[name], again[name], equal_nan=name == "return_date") for name in loans)
+    assert 0 < len(loans["book_id"]) <= 5000
+
+    # Balayage des sorties (+1) et retours (-1) de chaque livre, retours d'abord à date égale
+    out = np.isnat(loans["return_date"])
+    assert (loans["is_overdue"] == out & (loans["due_date"] < np.datetime64(now))).all()
+    ends = np.where(out, np.datetime64(now, "s"), loans["return_date"])
+    books = np.concatenate([loans["book_id"], loans["book_id"]])
+    times = np.concatenate([loans["loan_date"], ends]).astype(np.int64)
+    deltas = np.concatenate([np.ones(len(out), dtype=np.int64), -np.ones(len(out), dtype=np.int64)])
+    order = np.lexsort((deltas, times, books))
+    for book in np.unique(books):
+        mask = books[order] == book
+        assert np.cumsum(deltas[order][mask]).max() <= copies[book - 1]
@@ -0,0 +1,91 @@
+import time
+from threading import Event, Thread
+
+import pytest
+
+from src.utils.metrics import SINGLE_FLIGHT_CALLS
+from src.utils.singleflight import SingleFlight, flight_key
+
+
+def _run_concurrently(flight: SingleFlight, key, func, count: int, results: list, errors: list):
+    def call():
+        try:
+            results.append(flight.do(key, func))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test-shared", timeout=5)
+    started, release = Event(), Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"value": 42}
+
+    leader = _run_concurrently(flight, flight_key("/x", a=1, b=2), compute, 1, results, [])
+    started.wait(5)
+    # Mêmes paramètres dans un autre ordre : même clé
+    followers = _run_concurrently(flight, flight_key("/x", b=2, a=1), compute, 4, results, [])
+    time.sleep(0.1)  # Laisse les appels suivants rejoindre le calcul en cours
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 5
+    assert SINGLE_FLIGHT_CALLS.value("test-shared", "executed") == 1
+    assert SINGLE_FLIGHT_CALLS.value("test-shared", "coalesced") == 4
+    assert flight.in_flight() == 0
+
+    # Le calcul terminé n'est pas conservé
+    assert flight.do(flight_key("/x", a=1, b=2), lambda: "fresh") == "fresh"
+
+
+def test_errors_are_shared_and_timeouts_fall_back():
+    flight = SingleFlight("test-errors", timeout=5)
+    started, release = Event(), Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise LookupError("absent")
+
+    leader = _run_concurrently(flight, "k", failing, 1, [], errors)
+    started.wait(5)
+    followers = _run_concurrently(flight, "k", failing, 2, [], errors)
+    time.sleep(0.1)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+    assert len(errors) == 3 and all(isinstance(e, LookupError) for e in errors)
+
+    # Un appel qui attend trop longtemps calcule lui-même
+    flight.timeout = 0.01
+    slow_started, slow_release = Event(), Event()
+
+    def slow():
+        slow_started.set()
+        slow_release.wait(5)
+        return "slow"
+
+    results = []
+    leader = _run_concurrently(flight, "k", slow, 1, results, [])
+    slow_started.wait(5)
+    assert flight.do("k", lambda: "own") == "own"
+    slow_release.set()
+    leader[0].join(5)
+    assert results == ["slow"]
+    assert SINGLE_FLIGHT_CALLS.value("test-errors", "timeout") == 1
+
+    with pytest.raises(LookupError):
+        SingleFlight("test-disabled", enabled=False).do("k", failing)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import decode_access_token
+from src.models.tokens import RevokedToken
+from src.models.users import User
+from src.repositories.tokens import RevokedTokenRepository
+from src.services.tokens import RevocationList, TokenService
+from src.utils.bloom import BloomFilter
+from src.utils.security import create_access_token
+
+
+def test_bloom_filter():
+    """
+    Teste l'absence de faux négatif et un taux de faux positifs proche de la cible.
+    """
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    bloom.update(f"jti-{i}" for i in range(1000))
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    assert bloom.is_full
+
+
+def test_revoke_token(db_session: Session):
+    """
+    Teste la révocation : seuls les positifs du filtre sont vérifiés en base.
+    """
+    user = User(email="revoke@example.com", hashed_password="x", full_name="Revoke", is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    revocations = RevocationList(capacity=100, error_rate=0.001)
+    service = TokenService(RevokedTokenRepository(RevokedToken, db_session), revocations)
+    revoked = decode_access_token(create_access_token(subject=user.id))
+    valid = decode_access_token(create_access_token(subject=user.id))
+    assert revoked.jti != valid.jti
+
+    entry = service.revoke(token_data=revoked)
+    assert entry.jti == revoked.jti
+    assert service.revoke(token_data=revoked).id == entry.id
+
+    assert service.is_revoked(token_data=revoked)
+    assert not service.is_revoked(token_data=valid)
+    assert revocations.lookups == 1
+
+
+def test_revocation_list_load_skips_expired(db_session: Session):
+    """
+    Teste le chargement du filtre depuis la base, sans les révocations expirées.
+    """
+    repository = RevokedTokenRepository(RevokedToken, db_session)
+    now = datetime.utcnow()
+    repository.create(obj_in={"jti": "expired", "expires_at": now - timedelta(hours=1)})
+    repository.create(obj_in={"jti": "active", "expires_at": now + timedelta(days=1)})
+
+    revocations = RevocationList(capacity=100, error_rate=0.001)
+    assert revocations.load(db_session) == 1
+    assert revocations.is_revoked(db_session, "active")
+    assert not revocations.is_revoked(db_session, "expired")
+    assert repository.purge(before=now) == 1
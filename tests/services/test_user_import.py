@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models.changes import ChangeLog
+from src.models.users import User
+from src.repositories.changes import ChangeLogRepository
+from src.repositories.users import UserRepository
+from src.services.users import UserService
+from src.utils import security
+from src.utils.security import create_access_token, hash_passwords, verify_password
+
+
+def test_import_users(db_session: Session):
+    """
+    Teste l'import en masse avec rapport des lignes refusées.
+    """
+    service = UserService(UserRepository(User, db_session))
+    service.repository.create(obj_in={"email": "taken@example.com", "hashed_password": "x", "full_name": "Pris"})
+    cursor = ChangeLogRepository(ChangeLog, db_session).get_last_id()
+
+    rows = [
+        {"email": "alice@example.com", "full_name": "Alice", "password": "password123"},
+        {"email": "pas-un-email", "full_name": "Bob", "password": "password123"},
+        {"email": "carol@example.com", "full_name": "Carol", "password": "court"},
+        {"email": "taken@example.com", "full_name": "Dave", "password": "password123"},
+        {"email": "erin@example.com", "full_name": "Erin", "password": "password123", "is_admin": True},
+        {"email": "alice@example.com", "full_name": "Alice bis", "password": "password123"},
+    ]
+    result = service.import_users(rows=rows, batch_size=1)
+
+    assert result["created"] == 2
+    assert [(error["row"], error["email"]) for error in result["errors"]] == [
+        (2, "pas-un-email"),
+        (3, "carol@example.com"),
+        (4, "taken@example.com"),
+        (6, "alice@example.com"),
+    ]
+    erin = service.get_by_email(email="erin@example.com")
+    assert erin.is_admin and verify_password("password123", erin.hashed_password)
+    entries = ChangeLogRepository(ChangeLog, db_session).get_since(cursor=cursor)
+    assert sorted(entry.entity_id for entry in entries) == sorted(
+        [service.get_by_email(email="alice@example.com").id, erin.id]
+    )
+
+
+def test_hash_passwords_parallel():
+    """
+    Teste le hachage dans un pool de processus.
+    """
+    hashes = hash_passwords(["password1", "password2", "password3"], workers=2)
+    assert [verify_password(f"password{i}", hashed) for i, hashed in enumerate(hashes, start=1)] == [True] * 3
+
+    # Pool conservé pour les imports suivants
+    executor = security._hash_executor
+    assert executor is not None
+    assert len(hash_passwords(["password4", "password5"], workers=2)) == 2
+    assert security._hash_executor is executor
+
+    # Pool arrêté à la fermeture du serveur, recréé à la demande
+    security.shutdown_hash_executor()
+    assert security._hash_executor is None
+    assert executor._shutdown_thread
+    assert len(hash_passwords(["password6", "password7"], workers=2)) == 2
+    security.shutdown_hash_executor()
+
+
+def test_import_users_route_limit(client, db_session: Session):
+    """
+    Teste le refus des imports trop gros pour être hashés dans la requête.
+    """
+    admin = User(email="admin@example.com", hashed_password="x", full_name="Admin", is_active=True, is_admin=True)
+    db_session.add(admin)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+    rows = [{"email": f"etudiant{i}@example.com", "full_name": "Étudiant", "password": "password123"}
+            for i in range(settings.USER_IMPORT_MAX_ROWS + 1)]
+
+    response = client.post(f"{settings.API_V1_STR}/users/import", json=rows, headers=headers)
+    assert response.status_code == 413
+    assert db_session.query(User).count() == 1